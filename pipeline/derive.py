@@ -22,100 +22,47 @@ Momentum score (operational, fast-moving, 0-70 raw -> 0-100):
 
 Health score (legacy, backward compatible):
   - round(0.65 * hygiene + 0.35 * momentum)
+
+These are the defaults in scoring-rules.json (rules.DEFAULT_RULES, shared with
+the TS engine). A "scoringRules" object in settings.json replaces any of the
+status/hygiene/momentum/health sections; the rule set is compiled once per run
+(see rules.py for the format).
+
+Input is either the scan JSON document or scan.py's --stream NDJSON events.
+With --fleet, the output gains a "fleet" object of aggregate statistics built
+in the same pass (see fleet.py). --merge-fleet FILE... combines fleet objects
+(or derive outputs carrying one) from several shards or snapshots without
+reprocessing projects.
 """
 
 import json
 import sys
+from collections.abc import Iterator
+from io import TextIOBase
+from itertools import chain
+
+from fleet import FleetStats
+from rules import DEFAULT_SCORER, RuleError, Scorer, compile_rules, merge_rules
+from settings import load_settings
 
 
 def derive_status(days_inactive: int | None) -> str:
-    if days_inactive is None:
-        return "archived"
-    if days_inactive <= 14:
-        return "active"
-    if days_inactive <= 60:
-        return "completed"
-    if days_inactive <= 180:
-        return "paused"
-    return "archived"
+    return DEFAULT_SCORER.status_of(days_inactive)
 
 
 def derive_hygiene_score(project: dict) -> tuple[int, dict[str, int]]:
     """Structural health signals (0-95 raw, normalized to 0-100)."""
-    breakdown: dict[str, int] = {}
-    files = project.get("files", {})
-    cicd = project.get("cicd", {})
-    deployment = project.get("deployment", {})
-
-    if files.get("readme"):
-        breakdown["readme"] = 15
-    if files.get("tests"):
-        breakdown["tests"] = 20
-    if any(cicd.values()):
-        breakdown["cicd"] = 15
-    if project.get("remoteUrl"):
-        breakdown["remote"] = 10
-    if project.get("todoCount", 0) < 10:
-        breakdown["lowTodos"] = 10
-    if any(deployment.values()):
-        breakdown["deployment"] = 10
-    if files.get("linterConfig"):
-        breakdown["linter"] = 5
-    if files.get("license"):
-        breakdown["license"] = 5
-    if files.get("lockfile"):
-        breakdown["lockfile"] = 5
-
-    raw = sum(breakdown.values())
-    normalized = min(round(raw * 100 / 95), 100)
-    return normalized, breakdown
+    return DEFAULT_SCORER.hygiene(project)
 
 
 def derive_momentum_score(project: dict) -> tuple[int, dict[str, int]]:
     """Operational velocity signals (0-70 raw, normalized to 0-100)."""
-    breakdown: dict[str, int] = {}
-
-    # Commit recency
-    days = project.get("daysInactive")
-    if days is not None:
-        if days <= 7:
-            breakdown["recency"] = 25
-        elif days <= 14:
-            breakdown["recency"] = 20
-        elif days <= 30:
-            breakdown["recency"] = 15
-        elif days <= 60:
-            breakdown["recency"] = 5
-
-    # Clean working tree
-    if not project.get("isDirty", False):
-        breakdown["cleanTree"] = 20
-
-    # Pushed up (no commits ahead of remote)
-    if project.get("ahead", 0) == 0:
-        breakdown["pushedUp"] = 15
-
-    # Low stale branches
-    if project.get("branchCount", 0) <= 3:
-        breakdown["lowBranches"] = 10
-
-    raw = sum(breakdown.values())
-    normalized = min(round(raw * 100 / 70), 100)
-    return normalized, breakdown
-
-
-def derive_health_score(project: dict) -> tuple[int, int, int, dict]:
-    """Combined scoring: hygiene + momentum -> legacy healthScore."""
-    hygiene, hygiene_breakdown = derive_hygiene_score(project)
-    momentum, momentum_breakdown = derive_momentum_score(project)
-    health = round(0.65 * hygiene + 0.35 * momentum)
+    return DEFAULT_SCORER.momentum(project)
 
-    score_breakdown = {
-        "hygiene": hygiene_breakdown,
-        "momentum": momentum_breakdown,
-    }
 
-    return health, hygiene, momentum, score_breakdown
+def derive_health_score(project: dict, scorer: Scorer = DEFAULT_SCORER) -> tuple[int, int, int, dict]:
+    """Combined scoring: hygiene + momentum -> legacy healthScore."""
+    return scorer.health(project)
 
 
 def derive_tags(project: dict) -> list[str]:
@@ -152,12 +99,11 @@ def derive_tags(project: dict) -> list[str]:
     return sorted(set(tags))
 
 
-def derive_project(project: dict) -> dict:
-    days_inactive = project.get("daysInactive")
-    health, hygiene, momentum, score_breakdown = derive_health_score(project)
+def derive_project(project: dict, scorer: Scorer = DEFAULT_SCORER) -> dict:
+    health, hygiene, momentum, score_breakdown = scorer.health(project)
     return {
         "pathHash": project["pathHash"],
-        "statusAuto": derive_status(days_inactive),
+        "statusAuto": scorer.status(project),
         "healthScoreAuto": health,
         "hygieneScoreAuto": hygiene,
         "momentumScoreAuto": momentum,
@@ -166,16 +112,82 @@ def derive_project(project: dict) -> dict:
     }
 
 
-def main() -> None:
-    raw = json.load(sys.stdin)
-    projects = raw.get("projects", [])
+def load_scorer() -> Scorer:
+    """Compile the rule set from settings ("scoringRules"), or the defaults."""
+    overrides = load_settings().get("scoringRules")
+    if not overrides:
+        return DEFAULT_SCORER
+    return compile_rules(merge_rules(overrides))
+
+
+def read_projects(stream: TextIOBase, meta: dict) -> Iterator[dict]:
+    """Yield scan projects from a scan document or --stream NDJSON events.
+
+    ``meta["scannedAt"]`` is filled in as it is seen (for NDJSON, only once
+    the final "done" event has been read).
+    """
+    first = stream.readline()
+    try:
+        head = json.loads(first)
+    except json.JSONDecodeError:
+        head = None
+    if not (isinstance(head, dict) and "type" in head):
+        raw = json.loads(first + stream.read())
+        meta["scannedAt"] = raw.get("scannedAt")
+        yield from raw.get("projects", [])
+        return
+    for line in chain([first], stream):
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        if event.get("type") == "project":
+            yield event["project"]
+        elif event.get("type") == "done":
+            meta["scannedAt"] = event.get("scannedAt")
+
+
+def merge_fleet(paths: list[str]) -> FleetStats:
+    """Merge fleet objects saved by earlier --fleet runs."""
+    merged = FleetStats()
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        merged.merge(FleetStats.from_dict(data.get("fleet", data)))
+    return merged
 
-    derived = [derive_project(p) for p in projects]
+
+def main() -> None:
+    args = sys.argv[1:]
+    if args[:1] == ["--merge-fleet"]:
+        try:
+            merged = merge_fleet(args[1:])
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            print(json.dumps({"error": f"cannot merge fleet stats: {exc}"}))
+            sys.exit(1)
+        print(json.dumps(merged.to_dict(), indent=2))
+        return
+
+    try:
+        scorer = load_scorer()
+    except RuleError as exc:
+        print(json.dumps({"error": f"invalid scoringRules: {exc}"}))
+        sys.exit(1)
+
+    fleet = FleetStats() if "--fleet" in args else None
+    meta: dict = {}
+    derived = []
+    for project in read_projects(sys.stdin, meta):
+        result = derive_project(project, scorer)
+        derived.append(result)
+        if fleet is not None:
+            fleet.add(project, result)
 
     output = {
-        "derivedAt": raw.get("scannedAt"),
+        "derivedAt": meta.get("scannedAt"),
         "projects": derived,
     }
+    if fleet is not None:
+        output["fleet"] = fleet.to_dict()
 
     print(json.dumps(output, indent=2))
 
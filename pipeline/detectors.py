@@ -0,0 +1,239 @@
+"""
+Root-level detectors for scan.py, compiled once and resolved from one listing.
+
+Language, lockfile and file-flag detection all ask the same question of a
+project: does this name exist at its root? Instead of one stat per name, the
+root is listed once with os.scandir (RootListing) and every detector becomes a
+set or dict lookup against that listing. Nested indicators such as
+".github/workflows" list their parent only when the root listing shows it is
+a directory.
+
+Settings may add detectors under "detectors". They compile into the same
+tables, so they cost no extra filesystem calls:
+
+  {"detectors": {
+      "languages": {"deno.json": "TypeScript"},
+      "lockfiles": {"deno.lock": "deno"},
+      "flags": {"linterConfig": [".golangci.yml"], "githubActions": [".forgejo/workflows"]}
+  }}
+
+Flags are the files/cicd/deployment output keys (see FLAG_FILES). Built-in
+entries win over user ones for the same name, and unknown flags or malformed
+entries are ignored.
+"""
+
+import os
+
+# Order matters: the first indicator found decides the primary language.
+LANGUAGE_INDICATORS: dict[str, str] = {
+    "package.json": "JavaScript/TypeScript",
+    "pyproject.toml": "Python",
+    "setup.py": "Python",
+    "requirements.txt": "Python",
+    "Cargo.toml": "Rust",
+    "go.mod": "Go",
+    "Gemfile": "Ruby",
+    "build.gradle": "Java/Kotlin",
+    "pom.xml": "Java",
+    "mix.exs": "Elixir",
+    "Package.swift": "Swift",
+    "composer.json": "PHP",
+}
+
+TYPESCRIPT_CONFIG = "tsconfig.json"
+
+# Order matters: the first lockfile found decides the package manager.
+LOCKFILE_MAP: dict[str, str] = {
+    "pnpm-lock.yaml": "pnpm",
+    "package-lock.json": "npm",
+    "yarn.lock": "yarn",
+    "bun.lockb": "bun",
+    "Cargo.lock": "cargo",
+    "uv.lock": "uv",
+    "poetry.lock": "poetry",
+    "Pipfile.lock": "pipenv",
+}
+
+LINTER_FILES: tuple[str, ...] = (
+    ".eslintrc", ".eslintrc.js", ".eslintrc.json", ".eslintrc.yml",
+    "eslint.config.js", "eslint.config.mjs", "eslint.config.ts",
+    ".prettierrc", ".prettierrc.js", ".prettierrc.json",
+    "biome.json", "biome.jsonc",
+    ".flake8", ".pylintrc", "pyproject.toml",
+    ".rubocop.yml", "rustfmt.toml",
+)
+
+# Output flag -> root-relative names that set it ("/" for nested paths).
+# "lockfile" also gets every LOCKFILE_MAP name when compiled.
+FLAG_FILES: dict[str, tuple[str, ...]] = {
+    "readme": ("README.md", "readme.md"),
+    "tests": ("tests", "test", "__tests__", "spec", "src/tests", "src/__tests__"),
+    "env": (".env",),
+    "envExample": (".env.example",),
+    "dockerfile": ("Dockerfile",),
+    "dockerCompose": ("docker-compose.yml", "docker-compose.yaml", "compose.yml"),
+    "linterConfig": LINTER_FILES,
+    "license": ("LICENSE", "LICENSE.md"),
+    "lockfile": (),
+    "githubActions": (".github/workflows",),
+    "circleci": (".circleci",),
+    "travis": (".travis.yml",),
+    "gitlabCi": (".gitlab-ci.yml",),
+    "fly": ("fly.toml",),
+    "vercel": ("vercel.json",),
+    "netlify": ("netlify.toml",),
+}
+
+# Any root entry whose name contains this also counts as tests.
+TEST_NAME_FRAGMENT = "test"
+
+
+class RootListing:
+    """Names at a directory's root from one os.scandir; subdirectories listed on demand.
+
+    Lookups are exact set hits. A name that only matches an entry up to case
+    ("Readme.md" for "README.md") is settled by one os.path.exists, so the
+    answer follows the filesystem: a match on case-insensitive volumes (the
+    macOS default), none on case-sensitive ones.
+    """
+
+    __slots__ = ("path", "names", "dirs", "_folded", "_children")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.names: set[str] = set()
+        self.dirs: set[str] = set()
+        self._folded: set[str] = set()
+        self._children: dict[str, RootListing] = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    self.names.add(entry.name)
+                    self._folded.add(entry.name.lower())
+                    try:
+                        if entry.is_dir():
+                            self.dirs.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+    def _has_name(self, name: str) -> bool:
+        if name in self.names:
+            return True
+        return name.lower() in self._folded and os.path.exists(os.path.join(self.path, name))
+
+    def __contains__(self, rel: str) -> bool:
+        head, sep, rest = rel.partition("/")
+        if not sep:
+            return self._has_name(rel)
+        if head not in self.dirs and not (self._has_name(head) and os.path.isdir(os.path.join(self.path, head))):
+            return False
+        child = self._children.get(head)
+        if child is None:
+            child = self._children[head] = RootListing(os.path.join(self.path, head))
+        return rest in child
+
+
+class DetectorRegistry:
+    """Indicator tables compiled into lookups against a RootListing."""
+
+    __slots__ = ("languages", "lockfiles", "_flags_by_name", "_nested")
+
+    def __init__(
+        self,
+        languages: dict[str, str] = LANGUAGE_INDICATORS,
+        lockfiles: dict[str, str] = LOCKFILE_MAP,
+        flags: dict[str, tuple[str, ...]] = FLAG_FILES,
+    ) -> None:
+        self.languages = dict(languages)
+        self.lockfiles = dict(lockfiles)
+        # Top-level name -> flags it sets; nested paths are checked one by one.
+        self._flags_by_name: dict[str, set[str]] = {}
+        self._nested: list[tuple[str, str]] = []
+        for flag, names in flags.items():
+            for name in names:
+                self._add_flag(flag, name)
+        for name in self.lockfiles:
+            self._add_flag("lockfile", name)
+
+    def _add_flag(self, flag: str, name: str) -> None:
+        if "/" in name:
+            self._nested.append((name, flag))
+        else:
+            self._flags_by_name.setdefault(name, set()).add(flag)
+
+    @classmethod
+    def from_settings(cls, overrides: object) -> "DetectorRegistry":
+        """Built-in detectors plus a settings "detectors" object's additions."""
+        if not isinstance(overrides, dict):
+            return cls()
+
+        def mapping(key: str, builtin: dict[str, str]) -> dict[str, str]:
+            merged = dict(builtin)
+            extra = overrides.get(key)
+            if isinstance(extra, dict):
+                for name, value in extra.items():
+                    if name and isinstance(value, str) and value and name not in merged:
+                        merged[name] = value
+            return merged
+
+        flags = dict(FLAG_FILES)
+        extra_flags = overrides.get("flags")
+        if isinstance(extra_flags, dict):
+            for flag, names in extra_flags.items():
+                if flag in flags and isinstance(names, list):
+                    flags[flag] = flags[flag] + tuple(n for n in names if isinstance(n, str) and n)
+        return cls(
+            languages=mapping("languages", LANGUAGE_INDICATORS),
+            lockfiles=mapping("lockfiles", LOCKFILE_MAP),
+            flags=flags,
+        )
+
+    def flags(self, listing: RootListing) -> set[str]:
+        """Output flags set by the entries in ``listing``."""
+        found: set[str] = set()
+        for name, flags in self._flags_by_name.items():
+            if name in listing:
+                found |= flags
+        for rel, flag in self._nested:
+            if flag not in found and rel in listing:
+                found.add(flag)
+        if "tests" not in found and any(TEST_NAME_FRAGMENT in name for name in listing.names):
+            found.add("tests")
+        return found
+
+    def languages_in(self, listing: RootListing) -> tuple[str | None, list[str]]:
+        """(primary, detected) languages; tsconfig.json marks a JS project TypeScript."""
+        detected: list[str] = []
+        for name, lang in self.languages.items():
+            if name in listing and lang not in detected:
+                detected.append(lang)
+        primary = detected[0] if detected else None
+        if TYPESCRIPT_CONFIG in listing:
+            if "JavaScript/TypeScript" in detected:
+                primary = "TypeScript"
+            elif "TypeScript" not in detected:
+                detected.append("TypeScript")
+                primary = primary or "TypeScript"
+        return primary, detected
+
+    def package_manager(self, listing: RootListing) -> str | None:
+        for name, manager in self.lockfiles.items():
+            if name in listing:
+                return manager
+        return None
+
+    def has_language_indicators(self, listing: RootListing) -> bool:
+        return any(name in listing for name in self.languages)
+
+
+_compiled: tuple[object, DetectorRegistry] | None = None
+
+
+def compiled_registry(overrides: object) -> DetectorRegistry:
+    """Registry for a settings "detectors" value, compiled once per value."""
+    global _compiled
+    if _compiled is None or _compiled[0] is not overrides:
+        _compiled = (overrides, DetectorRegistry.from_settings(overrides))
+    return _compiled[1]
@@ -0,0 +1,255 @@
+"""
+Fleet-level aggregate statistics for derive.py, built in one streaming pass.
+
+FleetStats is fed one project at a time (the raw scan project plus its derived
+scores) and keeps only counters and quantile sketches, so memory stays flat
+however many projects go through it:
+
+  - status counts (statusAuto)
+  - score distributions (health, hygiene, momentum) and daysInactive / LOC
+  - primary language and framework mix
+  - totals (LOC, TODO/FIXME, repos, dirty trees, workspaces)
+
+QuantileSketch is a relative-error log-bucket sketch (the DDSketch layout):
+bucket counts simply add, so stats from several shards or history snapshots
+merge without reprocessing the raw projects. ``to_dict`` / ``from_dict``
+carry the mergeable state through JSON.
+"""
+
+import math
+
+# Percentiles reported for every distribution.
+PERCENTILES: tuple[tuple[str, float], ...] = (
+    ("p25", 0.25), ("p50", 0.5), ("p75", 0.75), ("p90", 0.9), ("p99", 0.99),
+)
+
+# Distribution name -> (source, key). Scores come from the derived project,
+# the rest from the raw scan project.
+DISTRIBUTIONS: dict[str, tuple[str, str]] = {
+    "health": ("derived", "healthScoreAuto"),
+    "hygiene": ("derived", "hygieneScoreAuto"),
+    "momentum": ("derived", "momentumScoreAuto"),
+    "daysInactive": ("project", "daysInactive"),
+    "locEstimate": ("project", "locEstimate"),
+}
+
+TOTALS: tuple[str, ...] = ("locEstimate", "todoCount", "fixmeCount", "repos", "dirty", "workspaces")
+
+DEFAULT_ALPHA = 0.01
+DEFAULT_MAX_BINS = 2048
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy ``alpha``.
+
+    Values are non-negative. Each value lands in bucket ``ceil(log_gamma(v))``
+    with ``gamma = (1 + alpha) / (1 - alpha)``; any quantile is then within
+    ``alpha`` of the true value (relative). If the bucket count exceeds
+    ``max_bins``, the lowest buckets are collapsed together, trading accuracy
+    at the bottom of the range for a hard memory bound.
+    """
+
+    __slots__ = ("alpha", "max_bins", "_log_gamma", "bins", "zero", "count", "total", "min", "max")
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA, max_bins: int = DEFAULT_MAX_BINS) -> None:
+        if not 0 < alpha < 1:
+            raise ValueError(f"alpha must be in (0, 1), got {alpha!r}")
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.bins: dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        if value < 0:
+            raise ValueError(f"QuantileSketch takes non-negative values, got {value!r}")
+        if value == 0:
+            self.zero += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold ``other`` into this sketch (in place) and return self."""
+        if other.alpha != self.alpha:
+            raise ValueError(f"cannot merge sketches with alpha {self.alpha} and {other.alpha}")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def quantile(self, q: float) -> float | None:
+        """Estimated value at quantile ``q`` (0..1), or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        gamma = math.exp(self._log_gamma)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * gamma**key / (gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        out: dict = {
+            "count": self.count,
+            "min": _number(self.min),
+            "max": _number(self.max),
+            "mean": _number(self.total / self.count),
+        }
+        for name, q in PERCENTILES:
+            out[name] = _number(self.quantile(q))
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero": self.zero,
+            "bins": {str(k): self.bins[k] for k in sorted(self.bins)},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_bins: int = DEFAULT_MAX_BINS) -> "QuantileSketch":
+        sketch = cls(float(data.get("alpha", DEFAULT_ALPHA)), max_bins)
+        sketch.bins = {int(k): int(n) for k, n in data.get("bins", {}).items()}
+        sketch.zero = int(data.get("zero", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.total = float(data.get("sum", 0.0))
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+def _number(value: float | None) -> float | int | None:
+    """Round for display; whole numbers come out as ints."""
+    if value is None:
+        return None
+    value = round(value, 2)
+    return int(value) if value == int(value) else value
+
+
+def _bump(counts: dict[str, int], key: str) -> None:
+    counts[key] = counts.get(key, 0) + 1
+
+
+def _merge_counts(into: dict[str, int], other: dict[str, int]) -> None:
+    for key, n in other.items():
+        into[key] = into.get(key, 0) + n
+
+
+class FleetStats:
+    """Streaming accumulator for fleet-wide counts, totals and distributions."""
+
+    __slots__ = ("project_count", "status", "languages", "frameworks", "totals", "sketches")
+
+    def __init__(self) -> None:
+        self.project_count = 0
+        self.status: dict[str, int] = {}
+        self.languages: dict[str, int] = {}
+        self.frameworks: dict[str, int] = {}
+        self.totals: dict[str, int] = dict.fromkeys(TOTALS, 0)
+        self.sketches: dict[str, QuantileSketch] = {name: QuantileSketch() for name in DISTRIBUTIONS}
+
+    def add(self, project: dict, derived: dict) -> None:
+        """Account for one scan project and its derive_project() output."""
+        self.project_count += 1
+        _bump(self.status, derived["statusAuto"])
+        primary = (project.get("languages") or {}).get("primary")
+        if primary:
+            _bump(self.languages, primary)
+        framework = project.get("framework")
+        if framework:
+            _bump(self.frameworks, framework)
+
+        totals = self.totals
+        totals["locEstimate"] += project.get("locEstimate") or 0
+        totals["todoCount"] += project.get("todoCount") or 0
+        totals["fixmeCount"] += project.get("fixmeCount") or 0
+        totals["repos"] += bool(project.get("isRepo"))
+        totals["dirty"] += bool(project.get("isDirty"))
+        totals["workspaces"] += len(project.get("workspaces") or ())
+
+        sources = {"project": project, "derived": derived}
+        for name, (source, key) in DISTRIBUTIONS.items():
+            value = sources[source].get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+                self.sketches[name].add(value)
+
+    def merge(self, other: "FleetStats") -> "FleetStats":
+        """Fold another shard's or snapshot's stats into this one (in place)."""
+        self.project_count += other.project_count
+        _merge_counts(self.status, other.status)
+        _merge_counts(self.languages, other.languages)
+        _merge_counts(self.frameworks, other.frameworks)
+        _merge_counts(self.totals, other.totals)
+        for name, sketch in other.sketches.items():
+            if name in self.sketches:
+                self.sketches[name].merge(sketch)
+            else:
+                self.sketches[name] = sketch
+        return self
+
+    def to_dict(self) -> dict:
+        """Readable summary plus the mergeable sketch state ("sketches")."""
+        return {
+            "projectCount": self.project_count,
+            "status": dict(sorted(self.status.items())),
+            "languages": _by_count(self.languages),
+            "frameworks": _by_count(self.frameworks),
+            "totals": dict(self.totals),
+            "distributions": {name: s.summary() for name, s in self.sketches.items()},
+            "sketches": {name: s.to_dict() for name, s in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FleetStats":
+        """Rebuild from ``to_dict`` output; the summary is recomputed, not trusted."""
+        stats = cls()
+        stats.project_count = int(data.get("projectCount", 0))
+        stats.status = dict(data.get("status", {}))
+        stats.languages = dict(data.get("languages", {}))
+        stats.frameworks = dict(data.get("frameworks", {}))
+        _merge_counts(stats.totals, data.get("totals", {}))
+        for name, state in data.get("sketches", {}).items():
+            stats.sketches[name] = QuantileSketch.from_dict(state)
+        return stats
+
+
+def _by_count(counts: dict[str, int]) -> dict[str, int]:
+    return dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
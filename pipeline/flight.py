@@ -0,0 +1,157 @@
+"""
+Single-flight coordination between concurrent scan.py runs.
+
+When the UI, the CLI and a scheduled job ask for the same refresh at once,
+only the first caller scans. Each (dev root, exclude set) pair gets three
+files in the flight directory:
+
+  <key>.lock     held (flock) by the process currently scanning
+  <key>.json     the result: a {"finishedAt": ...} header line, then the output
+  <key>.waiters  shared-locked by every caller until it is done
+
+A caller that finds the lock taken waits for it, then takes the result if it
+finished after the caller asked for it. If the scanning process died without
+writing one, the waiting caller scans itself. Results are written to a temp
+file and renamed into place, so readers never see a partial result. A result
+is only written when someone is waiting for it, and the last caller out (no
+other shared lock on .waiters) deletes it, so scan output doesn't outlive
+the flight.
+
+The directory is private to the user (0700, owned by them); the temp dir
+fallback is per user. If it exists but belongs to someone else, or is open
+to others, every caller simply scans.
+
+Without fcntl (Windows) every caller simply scans.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Give up waiting on another scan after this long and scan independently.
+WAIT_TIMEOUT = 15 * 60.0
+POLL_INTERVAL = 0.1
+
+
+def flight_dir() -> str:
+    """$APP_DATA_DIR/scan-flights when the launcher sets it, else a per-user temp dir."""
+    data_dir = os.environ.get("APP_DATA_DIR")
+    if data_dir:
+        return os.path.join(data_dir, "scan-flights")
+    return os.path.join(tempfile.gettempdir(), f"sidequests-scan-flights-{os.getuid()}")
+
+
+def _private_dir(directory: str) -> bool:
+    """Create ``directory`` as 0700; False unless it is this user's alone."""
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def flight_key(dev_root: str, exclude_dirs: Iterable[str]) -> str:
+    """Stable key for a dev root and exclude set (order-insensitive)."""
+    identity = json.dumps([os.path.realpath(dev_root), sorted(set(exclude_dirs))])
+    return hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+
+def _read_result(path: str, not_before: float) -> str | None:
+    try:
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if not isinstance(header, dict) or header.get("finishedAt", 0) < not_before:
+                return None
+            return f.read()
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_result(path: str, text: str) -> None:
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".flight-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps({"finishedAt": time.time()}) + "\n")
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def single_flight(
+    key: str,
+    run: Callable[[], str],
+    directory: str | None = None,
+    timeout: float = WAIT_TIMEOUT,
+) -> tuple[str, bool]:
+    """Run ``run`` unless an identical flight is already in the air.
+
+    Returns (result text, whether this caller ran it). A caller that attaches
+    to another process's flight gets that flight's result text verbatim.
+    """
+    if fcntl is None:
+        return run(), True
+    directory = directory or flight_dir()
+    if not _private_dir(directory):
+        return run(), True
+    requested_at = time.time()
+    result_path = os.path.join(directory, f"{key}.json")
+    deadline = time.monotonic() + timeout
+
+    with open(os.path.join(directory, f"{key}.waiters"), "a") as waiters:
+        fcntl.flock(waiters, fcntl.LOCK_SH)
+        with open(os.path.join(directory, f"{key}.lock"), "a") as lock:
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        return run(), True
+                    time.sleep(POLL_INTERVAL)
+            try:
+                shared = _read_result(result_path, requested_at)
+                if shared is not None:
+                    return shared, False
+                text = run()
+                if not _alone(waiters):
+                    _write_result(result_path, text)
+                return text, True
+            finally:
+                if _alone(waiters):
+                    _remove(result_path)
+                # Leave .waiters before the lock, so whoever takes the lock
+                # next only sees callers that are still waiting.
+                fcntl.flock(waiters, fcntl.LOCK_UN)
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _alone(waiters) -> bool:
+    """Whether no other caller holds its shared lock on the waiters file."""
+    try:
+        fcntl.flock(waiters, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
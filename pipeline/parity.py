@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Cross-engine parity and performance harness for the scan -> derive pipeline.
+
+Runs the Python pipeline (scan.py | derive.py) and the TS-native port
+(src/lib/pipeline-native/cli.ts) over the same dev roots and reports, per
+dev root:
+
+  differences  per project (matched by pathHash) and stage, the JSON paths
+               whose values differ, e.g. "git.branchCount: python=3 ts=2"
+  engines      wall time, subprocess count (every git call, by subcommand)
+               and peak resident memory of each engine's processes
+
+Dev roots are generated from a seed (generate_dev_root) so both engines and
+repeated runs see the same projects: git repos in several languages with
+backdated history, branches, dirty trees, CI/deploy files, TODOs, monorepos,
+plus a non-git folder with language indicators. --dev-root benchmarks an
+existing tree instead (read-only).
+
+Subprocesses are counted with a git shim placed first on PATH for each
+engine; peak memory is ru_maxrss from wait4 (the process and the children it
+waited for). Both engines get an empty APP_DATA_DIR, so user settings and
+scan flights don't leak into the comparison. Keys that differ by design
+(framework, see Phase 61W) are skipped unless --no-ignore is given.
+
+The TS engine runs through jiti (node_modules/.bin/jiti, installed with the
+dev dependencies); --ts-runner overrides the command, and --engines python
+runs the Python side alone.
+
+Usage:
+    python3 parity.py [--sizes 10,40] [--seed N] [--dev-root PATH] [--engines python,ts]
+                      [--ts-runner CMD] [--keep DIR] [--no-ignore]
+"""
+
+import json
+import os
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).resolve().parent
+REPO_ROOT = PIPELINE_DIR.parent
+TS_CLI = REPO_ROOT / "src" / "lib" / "pipeline-native" / "cli.ts"
+DEFAULT_TS_RUNNER = str(REPO_ROOT / "node_modules" / ".bin" / "jiti")
+
+ENGINES: tuple[str, ...] = ("python", "ts")
+DEFAULT_SIZES: tuple[int, ...] = (10, 40)
+
+# Known, deliberate divergences between the engines.
+IGNORED_KEYS: frozenset[str] = frozenset({"framework"})
+# Run-time stamps, never comparable.
+VOLATILE_KEYS: frozenset[str] = frozenset({"scannedAt", "derivedAt"})
+
+# Differences listed per project before the rest are summarized.
+MAX_DIFFS = 20
+
+# Commits are dated relative to this, so status buckets spread out.
+GENERATED_EPOCH = 1_750_000_000
+
+_GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Parity",
+    "GIT_AUTHOR_EMAIL": "parity@example.invalid",
+    "GIT_COMMITTER_NAME": "Parity",
+    "GIT_COMMITTER_EMAIL": "parity@example.invalid",
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+# ── Dev root generation ───────────────────────────────────
+
+
+_TEMPLATES: dict[str, dict[str, str]] = {
+    "node": {
+        "package.json": json.dumps({
+            "name": "{name}", "description": "Generated {name}",
+            "scripts": {"dev": "next dev", "test": "vitest"},
+            "dependencies": {"next": "15.0.0", "stripe": "1.0.0"},
+        }, indent=2),
+        "tsconfig.json": "{}\n",
+        "pnpm-lock.yaml": "lockfileVersion: 9\n",
+        "src/index.ts": "// TODO: wire up\nexport const x = 1;\n",
+        ".github/workflows/ci.yml": "on: push\n",
+        "vercel.json": "{}\n",
+    },
+    "python": {
+        "pyproject.toml": '[project]\nname = "{name}"\ndescription = "Generated {name}"\ndependencies = ["fastapi"]\n',
+        "uv.lock": "version = 1\n",
+        "app/main.py": "# FIXME: handle errors\nprint('hi')\n",
+        "tests/test_main.py": "def test_x():\n    assert True\n",
+        ".env": "OPENAI_API_KEY=x\nDATABASE_URL=y\n",
+        "fly.toml": "app = '{name}'\n",
+    },
+    "rust": {
+        "Cargo.toml": '[package]\nname = "{name}"\n\n[dependencies]\naxum = "0.7"\n',
+        "Cargo.lock": "version = 3\n",
+        "src/main.rs": "// TODO: args\nfn main() {}\n",
+        "rustfmt.toml": "",
+        ".gitlab-ci.yml": "test: {}\n",
+    },
+    "go": {
+        "go.mod": "module example.com/{name}\n",
+        "main.go": "package main\n// TODO: flags\nfunc main() {}\n",
+        "Dockerfile": "FROM scratch\n",
+        "compose.yml": "services: {}\n",
+    },
+    "monorepo": {
+        "package.json": json.dumps({"name": "{name}", "private": True, "workspaces": ["packages/*"]}),
+        "package-lock.json": "{}\n",
+        "packages/web/package.json": json.dumps({"name": "@{name}/web", "dependencies": {"react": "18"}}),
+        "packages/web/index.tsx": "// TODO: layout\nexport default 1;\n",
+        "packages/api/package.json": json.dumps({"name": "@{name}/api", "dependencies": {"express": "4"}}),
+        "packages/api/server.js": "// FIXME: auth\nmodule.exports = {};\n",
+        "LICENSE": "MIT\n",
+    },
+}
+
+
+def _git(path: Path, *args: str, date: int | None = None) -> None:
+    env = {**os.environ, **_GIT_ENV}
+    if date is not None:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = f"{date} +0000"
+    subprocess.run(["git", *args], cwd=path, env=env, check=True, capture_output=True)
+
+
+def _write_files(root: Path, files: dict[str, str], name: str) -> None:
+    for rel, text in files.items():
+        target = root / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text.replace("{name}", name))
+
+
+def generate_dev_root(root: str, count: int, seed: int = 0) -> list[str]:
+    """Create ``count`` projects under ``root``, deterministic for a seed."""
+    rng = random.Random(seed)
+    kinds = sorted(_TEMPLATES)
+    names: list[str] = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        name = f"{kind}-{i:03d}"
+        project = Path(root) / name
+        project.mkdir(parents=True)
+        _write_files(project, _TEMPLATES[kind], name)
+        if rng.random() < 0.5:
+            (project / "README.md").write_text(f"# {name}\n")
+        names.append(name)
+
+        if i % 11 == 10:
+            continue  # not a repo, found by its language indicators
+        _git(project, "init", "-q", "-b", "main")
+        _git(project, "remote", "add", "origin", f"git@github.com:parity/{name}.git")
+        # 0-400 days of inactivity spreads projects across status buckets.
+        last = GENERATED_EPOCH - rng.randrange(0, 400) * 86_400
+        commits = rng.randrange(1, 6)
+        (project / "CHANGELOG.md").touch()
+        _git(project, "add", "-A")
+        for c in range(commits):
+            (project / "CHANGELOG.md").write_text(f"{c}\n")
+            _git(project, "commit", "-qam", f"change {c}", date=last - (commits - c) * 3_600)
+        for b in range(rng.randrange(0, 3)):
+            _git(project, "branch", f"feature-{b}")
+        if rng.random() < 0.3:
+            (project / "scratch.txt").write_text("wip\n")
+            (project / "CHANGELOG.md").write_text("dirty\n")
+    return names
+
+
+# ── Engine runs ───────────────────────────────────────────
+
+
+class EngineRun:
+    """One engine's pipeline over one dev root: outputs and resource use."""
+
+    __slots__ = ("scan", "derive", "wall_ms", "git_calls", "peak_rss_kb", "error")
+
+    def __init__(self) -> None:
+        self.scan: dict | None = None
+        self.derive: dict | None = None
+        self.wall_ms = 0.0
+        self.git_calls: Counter[str] = Counter()
+        self.peak_rss_kb = 0
+        self.error: str | None = None
+
+    def to_dict(self) -> dict:
+        data = {
+            "wallMs": round(self.wall_ms, 1),
+            "subprocesses": sum(self.git_calls.values()),
+            "gitCommands": dict(sorted(self.git_calls.items())),
+            "peakRssKb": self.peak_rss_kb,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+def _git_shim(directory: str, log_path: str) -> str:
+    """A bin dir whose ``git`` logs its arguments, then runs the real git."""
+    real = shutil.which("git")
+    if real is None:
+        raise FileNotFoundError("git not found on PATH")
+    bin_dir = os.path.join(directory, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    shim = os.path.join(bin_dir, "git")
+    with open(shim, "w") as f:
+        f.write(f'#!/bin/sh\nprintf "%s\\n" "$*" >> {shlex.quote(log_path)}\nexec {shlex.quote(real)} "$@"\n')
+    os.chmod(shim, 0o755)
+    return bin_dir
+
+
+def git_subcommand(argv: str) -> str:
+    """The git subcommand in a logged argument line, skipping global options."""
+    args = iter(argv.split())
+    for arg in args:
+        if arg in ("-C", "-c"):
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+    return "?"
+
+
+def _measure(stage: str, argv: list[str], env: dict, stdin_text: str, run: EngineRun) -> str:
+    """Run one process, adding its wall time and peak RSS to ``run``; stdout."""
+    with tempfile.TemporaryFile("w+") as stdin, tempfile.TemporaryFile("w+") as out:
+        stdin.write(stdin_text)
+        stdin.seek(0)
+        start = time.perf_counter()
+        proc = subprocess.Popen(argv, stdin=stdin, stdout=out, stderr=subprocess.DEVNULL, env=env, cwd=env["APP_DATA_DIR"])
+        # wait4 rather than Popen.wait: it also reports the child's peak RSS.
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        run.wall_ms += (time.perf_counter() - start) * 1000
+        run.peak_rss_kb = max(run.peak_rss_kb, usage.ru_maxrss)
+        out.seek(0)
+        text = out.read()
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage} exited {proc.returncode}: {text.strip()[:200]}")
+    return text
+
+
+def engine_commands(engine: str, dev_root: str, ts_runner: list[str]) -> tuple[list[str], list[str]]:
+    """(scan argv, derive argv) for an engine; derive reads scan JSON on stdin."""
+    if engine == "python":
+        return (
+            [sys.executable, str(PIPELINE_DIR / "scan.py"), dev_root, "", "--no-coalesce"],
+            [sys.executable, str(PIPELINE_DIR / "derive.py")],
+        )
+    return [*ts_runner, str(TS_CLI), "scan", dev_root, ""], [*ts_runner, str(TS_CLI), "derive"]
+
+
+def run_engine(engine: str, dev_root: str, ts_runner: list[str]) -> EngineRun:
+    run = EngineRun()
+    with tempfile.TemporaryDirectory(prefix=f"parity-{engine}-") as scratch:
+        log_path = os.path.join(scratch, "git.log")
+        data_dir = os.path.join(scratch, "data")
+        os.makedirs(data_dir)
+        env = {
+            **os.environ,
+            "PATH": _git_shim(scratch, log_path) + os.pathsep + os.environ.get("PATH", ""),
+            "APP_DATA_DIR": data_dir,
+        }
+        scan_argv, derive_argv = engine_commands(engine, dev_root, ts_runner)
+        try:
+            scan_text = _measure("scan", scan_argv, env, "", run)
+            run.scan = json.loads(scan_text)
+            run.derive = json.loads(_measure("derive", derive_argv, env, scan_text, run))
+        except (OSError, RuntimeError, json.JSONDecodeError) as exc:
+            run.error = str(exc)
+        try:
+            with open(log_path) as f:
+                run.git_calls.update(git_subcommand(line) for line in f)
+        except OSError:
+            pass
+    return run
+
+
+# ── Output comparison ─────────────────────────────────────
+
+
+def diff_values(a: object, b: object, names: tuple[str, str], path: str = "", ignored: frozenset[str] = frozenset()) -> list[str]:
+    """Paths where two JSON values differ, as "path: <a>=.. <b>=.." lines."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        diffs: list[str] = []
+        for key in sorted(a.keys() | b.keys()):
+            if key in ignored or key in VOLATILE_KEYS:
+                continue
+            sub = f"{path}.{key}" if path else key
+            if key not in b:
+                diffs.append(f"{sub}: missing in {names[1]}")
+            elif key not in a:
+                diffs.append(f"{sub}: missing in {names[0]}")
+            else:
+                diffs.extend(diff_values(a[key], b[key], names, sub, ignored))
+        return diffs
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        diffs = []
+        for i, (x, y) in enumerate(zip(a, b)):
+            diffs.extend(diff_values(x, y, names, f"{path}[{i}]", ignored))
+        return diffs
+    # bool is an int subclass; True and 1 must still count as different.
+    if a == b and type(a) is type(b):
+        return []
+    return [f"{path}: {names[0]}={json.dumps(a)} {names[1]}={json.dumps(b)}"]
+
+
+def compare_projects(
+    left: dict | None, right: dict | None, names: tuple[str, str], stage: str, ignored: frozenset[str]
+) -> list[dict]:
+    """Per-project differences between two outputs, matched by pathHash."""
+    if left is None or right is None:
+        return []
+    by_hash = [{p.get("pathHash"): p for p in output.get("projects", [])} for output in (left, right)]
+    found: list[dict] = []
+    for key in sorted(by_hash[0].keys() | by_hash[1].keys(), key=str):
+        a, b = by_hash[0].get(key), by_hash[1].get(key)
+        name = (a or b).get("name") or (a or b).get("pathHash")
+        if a is None or b is None:
+            diffs = [f"project missing in {names[0] if a is None else names[1]}"]
+        else:
+            diffs = diff_values(a, b, names, ignored=ignored)
+        if diffs:
+            entry = {"project": name, "stage": stage, "diffs": diffs[:MAX_DIFFS]}
+            if len(diffs) > MAX_DIFFS:
+                entry["more"] = len(diffs) - MAX_DIFFS
+            found.append(entry)
+    return found
+
+
+def compare_root(dev_root: str, engines: list[str], ts_runner: list[str], ignored: frozenset[str]) -> dict:
+    runs = {engine: run_engine(engine, dev_root, ts_runner) for engine in engines}
+    scanned = [run.scan for run in runs.values() if run.scan is not None]
+    report: dict = {
+        "devRoot": dev_root,
+        "projects": scanned[0].get("projectCount") if scanned else None,
+        "engines": {engine: run.to_dict() for engine, run in runs.items()},
+    }
+    if len(engines) == 2:
+        left, right = (runs[e] for e in engines)
+        names = (engines[0], engines[1])
+        differences = compare_projects(left.scan, right.scan, names, "scan", ignored)
+        differences += compare_projects(left.derive, right.derive, names, "derive", ignored)
+        report["identical"] = not differences and left.error is None and right.error is None
+        report["differences"] = differences
+    return report
+
+
+# ── CLI ───────────────────────────────────────────────────
+
+
+class ParityOptions:
+    """Command-line options for the harness."""
+
+    __slots__ = ("sizes", "seed", "dev_root", "engines", "ts_runner", "keep", "ignored")
+
+    def __init__(self) -> None:
+        self.sizes: list[int] = list(DEFAULT_SIZES)
+        self.seed = 0
+        self.dev_root: str | None = None
+        self.engines: list[str] = list(ENGINES)
+        self.ts_runner: list[str] = [DEFAULT_TS_RUNNER]
+        self.keep: str | None = None
+        self.ignored = IGNORED_KEYS
+
+
+USAGE = (
+    "Usage: parity.py [--sizes 10,40] [--seed N] [--dev-root PATH] [--engines python,ts]"
+    " [--ts-runner CMD] [--keep DIR] [--no-ignore]"
+)
+
+
+def _parse_args(argv: list[str]) -> ParityOptions | None:
+    """ParityOptions from argv; None on a malformed or unknown flag."""
+    options = ParityOptions()
+    args = iter(argv)
+    for arg in args:
+        name, _, inline = arg.partition("=")
+        if arg == "--no-ignore":
+            options.ignored = frozenset()
+            continue
+        if name not in ("--sizes", "--seed", "--dev-root", "--engines", "--ts-runner", "--keep"):
+            return None
+        value = inline if "=" in arg else next(args, "")
+        if not value:
+            return None
+        if name == "--sizes":
+            parts = value.split(",")
+            if not all(p.isdigit() and int(p) > 0 for p in parts):
+                return None
+            options.sizes = [int(p) for p in parts]
+        elif name == "--seed":
+            if not value.isdigit():
+                return None
+            options.seed = int(value)
+        elif name == "--engines":
+            engines = [e.strip() for e in value.split(",") if e.strip()]
+            if not engines or len(set(engines)) != len(engines) or any(e not in ENGINES for e in engines):
+                return None
+            options.engines = engines
+        elif name == "--ts-runner":
+            options.ts_runner = shlex.split(value)
+        elif name == "--dev-root":
+            options.dev_root = os.path.expanduser(value)
+        else:
+            options.keep = os.path.expanduser(value)
+    return options
+
+
+def main() -> None:
+    options = _parse_args(sys.argv[1:])
+    if options is None:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+    if options.dev_root is not None and not os.path.isdir(options.dev_root):
+        print(json.dumps({"error": f"{options.dev_root} not found"}))
+        sys.exit(1)
+
+    reports: list[dict] = []
+    if options.dev_root is not None:
+        reports.append(compare_root(options.dev_root, options.engines, options.ts_runner, options.ignored))
+    else:
+        base = options.keep or tempfile.mkdtemp(prefix="parity-roots-")
+        try:
+            for size in options.sizes:
+                dev_root = os.path.join(base, f"devroot-{size}")
+                if not os.path.isdir(dev_root):
+                    generate_dev_root(dev_root, size, options.seed)
+                reports.append(compare_root(dev_root, options.engines, options.ts_runner, options.ignored))
+        finally:
+            if options.keep is None:
+                shutil.rmtree(base, ignore_errors=True)
+
+    print(json.dumps({"seed": options.seed, "engines": options.engines, "roots": reports}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
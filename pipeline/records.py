@@ -0,0 +1,430 @@
+"""
+Compact record types for scan output, plus a dedicated JSON serializer.
+
+Each scanned project used to be a tree of small dicts (git info, languages,
+file flags, CI/CD, deployment, recent commits). Slotted records carry the same
+data without a per-instance ``__dict__``, and the serializer writes compact
+JSON straight from the slots using key prefixes compiled once per class.
+Plain dicts without records of their own (cached state entries) go to the
+stdlib's C encoder, which is faster than any walk in Python.
+
+Output is key-for-key identical to the historical dict layout: same keys, same
+order, same string escaping as ``json.dumps`` (ASCII-only), just without the
+``indent=2`` whitespace.
+"""
+
+import json
+from json.encoder import encode_basestring_ascii as _encode_str
+
+
+class Record:
+    """Base class for slotted scan records.
+
+    Subclasses declare ``__slots__`` and a parallel ``_keys`` tuple giving the
+    JSON key for each slot. A key of ``None`` inlines the nested record's
+    fields into the parent object (used for the flattened git info).
+    """
+
+    __slots__ = ()
+    _keys: tuple[str | None, ...] = ()
+
+    def to_dict(self) -> dict:
+        """Plain-dict view, identical to what ``dumps`` would produce."""
+        out: dict = {}
+        for attr, key in zip(self.__slots__, self._keys):
+            value = getattr(self, attr)
+            if key is None:
+                out.update(value.to_dict())
+            else:
+                out[key] = _to_plain(value)
+        return out
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{a}={getattr(self, a)!r}" for a in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _to_plain(value: object) -> object:
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    return value
+
+
+class Commit(Record):
+    __slots__ = ("hash", "date", "message")
+    _keys = ("hash", "date", "message")
+
+    def __init__(self, hash: str, date: str, message: str) -> None:
+        self.hash = hash
+        self.date = date
+        self.message = message
+
+
+class Branch(Record):
+    __slots__ = ("name", "last_commit_date", "ahead", "behind")
+    _keys = ("name", "lastCommitDate", "ahead", "behind")
+
+    def __init__(self, name: str, last_commit_date: str | None, ahead: int | None, behind: int | None) -> None:
+        self.name = name
+        self.last_commit_date = last_commit_date
+        self.ahead = ahead
+        self.behind = behind
+
+
+class GitInfo(Record):
+    __slots__ = (
+        "is_repo", "last_commit_date", "last_commit_message", "branch",
+        "remote_url", "commit_count", "days_inactive", "is_dirty",
+        "untracked_count", "modified_count", "staged_count", "ahead", "behind",
+        "recent_commits", "branch_count", "stash_count",
+        "stale_branch_count", "stale_branches",
+        "untracked_truncated", "status_timed_out",
+    )
+    _keys = (
+        "isRepo", "lastCommitDate", "lastCommitMessage", "branch",
+        "remoteUrl", "commitCount", "daysInactive", "isDirty",
+        "untrackedCount", "modifiedCount", "stagedCount", "ahead", "behind",
+        "recentCommits", "branchCount", "stashCount",
+        "staleBranchCount", "staleBranches",
+        "untrackedTruncated", "statusTimedOut",
+    )
+
+    def __init__(
+        self,
+        is_repo: bool = False,
+        last_commit_date: str | None = None,
+        last_commit_message: str | None = None,
+        branch: str | None = None,
+        remote_url: str | None = None,
+        commit_count: int = 0,
+        days_inactive: int | None = None,
+        is_dirty: bool = False,
+        untracked_count: int = 0,
+        modified_count: int = 0,
+        staged_count: int = 0,
+        ahead: int = 0,
+        behind: int = 0,
+        recent_commits: list[Commit] | None = None,
+        branch_count: int = 0,
+        stash_count: int = 0,
+        stale_branches: list[Branch] | None = None,
+        untracked_truncated: bool = False,
+        status_timed_out: bool = False,
+    ) -> None:
+        self.is_repo = is_repo
+        self.last_commit_date = last_commit_date
+        self.last_commit_message = last_commit_message
+        self.branch = branch
+        self.remote_url = remote_url
+        self.commit_count = commit_count
+        self.days_inactive = days_inactive
+        self.is_dirty = is_dirty
+        self.untracked_count = untracked_count
+        self.modified_count = modified_count
+        self.staged_count = staged_count
+        self.ahead = ahead
+        self.behind = behind
+        self.recent_commits = recent_commits if recent_commits is not None else []
+        self.branch_count = branch_count
+        self.stash_count = stash_count
+        self.stale_branches = stale_branches if stale_branches is not None else []
+        self.stale_branch_count = len(self.stale_branches)
+        self.untracked_truncated = untracked_truncated
+        self.status_timed_out = status_timed_out
+
+
+class Languages(Record):
+    __slots__ = ("primary", "detected")
+    _keys = ("primary", "detected")
+
+    def __init__(self, primary: str | None, detected: list[str]) -> None:
+        self.primary = primary
+        self.detected = detected
+
+
+class Files(Record):
+    __slots__ = (
+        "readme", "tests", "env", "env_example", "dockerfile",
+        "docker_compose", "linter_config", "license", "lockfile",
+    )
+    _keys = (
+        "readme", "tests", "env", "envExample", "dockerfile",
+        "dockerCompose", "linterConfig", "license", "lockfile",
+    )
+
+    def __init__(
+        self,
+        readme: bool,
+        tests: bool,
+        env: bool,
+        env_example: bool,
+        dockerfile: bool,
+        docker_compose: bool,
+        linter_config: bool,
+        license: bool,
+        lockfile: bool,
+    ) -> None:
+        self.readme = readme
+        self.tests = tests
+        self.env = env
+        self.env_example = env_example
+        self.dockerfile = dockerfile
+        self.docker_compose = docker_compose
+        self.linter_config = linter_config
+        self.license = license
+        self.lockfile = lockfile
+
+
+class Cicd(Record):
+    __slots__ = ("github_actions", "circleci", "travis", "gitlab_ci")
+    _keys = ("githubActions", "circleci", "travis", "gitlabCi")
+
+    def __init__(self, github_actions: bool, circleci: bool, travis: bool, gitlab_ci: bool) -> None:
+        self.github_actions = github_actions
+        self.circleci = circleci
+        self.travis = travis
+        self.gitlab_ci = gitlab_ci
+
+
+class Deployment(Record):
+    __slots__ = ("fly", "vercel", "netlify")
+    _keys = ("fly", "vercel", "netlify")
+
+    def __init__(self, fly: bool, vercel: bool, netlify: bool) -> None:
+        self.fly = fly
+        self.vercel = vercel
+        self.netlify = netlify
+
+
+class SkipStat(Record):
+    __slots__ = ("files", "bytes")
+    _keys = ("files", "bytes")
+
+    def __init__(self, files: int, bytes: int) -> None:
+        self.files = files
+        self.bytes = bytes
+
+
+class SkippedFiles(Record):
+    """Source files the walk's skip policy left unread, per reason."""
+
+    __slots__ = ("too_large", "binary", "generated", "minified")
+    _keys = ("tooLarge", "binary", "generated", "minified")
+
+    def __init__(self, too_large: SkipStat, binary: SkipStat, generated: SkipStat, minified: SkipStat) -> None:
+        self.too_large = too_large
+        self.binary = binary
+        self.generated = generated
+        self.minified = minified
+
+
+class Workspace(Record):
+    """One package of a monorepo, with counts attributed from the root's walk."""
+
+    __slots__ = (
+        "name", "path", "language", "framework", "scripts",
+        "todo_count", "fixme_count", "loc_estimate",
+    )
+    _keys = (
+        "name", "path", "language", "framework", "scripts",
+        "todoCount", "fixmeCount", "locEstimate",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        language: str | None,
+        framework: str | None,
+        scripts: list[str],
+        todo_count: int,
+        fixme_count: int,
+        loc_estimate: int,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.language = language
+        self.framework = framework
+        self.scripts = scripts
+        self.todo_count = todo_count
+        self.fixme_count = fixme_count
+        self.loc_estimate = loc_estimate
+
+
+class Project(Record):
+    __slots__ = (
+        "name", "path", "path_hash", "git", "languages", "files", "cicd",
+        "deployment", "todo_count", "fixme_count", "description", "framework",
+        "live_url", "scripts", "services", "loc_estimate", "package_manager",
+        "license", "workspaces", "identity_key", "skipped_files",
+    )
+    _keys = (
+        "name", "path", "pathHash", None, "languages", "files", "cicd",
+        "deployment", "todoCount", "fixmeCount", "description", "framework",
+        "liveUrl", "scripts", "services", "locEstimate", "packageManager",
+        "license", "workspaces", "identityKey", "skippedFiles",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        path_hash: str,
+        git: GitInfo,
+        languages: Languages,
+        files: Files,
+        cicd: Cicd,
+        deployment: Deployment,
+        todo_count: int,
+        fixme_count: int,
+        description: str | None,
+        framework: str | None,
+        live_url: str | None,
+        scripts: list[str],
+        services: list[str],
+        loc_estimate: int,
+        package_manager: str | None,
+        license: bool,
+        workspaces: list[Workspace] | None = None,
+        identity_key: str | None = None,
+        skipped_files: SkippedFiles | None = None,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.path_hash = path_hash
+        self.git = git
+        self.languages = languages
+        self.files = files
+        self.cicd = cicd
+        self.deployment = deployment
+        self.todo_count = todo_count
+        self.fixme_count = fixme_count
+        self.description = description
+        self.framework = framework
+        self.live_url = live_url
+        self.scripts = scripts
+        self.services = services
+        self.loc_estimate = loc_estimate
+        self.package_manager = package_manager
+        self.license = license
+        self.workspaces = workspaces if workspaces is not None else []
+        self.identity_key = identity_key
+        self.skipped_files = skipped_files if skipped_files is not None else SkippedFiles(
+            SkipStat(0, 0), SkipStat(0, 0), SkipStat(0, 0), SkipStat(0, 0)
+        )
+
+
+class ScanOutput(Record):
+    __slots__ = ("scanned_at", "project_count", "projects")
+    _keys = ("scannedAt", "projectCount", "projects")
+
+    def __init__(self, scanned_at: str, projects: list[Project | dict]) -> None:
+        self.scanned_at = scanned_at
+        self.project_count = len(projects)
+        self.projects = projects
+
+
+# ── Serializer ────────────────────────────────────────────
+
+# Per-class plan: (slot name, pre-encoded '"key":' or None for inlined records).
+_PLANS: dict[type, tuple[tuple[str, str | None], ...]] = {}
+
+
+def _plan(cls: type) -> tuple[tuple[str, str | None], ...]:
+    plan = _PLANS.get(cls)
+    if plan is None:
+        plan = tuple(
+            (attr, None if key is None else _encode_str(key) + ":")
+            for attr, key in zip(cls.__slots__, cls._keys)
+        )
+        _PLANS[cls] = plan
+    return plan
+
+
+def _emit_fields(record: Record, parts: list[str], sep: str) -> str:
+    """Append ``record``'s fields; return the separator for the next field."""
+    for attr, prefix in _plan(type(record)):
+        value = getattr(record, attr)
+        if prefix is None:
+            sep = _emit_fields(value, parts, sep)
+            continue
+        parts.append(sep)
+        parts.append(prefix)
+        _emit(value, parts)
+        sep = ","
+    return sep
+
+
+def _fields(record: object) -> dict:
+    """Shallow dict of a record's fields, for the stdlib encoder's ``default``."""
+    if not isinstance(record, Record):
+        raise TypeError(f"Object of type {type(record).__name__} is not JSON serializable")
+    out: dict = {}
+    for attr, key in zip(record.__slots__, record._keys):
+        if key is None:
+            out.update(_fields(getattr(record, attr)))
+        else:
+            out[key] = getattr(record, attr)
+    return out
+
+
+# The C encoder, for subtrees without records of their own: much faster than
+# walking plain dicts and lists here. Records nested deeper still go through
+# ``_fields``; records met directly use the compiled plans, which beat that.
+_encode = json.JSONEncoder(separators=(",", ":"), default=_fields).encode
+
+
+def _emit(value: object, parts: list[str]) -> None:
+    if value is None:
+        parts.append("null")
+    elif value is True:
+        parts.append("true")
+    elif value is False:
+        parts.append("false")
+    elif type(value) is str:
+        parts.append(_encode_str(value))
+    elif type(value) is int:
+        parts.append(int.__repr__(value))
+    elif isinstance(value, Record):
+        if _emit_fields(value, parts, "{") == "{":
+            parts.append("{}")
+        else:
+            parts.append("}")
+    elif type(value) is list:
+        if not value:
+            parts.append("[]")
+            return
+        sep = "["
+        for item in value:
+            parts.append(sep)
+            _emit(item, parts)
+            sep = ","
+        parts.append("]")
+    elif (
+        type(value) is dict
+        and any(isinstance(item, Record) for item in value.values())
+        and all(type(k) is str for k in value)
+    ):
+        sep = "{"
+        for key, item in value.items():
+            parts.append(sep)
+            parts.append(_encode_str(key))
+            parts.append(":")
+            _emit(item, parts)
+            sep = ","
+        parts.append("}")
+    else:
+        # Floats, record-free containers and anything unusual: the stdlib
+        # encoder, which also gives exact parity.
+        parts.append(_encode(value))
+
+
+def dumps(value: object) -> str:
+    """Serialize records (and plain JSON values) to compact JSON."""
+    parts: list[str] = []
+    _emit(value, parts)
+    return "".join(parts)
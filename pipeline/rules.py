@@ -0,0 +1,292 @@
+"""
+Declarative scoring rules for derive.py, compiled once into Python functions.
+
+A rule set has four sections:
+
+  status:   {"signal", "tiers": [[maxValue, status], ...], "default"}
+            First tier whose bound is >= the signal wins; a missing signal or
+            one past the last tier yields "default".
+  hygiene,
+  momentum: {"rules": [...], "max"?}
+            Each rule awards points to the breakdown under its "name":
+              {"name", "signal", "op", "points", "value"?, "default"?}
+              {"name", "signal", "op": "tiers", "tiers": [[maxValue, points], ...]}
+            The raw sum is normalized as min(round(raw * 100 / max), 100);
+            "max" defaults to the sum of each rule's best award.
+  health:   {"weights": {"hygiene": w, "momentum": w}}
+
+Signals are dotted paths into the scan project ("files.readme"); a rule may
+name a "fallback" signal read when the first is missing (older scans). Operators:
+truthy, falsy, any (any value of a mapping is truthy), lt, le, gt, ge, eq,
+ne, tiers. lt, le, gt and ge take numbers and, like tiers and the status
+tiers, only match numeric signals; any only matches a mapping. A path through
+a non-mapping reads as missing, and comparisons against a missing signal
+never match, so no project value can make a compiled rule raise.
+
+DEFAULT_RULES (scoring-rules.json, also read by the TS engine's rules.ts)
+reproduces the historical hard-coded scoring exactly. Settings may override
+whole sections via the "scoringRules" key. compile_rules turns a rule set
+into generated Python source and executes it once, so evaluating a project
+costs no more than the original hand-written functions.
+"""
+
+import json
+import math
+import os
+from collections.abc import Callable
+
+# Shared with src/lib/pipeline-native/rules.ts, so both engines score alike.
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring-rules.json")
+
+with open(DEFAULT_RULES_PATH) as _rules_file:
+    DEFAULT_RULES: dict = json.load(_rules_file)
+
+_COMPARISONS: dict[str, str] = {"lt": "<", "le": "<=", "gt": ">", "ge": ">=", "eq": "==", "ne": "!="}
+_OPS = {"truthy", "falsy", "any", "tiers", *_COMPARISONS}
+
+
+class RuleError(ValueError):
+    """Raised when a scoring rule set is malformed."""
+
+
+class Scorer:
+    """Compiled evaluator for one rule set."""
+
+    __slots__ = ("status_of", "status", "hygiene", "momentum", "health_weights", "source")
+
+    def __init__(
+        self,
+        status_of: Callable[[object], str],
+        status: Callable[[dict], str],
+        hygiene: Callable[[dict], tuple[int, dict[str, int]]],
+        momentum: Callable[[dict], tuple[int, dict[str, int]]],
+        health_weights: tuple[float, float],
+        source: str,
+    ) -> None:
+        self.status_of = status_of
+        self.status = status
+        self.hygiene = hygiene
+        self.momentum = momentum
+        self.health_weights = health_weights
+        self.source = source
+
+    def health(self, project: dict) -> tuple[int, int, int, dict]:
+        hygiene, hygiene_breakdown = self.hygiene(project)
+        momentum, momentum_breakdown = self.momentum(project)
+        w_hygiene, w_momentum = self.health_weights
+        health = round(w_hygiene * hygiene + w_momentum * momentum)
+        return health, hygiene, momentum, {
+            "hygiene": hygiene_breakdown,
+            "momentum": momentum_breakdown,
+        }
+
+
+def merge_rules(overrides: dict | None) -> dict:
+    """Overlay user sections on the defaults; each section is replaced whole."""
+    if not overrides:
+        return DEFAULT_RULES
+    if not isinstance(overrides, dict):
+        raise RuleError("scoringRules must be an object")
+    unknown = set(overrides) - set(DEFAULT_RULES)
+    if unknown:
+        raise RuleError(f"scoringRules: unknown section(s) {sorted(unknown)}")
+    return {**DEFAULT_RULES, **overrides}
+
+
+# ── Compiler ──────────────────────────────────────────────
+
+
+def _literal(value: object, where: str) -> str:
+    if isinstance(value, float) and not math.isfinite(value):
+        raise RuleError(f"{where}: expected a finite number")
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+    raise RuleError(f"{where}: expected a scalar, got {type(value).__name__}")
+
+
+def _number(value: object, where: str) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise RuleError(f"{where}: expected a number")
+    return repr(value)
+
+
+def _tiers(spec: dict, where: str) -> list[tuple[str, object]]:
+    tiers = spec.get("tiers")
+    if not isinstance(tiers, list) or not tiers:
+        raise RuleError(f"{where}: 'tiers' must be a non-empty list of [bound, value]")
+    out = []
+    for i, tier in enumerate(tiers):
+        if not isinstance(tier, list) or len(tier) != 2:
+            raise RuleError(f"{where}.tiers[{i}]: expected [bound, value]")
+        out.append((_number(tier[0], f"{where}.tiers[{i}]"), tier[1]))
+    return out
+
+
+class _Signals:
+    """Hoists each distinct signal path into a local variable."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self._names: dict[tuple[str, str], str] = {}
+
+    def get(self, path: object, default: str, where: str) -> str:
+        if not isinstance(path, str) or not path or any(not p for p in path.split(".")):
+            raise RuleError(f"{where}: 'signal' must be a dotted path")
+        key = (path, default)
+        if key in self._names:
+            return self._names[key]
+        parts = path.split(".")
+        expr = "project"
+        for i, part in enumerate(parts):
+            prefix = ".".join(parts[: i + 1])
+            if i < len(parts) - 1:
+                parent = self._names.get((prefix, "{}"))
+                if parent is None:
+                    parent = f"_s{len(self._names)}"
+                    self._names[(prefix, "{}")] = parent
+                    # Only mappings are descended into; anything else reads as missing.
+                    self.lines.append(f"    {parent} = {expr}.get({part!r})")
+                    self.lines.append(f"    {parent} = {parent} if isinstance({parent}, dict) else {{}}")
+                expr = parent
+            else:
+                name = f"_s{len(self._names)}"
+                self._names[key] = name
+                self.lines.append(f"    {name} = {expr}.get({part!r}, {default})")
+                return name
+        raise AssertionError("unreachable")
+
+    def get_with_fallback(self, path: object, fallback: object, default: str, where: str) -> str:
+        """Like ``get``, reading ``fallback`` when ``path`` is missing."""
+        if fallback is None:
+            return self.get(path, default, where)
+        key = (f"{path}|{fallback}", default)
+        if key in self._names:
+            return self._names[key]
+        primary = self.get(path, "None", where)
+        secondary = self.get(fallback, default, f"{where}.fallback")
+        name = f"_s{len(self._names)}"
+        self._names[key] = name
+        self.lines.append(f"    {name} = {primary} if {primary} is not None else {secondary}")
+        return name
+
+
+def _compile_section(fn_name: str, section: object, where: str) -> list[str]:
+    if not isinstance(section, dict) or not isinstance(section.get("rules"), list):
+        raise RuleError(f"{where}: expected {{\"rules\": [...]}}")
+
+    signals = _Signals()
+    body: list[str] = []
+    best_total = 0.0
+    for i, rule in enumerate(section["rules"]):
+        at = f"{where}.rules[{i}]"
+        if not isinstance(rule, dict):
+            raise RuleError(f"{at}: expected an object")
+        name = rule.get("name")
+        if not isinstance(name, str) or not name:
+            raise RuleError(f"{at}: 'name' is required")
+        op = rule.get("op")
+        if op not in _OPS:
+            raise RuleError(f"{at}: unknown op {op!r}")
+        target = f"breakdown[{name!r}]"
+
+        if op == "tiers":
+            tiers = _tiers(rule, at)
+            var = signals.get_with_fallback(rule.get("signal"), rule.get("fallback"), "None", at)
+            body.append(f"    if isinstance({var}, _NUMBER):")
+            for j, (bound, points) in enumerate(tiers):
+                keyword = "if" if j == 0 else "elif"
+                body.append(f"        {keyword} {var} <= {bound}:")
+                body.append(f"            {target} = {_number(points, f'{at}.tiers[{j}]')}")
+            best_total += max(float(points) for _, points in tiers)
+            continue
+
+        points = _number(rule.get("points"), f"{at}.points")
+        best_total += float(points)
+        if op == "any":
+            var = signals.get(rule.get("signal"), "{}", at)
+            cond = f"isinstance({var}, dict) and any({var}.values())"
+        else:
+            # Ordering comparisons need numbers on both sides at evaluation.
+            ordered = op in ("lt", "le", "gt", "ge")
+            raw_default = rule.get("default")
+            if ordered and raw_default is not None:
+                default = _number(raw_default, f"{at}.default")
+            else:
+                default = _literal(raw_default, f"{at}.default")
+            var = signals.get_with_fallback(rule.get("signal"), rule.get("fallback"), default, at)
+            if op == "truthy":
+                cond = var
+            elif op == "falsy":
+                cond = f"not {var}"
+            else:
+                value = (_number if ordered else _literal)(rule.get("value"), f"{at}.value")
+                guard = f"isinstance({var}, _NUMBER)" if ordered else f"{var} is not None"
+                cond = f"{guard} and {var} {_COMPARISONS[op]} {value}"
+        body.append(f"    if {cond}:")
+        body.append(f"        {target} = {points}")
+
+    max_raw = section.get("max", best_total)
+    max_src = _number(max_raw, f"{where}.max")
+    if not max_raw:
+        raise RuleError(f"{where}.max: must be non-zero")
+    return [
+        f"def {fn_name}(project):",
+        "    breakdown = {}",
+        *signals.lines,
+        *body,
+        "    raw = sum(breakdown.values())",
+        f"    return min(round(raw * 100 / {max_src}), 100), breakdown",
+        "",
+    ]
+
+
+def _compile_status(section: object) -> list[str]:
+    if not isinstance(section, dict):
+        raise RuleError("status: expected an object")
+    tiers = _tiers(section, "status")
+    default = _literal(section.get("default"), "status.default")
+    signals = _Signals()
+    var = signals.get(section.get("signal"), "None", "status")
+    lines = ["def status_of(value):", "    if not isinstance(value, _NUMBER):", f"        return {default}"]
+    for j, (bound, label) in enumerate(tiers):
+        lines.append(f"    if value <= {bound}:")
+        lines.append(f"        return {_literal(label, f'status.tiers[{j}]')}")
+    lines += [f"    return {default}", "", "def status(project):", *signals.lines, f"    return status_of({var})", ""]
+    return lines
+
+
+def compile_rules(rules: dict) -> Scorer:
+    """Validate a full rule set and compile it into a Scorer."""
+    if not isinstance(rules, dict):
+        raise RuleError("rule set must be an object")
+    health = rules.get("health")
+    weights = health.get("weights") if isinstance(health, dict) else None
+    if not isinstance(weights, dict):
+        raise RuleError("health: expected {\"weights\": {\"hygiene\": w, \"momentum\": w}}")
+    w_hygiene = float(_number(weights.get("hygiene"), "health.weights.hygiene"))
+    w_momentum = float(_number(weights.get("momentum"), "health.weights.momentum"))
+
+    source = "\n".join([
+        *_compile_status(rules.get("status")),
+        *_compile_section("hygiene", rules.get("hygiene"), "hygiene"),
+        *_compile_section("momentum", rules.get("momentum"), "momentum"),
+    ])
+    namespace: dict = {
+        "__builtins__": {"any": any, "dict": dict, "isinstance": isinstance, "min": min, "round": round, "sum": sum},
+        "_NUMBER": (int, float),
+    }
+    try:
+        exec(compile(source, "<scoring-rules>", "exec"), namespace)
+    except Exception as err:  # validation above should make this unreachable
+        raise RuleError(f"rule set failed to compile: {err}") from err
+    return Scorer(
+        namespace["status_of"],
+        namespace["status"],
+        namespace["hygiene"],
+        namespace["momentum"],
+        (w_hygiene, w_momentum),
+        source,
+    )
+
+
+DEFAULT_SCORER = compile_rules(DEFAULT_RULES)
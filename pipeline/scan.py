@@ -3,34 +3,77 @@
 Deterministic scanner for ~/dev projects.
 
 Collects raw git info, language indicators, file flags, TODO/FIXME counts.
+Monorepo roots also get per-package "workspaces" sub-records, counted from
+the same single walk, which skips files too large, binary, generated or
+minified to be worth reading (see sourcefiles.py; tallies in "skippedFiles").
+Root-level indicators (languages, lockfiles, file/CI/deploy flags) resolve
+from one listing of each project root (see detectors.py; settings
+"detectors" adds more).
+git status is streamed and bounded: untracked entries stop counting at
+settings "statusMaxUntracked" ("untrackedTruncated"), and a status that times
+out is reported dirty with "statusTimedOut" rather than clean.
 Outputs JSON to stdout. Accepts DEV_ROOT and EXCLUDE_DIRS as arguments.
 
+Projects are scanned concurrently under adaptive limits (see scheduler.py),
+most recently active first. Pass --jobs 1 for a strictly sequential scan, or
+--low-priority to run the scan and its git processes at background CPU and
+I/O priority.
+
+--state PATH keeps per-project results between runs so unchanged paused and
+archived projects are rescanned on a slower cadence (settings "scanCadence",
+seconds per status). --stream writes NDJSON, one project per line as each
+becomes ready, followed by a "done" line.
+
+Concurrent runs over the same dev root and exclude set are coalesced (see
+flight.py): a run that starts while another is scanning waits for it and
+prints its result instead of scanning again. --no-coalesce opts out.
+
 Usage:
-    python3 scan.py <dev_root> <exclude_csv>
+    python3 scan.py <dev_root> <exclude_csv> [--jobs N] [--low-priority] [--state PATH] [--stream] [--no-coalesce]
 """
 
 import hashlib
 import json
 import os
-import subprocess
+import re
 import sys
+import threading
+import time
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from pathlib import Path
-
-LANGUAGE_INDICATORS: dict[str, str] = {
-    "package.json": "JavaScript/TypeScript",
-    "pyproject.toml": "Python",
-    "setup.py": "Python",
-    "requirements.txt": "Python",
-    "Cargo.toml": "Rust",
-    "go.mod": "Go",
-    "Gemfile": "Ruby",
-    "build.gradle": "Java/Kotlin",
-    "pom.xml": "Java",
-    "mix.exs": "Elixir",
-    "Package.swift": "Swift",
-    "composer.json": "PHP",
-}
+from urllib.parse import urlsplit
+
+from detectors import DetectorRegistry, RootListing, compiled_registry
+from flight import flight_key, single_flight
+from records import (
+    Branch,
+    Cicd,
+    Commit,
+    Deployment,
+    Files,
+    GitInfo,
+    Languages,
+    Project,
+    ScanOutput,
+    SkippedFiles,
+    SkipStat,
+    Workspace,
+    dumps,
+)
+from scheduler import (
+    AdaptiveLimit,
+    cadence_from_settings,
+    cpu_count,
+    is_due,
+    lower_priority,
+    order_by_activity,
+    run_adaptive,
+)
+from settings import load_settings
+from sourcefiles import DEFAULT_POLICY, SKIP_REASONS, SkipPolicy, SkipTally, read_source
+from state import ScanState
+from workspaces import find_workspace_packages, package_name
 
 SOURCE_EXTENSIONS: set[str] = {
     ".py", ".ts", ".tsx", ".js", ".jsx", ".rs", ".go", ".rb", ".java", ".kt",
@@ -48,40 +91,346 @@ def path_hash(absolute_path: str) -> str:
     return hashlib.sha256(absolute_path.encode()).hexdigest()[:16]
 
 
+_SCP_REMOTE = re.compile(r"^[\w.-]+@([^:/]+):(.+)$")
+
+
+def normalize_remote(url: str) -> str:
+    """host/owner/repo form of a remote URL, so SSH and HTTPS clones agree."""
+    url = url.strip()
+    scp = _SCP_REMOTE.match(url)
+    if scp:
+        host, repo = scp.group(1), scp.group(2)
+    else:
+        parts = urlsplit(url)
+        host, repo = parts.hostname or "", parts.path
+    repo = repo.strip("/").removesuffix(".git")
+    return f"{host.lower()}/{repo}" if host else repo
+
+
+def identity_key(root_commit: str | None, remote_url: str | None) -> str | None:
+    """Content identity that survives moves and renames: root commit + remote.
+
+    Unlike pathHash it doesn't change when the folder does; None for
+    non-repos and repos without commits.
+    """
+    if not root_commit:
+        return None
+    remote = normalize_remote(remote_url) if remote_url else ""
+    return hashlib.sha256(f"{root_commit}\n{remote}".encode()).hexdigest()[:16]
+
+
+def project_identity(
+    path: str,
+    remote_url: str | None,
+    head: str | None = None,
+    root_commits: dict[str, list[str]] | None = None,
+) -> str | None:
+    """identity_key for a repo; ``root_commits`` (pathHash -> [head, root])
+    skips the full-history walk while HEAD is unchanged and records new roots.
+    """
+    if not (Path(path) / ".git").exists():
+        return None
+    key = path_hash(path)
+    cached = root_commits.get(key) if root_commits is not None and head else None
+    if cached and cached[0] == head:
+        return identity_key(cached[1], remote_url)
+    roots = run_git(path, "rev-list", "--max-parents=0", "HEAD")
+    # Merged histories can have several roots; the smallest is stable.
+    root = min(roots.split()) if roots else None
+    if root and head and root_commits is not None:
+        root_commits[key] = [head, root]
+    return identity_key(root, remote_url)
+
+
+# Bounds in-flight git processes during a concurrent scan; set by main().
+GIT_LIMIT: AdaptiveLimit | None = None
+
+
 def run_git(cwd: str, *args: str) -> str | None:
+    if GIT_LIMIT is None:
+        return _run_git(cwd, *args)
+    with GIT_LIMIT.slot():
+        return _run_git(cwd, *args)
+
+
+GIT_TIMEOUT = 5.0
+
+
+def _run_git(cwd: str, *args: str) -> str | None:
+    # Imported on first use: a refresh served entirely from --state never
+    # starts a process.
+    import subprocess
+
     try:
         result = subprocess.run(
             ["git", *args],
             cwd=cwd,
             capture_output=True,
             text=True,
-            timeout=5,
+            timeout=GIT_TIMEOUT,
         )
         return result.stdout.strip() if result.returncode == 0 else None
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return None
 
 
-def get_git_info(path: str) -> dict:
+_git_version: tuple[int, ...] | None = None
+_init_default_branch: str | None = None
+_git_globals_lock = threading.Lock()
+
+
+def git_version() -> tuple[int, ...]:
+    """Installed git version, asked once per process; () if unknown."""
+    global _git_version
+    with _git_globals_lock:
+        if _git_version is None:
+            out = _run_git(os.getcwd(), "version") or ""
+            match = re.search(r"(\d+)\.(\d+)", out)
+            _git_version = (int(match.group(1)), int(match.group(2))) if match else ()
+        return _git_version
+
+
+def init_default_branch() -> str:
+    """The user's init.defaultBranch, asked once per process; "" if unset."""
+    global _init_default_branch
+    with _git_globals_lock:
+        if _init_default_branch is None:
+            _init_default_branch = _run_git(os.getcwd(), "config", "--get", "init.defaultBranch") or ""
+        return _init_default_branch
+
+
+# for-each-ref's %(ahead-behind:<ref>) atom arrived in git 2.41.
+AHEAD_BEHIND_GIT = (2, 41)
+STALE_BRANCH_DAYS = 30
+
+
+def has_ref(path: str, ref: str) -> bool:
+    """Whether a full ref name exists, loose or packed (read from .git)."""
+    git_dir = Path(path) / ".git"
+    if (git_dir / ref).is_file():
+        return True
+    try:
+        packed = (git_dir / "packed-refs").read_text()
+    except OSError:
+        return False
+    return any(line.endswith(f" {ref}") for line in packed.splitlines())
+
+
+def default_branch_ref(path: str) -> str | None:
+    """The default branch as a ref under refs/, or None if it can't be told.
+
+    origin's default as the clone recorded it in refs/remotes/origin/HEAD,
+    else the configured init.defaultBranch, main or master, whichever exists
+    first. Never the checked-out branch: in a repo made with git init and
+    a later push, origin/HEAD is missing and HEAD may be any feature branch.
+    Refs that don't resolve are skipped, so a dangling origin/HEAD can't
+    fail the listing it is used in.
+    """
+    try:
+        text = (Path(path) / ".git" / "refs" / "remotes" / "origin" / "HEAD").read_text().strip()
+    except OSError:
+        text = ""
+    prefix = "ref: refs/"
+    if text.startswith(prefix) and has_ref(path, text[len("ref: "):]):
+        return text[len(prefix):]
+    for name in (init_default_branch(), "main", "master"):
+        if name and has_ref(path, f"refs/heads/{name}"):
+            return f"heads/{name}"
+    return None
+
+
+def stale_branch_days() -> int:
+    days = load_settings().get("staleBranchDays", STALE_BRANCH_DAYS)
+    return days if isinstance(days, int) and not isinstance(days, bool) and days > 0 else STALE_BRANCH_DAYS
+
+
+def get_branches(path: str, current: str | None) -> tuple[int, list[Branch]]:
+    """(local branch count, stale branches) from one for-each-ref listing.
+
+    A branch is stale when its last commit is older than staleBranchDays, or
+    when it is fully merged into the default branch (nothing ahead, tip not
+    the default's). The default and checked-out branches never count; when
+    no default branch can be found only age makes a branch stale.
+    Ahead/behind come from %(ahead-behind) on git 2.41+; older git gets a
+    second, --merged listing instead and reports them as null. Either way the
+    number of git calls doesn't grow with the number of branches.
+    """
+    base = default_branch_ref(path)
+    fmt = "%(refname)%00%(objectname)%00%(committerdate:iso-strict)"
+    with_counts = base is not None and git_version() >= AHEAD_BEHIND_GIT
+    if with_counts:
+        fmt += f"%00%(ahead-behind:refs/{base})"
+    patterns = ["refs/heads"] if base is None or base.startswith("heads/") else ["refs/heads", f"refs/{base}"]
+    output = run_git(path, "for-each-ref", f"--format={fmt}", *patterns)
+    if not output:
+        return 0, []
+
+    default = base.removeprefix("remotes/origin/").removeprefix("heads/") if base else None
+    branches: list[list[str]] = []
+    base_sha = None
+    for line in output.splitlines():
+        fields = line.split("\0")
+        if len(fields) < 3:
+            continue
+        if fields[0] == f"refs/{base}":
+            base_sha = fields[1]
+        if fields[0].startswith("refs/heads/"):
+            fields[0] = fields[0].removeprefix("refs/heads/")
+            branches.append(fields)
+
+    merged: set[str] = set()
+    if base is not None and not with_counts:
+        listing = run_git(path, "for-each-ref", "--merged", f"refs/{base}", "--format=%(refname:short)", "refs/heads")
+        merged = set(listing.splitlines()) if listing else set()
+
+    max_days = stale_branch_days()
+    stale: list[Branch] = []
+    for fields in branches:
+        name, sha, date = fields[0], fields[1], fields[2] or None
+        if name in (default, current):
+            continue
+        ahead = behind = None
+        if with_counts:
+            counts = fields[3].split() if len(fields) > 3 else []
+            if len(counts) == 2 and all(c.isdigit() for c in counts):
+                ahead, behind = int(counts[0]), int(counts[1])
+            is_merged = ahead == 0 and bool(behind)
+        else:
+            is_merged = name in merged and sha != base_sha
+        age = days_since(date)
+        if is_merged or (age is not None and age >= max_days):
+            stale.append(Branch(name, date, ahead, behind))
+    return len(branches), stale
+
+
+# Untracked entries counted before git status is stopped; settings
+# "statusMaxUntracked" overrides.
+STATUS_MAX_UNTRACKED = 1000
+STATUS_READ_BYTES = 64 * 1024
+
+
+def status_max_untracked() -> int:
+    limit = load_settings().get("statusMaxUntracked", STATUS_MAX_UNTRACKED)
+    return limit if isinstance(limit, int) and not isinstance(limit, bool) and limit > 0 else STATUS_MAX_UNTRACKED
+
+
+class WorkingTree:
+    """Counts from one bounded ``git status``."""
+
+    __slots__ = ("untracked", "modified", "staged", "seen", "truncated", "timed_out")
+
+    def __init__(self) -> None:
+        self.untracked = 0
+        self.modified = 0
+        self.staged = 0
+        self.seen = False
+        # untracked is a lower bound: stopped at the limit
+        self.truncated = False
+        # every count is a lower bound: git was killed at the timeout
+        self.timed_out = False
+
+    @property
+    def dirty(self) -> bool:
+        # A status that didn't finish is never reported clean.
+        return self.seen or self.timed_out
+
+    def add(self, x: str, y: str) -> None:
+        self.seen = True
+        if y == "M" or x == "M":
+            self.modified += 1
+        if x in ("A", "M", "R", "D") and y != "?":
+            self.staged += 1
+
+
+def working_tree_status(path: str, max_untracked: int, timeout: float = GIT_TIMEOUT) -> WorkingTree:
+    """Stream ``git status --porcelain -z``, bounded in entries and time.
+
+    Output is parsed as it arrives rather than held whole. Porcelain lists
+    tracked changes before untracked entries, so stopping once
+    ``max_untracked`` untracked entries have been seen leaves the modified
+    and staged counts exact and the untracked count a lower bound
+    (``truncated``). core.untrackedCache=true lets git reuse the index's
+    untracked cache where the repo has one. If git is still running at
+    ``timeout`` it is killed and the tree reported dirty with ``timed_out``
+    set; a failed status (not a timeout) reads as clean, as before.
+    """
+    if GIT_LIMIT is None:
+        return _working_tree_status(path, max_untracked, timeout)
+    with GIT_LIMIT.slot():
+        return _working_tree_status(path, max_untracked, timeout)
+
+
+def _working_tree_status(path: str, max_untracked: int, timeout: float) -> WorkingTree:
+    import subprocess
+
+    tree = WorkingTree()
+    try:
+        proc = subprocess.Popen(
+            ["git", "--no-optional-locks", "-c", "core.untrackedCache=true", "status", "--porcelain", "-z"],
+            cwd=path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return tree
+    expired = threading.Event()
+
+    def expire() -> None:
+        expired.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, expire)
+    timer.start()
+    pending = b""
+    origin_follows = False
+    try:
+        while not tree.truncated:
+            chunk = proc.stdout.read1(STATUS_READ_BYTES)
+            if not chunk:
+                break
+            *entries, pending = (pending + chunk).split(b"\0")
+            for entry in entries:
+                if origin_follows:
+                    # Renames and copies carry their source path as an extra field.
+                    origin_follows = False
+                    continue
+                if len(entry) < 3:
+                    continue
+                x, y = chr(entry[0]), chr(entry[1])
+                if x == "?" and y == "?":
+                    if tree.untracked == max_untracked:
+                        tree.truncated = True
+                        break
+                    tree.untracked += 1
+                tree.add(x, y)
+                origin_follows = x in ("R", "C") or y in ("R", "C")
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stdout.close()
+
+    if expired.is_set() and proc.returncode != 0 and not tree.truncated:
+        tree.timed_out = True
+    elif proc.returncode != 0 and not tree.truncated:
+        return WorkingTree()
+    return tree
+
+
+def days_since(iso_date: str | None) -> int | None:
+    """Whole days between an ISO-8601 timestamp and now, or None if unparseable."""
+    if not iso_date:
+        return None
+    try:
+        return (datetime.now(timezone.utc) - datetime.fromisoformat(iso_date)).days
+    except ValueError:
+        return None
+
+
+def get_git_info(path: str) -> GitInfo:
     if not (Path(path) / ".git").exists():
-        return {
-            "isRepo": False,
-            "lastCommitDate": None,
-            "lastCommitMessage": None,
-            "branch": None,
-            "remoteUrl": None,
-            "commitCount": 0,
-            "daysInactive": None,
-            "isDirty": False,
-            "untrackedCount": 0,
-            "modifiedCount": 0,
-            "stagedCount": 0,
-            "ahead": 0,
-            "behind": 0,
-            "recentCommits": [],
-            "branchCount": 0,
-            "stashCount": 0,
-        }
+        return GitInfo()
 
     last_date = run_git(path, "log", "-1", "--format=%aI")
     last_msg = run_git(path, "log", "-1", "--format=%s")
@@ -90,32 +439,11 @@ def get_git_info(path: str) -> dict:
     count_str = run_git(path, "rev-list", "--count", "HEAD")
     commit_count = int(count_str) if count_str else 0
 
-    days_inactive = None
-    if last_date:
-        try:
-            last_dt = datetime.fromisoformat(last_date)
-            days_inactive = (datetime.now(timezone.utc) - last_dt).days
-        except ValueError:
-            pass
+    days_inactive = days_since(last_date)
 
-    # Working tree status
-    status_output = run_git(path, "status", "--porcelain")
-    is_dirty = False
-    untracked = 0
-    modified = 0
-    staged = 0
-    if status_output:
-        is_dirty = True
-        for line in status_output.splitlines():
-            if len(line) < 2:
-                continue
-            x, y = line[0], line[1]
-            if x == "?" and y == "?":
-                untracked += 1
-            if y == "M" or x == "M":
-                modified += 1
-            if x in ("A", "M", "R", "D") and y != "?":
-                staged += 1
+    # Working tree status, streamed and bounded (--no-optional-locks: never
+    # rewrite the index, whose mtime is part of the activity fingerprint)
+    tree = working_tree_status(path, status_max_untracked())
 
     # Ahead/behind remote
     ahead_count = 0
@@ -132,149 +460,172 @@ def get_git_info(path: str) -> dict:
                     pass
 
     # Recent commits
-    recent_commits: list[dict] = []
+    recent_commits: list[Commit] = []
     log_output = run_git(path, "log", "-10", "--format=%H|%aI|%s")
     if log_output:
         for line in log_output.splitlines():
             parts = line.split("|", 2)
             if len(parts) == 3:
-                recent_commits.append({
-                    "hash": parts[0],
-                    "date": parts[1],
-                    "message": parts[2],
-                })
+                recent_commits.append(Commit(parts[0], parts[1], parts[2]))
 
-    # Branch count
-    branch_output = run_git(path, "branch", "--list")
-    branch_count = len(branch_output.splitlines()) if branch_output else 0
+    # Branches: count and staleness from one for-each-ref
+    branch_count, stale_branches = get_branches(path, branch)
 
     # Stash count
     stash_output = run_git(path, "stash", "list")
     stash_count = len(stash_output.splitlines()) if stash_output else 0
 
-    return {
-        "isRepo": True,
-        "lastCommitDate": last_date,
-        "lastCommitMessage": last_msg,
-        "branch": branch,
-        "remoteUrl": remote,
-        "commitCount": commit_count,
-        "daysInactive": days_inactive,
-        "isDirty": is_dirty,
-        "untrackedCount": untracked,
-        "modifiedCount": modified,
-        "stagedCount": staged,
-        "ahead": ahead_count,
-        "behind": behind_count,
-        "recentCommits": recent_commits,
-        "branchCount": branch_count,
-        "stashCount": stash_count,
-    }
-
-
-def detect_languages(path: str) -> dict:
-    detected: list[str] = []
-    primary = None
-
-    for indicator, lang in LANGUAGE_INDICATORS.items():
-        if (Path(path) / indicator).exists():
-            if lang not in detected:
-                detected.append(lang)
-            if primary is None:
-                primary = lang
-
-    if (Path(path) / "tsconfig.json").exists():
-        if "JavaScript/TypeScript" in detected:
-            primary = "TypeScript"
-        elif "TypeScript" not in detected:
-            detected.append("TypeScript")
-            if primary is None:
-                primary = "TypeScript"
-
-    return {"primary": primary, "detected": detected}
-
-
-def check_files(path: str) -> dict:
-    p = Path(path)
-    has_tests = any(
-        (p / d).exists()
-        for d in ["tests", "test", "__tests__", "spec", "src/tests", "src/__tests__"]
-    ) or bool(list(p.glob("*test*")))
-
-    has_linter = any(
-        (p / f).exists()
-        for f in [
-            ".eslintrc", ".eslintrc.js", ".eslintrc.json", ".eslintrc.yml",
-            "eslint.config.js", "eslint.config.mjs", "eslint.config.ts",
-            ".prettierrc", ".prettierrc.js", ".prettierrc.json",
-            "biome.json", "biome.jsonc",
-            ".flake8", ".pylintrc", "pyproject.toml",
-            ".rubocop.yml", "rustfmt.toml",
-        ]
+    return GitInfo(
+        is_repo=True,
+        last_commit_date=last_date,
+        last_commit_message=last_msg,
+        branch=branch,
+        remote_url=remote,
+        commit_count=commit_count,
+        days_inactive=days_inactive,
+        is_dirty=tree.dirty,
+        untracked_count=tree.untracked,
+        modified_count=tree.modified,
+        staged_count=tree.staged,
+        ahead=ahead_count,
+        behind=behind_count,
+        recent_commits=recent_commits,
+        branch_count=branch_count,
+        stash_count=stash_count,
+        stale_branches=stale_branches,
+        untracked_truncated=tree.truncated,
+        status_timed_out=tree.timed_out,
     )
 
-    has_lockfile = any((p / f).exists() for f, _ in LOCKFILE_MAP)
-
-    return {
-        "readme": (p / "README.md").exists() or (p / "readme.md").exists(),
-        "tests": has_tests,
-        "env": (p / ".env").exists(),
-        "envExample": (p / ".env.example").exists(),
-        "dockerfile": (p / "Dockerfile").exists(),
-        "dockerCompose": (
-            (p / "docker-compose.yml").exists()
-            or (p / "docker-compose.yaml").exists()
-            or (p / "compose.yml").exists()
-        ),
-        "linterConfig": has_linter,
-        "license": detect_license(path),
-        "lockfile": has_lockfile,
-    }
 
+def detectors() -> DetectorRegistry:
+    """Built-in plus settings "detectors", compiled once per settings load."""
+    return compiled_registry(load_settings().get("detectors"))
 
-def check_cicd(path: str) -> dict:
-    p = Path(path)
-    return {
-        "githubActions": (p / ".github" / "workflows").exists(),
-        "circleci": (p / ".circleci").exists(),
-        "travis": (p / ".travis.yml").exists(),
-        "gitlabCi": (p / ".gitlab-ci.yml").exists(),
-    }
 
+def detect_languages(path: str, listing: RootListing | None = None) -> Languages:
+    primary, detected = detectors().languages_in(listing or RootListing(path))
+    return Languages(primary, detected)
 
-def check_deployment(path: str) -> dict:
-    p = Path(path)
-    return {
-        "fly": (p / "fly.toml").exists(),
-        "vercel": (p / "vercel.json").exists(),
-        "netlify": (p / "netlify.toml").exists(),
-    }
+
+def check_files(path: str, listing: RootListing | None = None) -> Files:
+    flags = detectors().flags(listing or RootListing(path))
+    return Files(
+        readme="readme" in flags,
+        tests="tests" in flags,
+        env="env" in flags,
+        env_example="envExample" in flags,
+        dockerfile="dockerfile" in flags,
+        docker_compose="dockerCompose" in flags,
+        linter_config="linterConfig" in flags,
+        license="license" in flags,
+        lockfile="lockfile" in flags,
+    )
 
 
-def count_todos(path: str) -> tuple[int, int, int]:
-    """Walk source files, counting TODOs, FIXMEs, and total lines of code."""
-    todo_count = 0
-    fixme_count = 0
-    loc_count = 0
+def check_cicd(path: str, listing: RootListing | None = None) -> Cicd:
+    flags = detectors().flags(listing or RootListing(path))
+    return Cicd(
+        github_actions="githubActions" in flags,
+        circleci="circleci" in flags,
+        travis="travis" in flags,
+        gitlab_ci="gitlabCi" in flags,
+    )
+
+
+def check_deployment(path: str, listing: RootListing | None = None) -> Deployment:
+    flags = detectors().flags(listing or RootListing(path))
+    return Deployment(
+        fly="fly" in flags,
+        vercel="vercel" in flags,
+        netlify="netlify" in flags,
+    )
+
+
+class SourceCounts:
+    """TODO/FIXME/line totals from one source walk, split by package prefix."""
+
+    __slots__ = ("todo", "fixme", "loc", "by_package", "skipped")
+
+    def __init__(self) -> None:
+        self.todo = 0
+        self.fixme = 0
+        self.loc = 0
+        # package path (relative, POSIX) -> [todo, fixme, loc]
+        self.by_package: dict[str, list[int]] = {}
+        self.skipped = SkipTally()
+
+    def skipped_files(self) -> SkippedFiles:
+        tally = self.skipped
+        return SkippedFiles(*(SkipStat(tally.files[r], tally.bytes[r]) for r in SKIP_REASONS))
+
+
+def count_source(path: str, packages: list[str] = (), policy: SkipPolicy = DEFAULT_POLICY) -> SourceCounts:
+    """Walk source files once, attributing counts to the deepest enclosing package.
+
+    Files the skip policy rejects (too large, binary, generated, minified) are
+    tallied in ``skipped`` instead of being read in full.
+    """
+    counts = SourceCounts()
+    package_set = set(packages)
+    for package in packages:
+        counts.by_package[package] = [0, 0, 0]
+    # Owning package per visited directory; os.walk is top-down, so a child
+    # inherits its parent's owner unless it is itself a package root.
+    owners: dict[str, str | None] = {path: None}
 
     for root, dirs, files in os.walk(path):
         dirs[:] = [d for d in dirs if d not in SKIP_WALK_DIRS]
+        owner = owners.pop(root, None)
+        if package_set:
+            for d in dirs:
+                child = os.path.join(root, d)
+                rel = os.path.relpath(child, path).replace(os.sep, "/")
+                owners[child] = rel if rel in package_set else owner
+        bucket = counts.by_package[owner] if owner is not None else None
+
         for fname in files:
             if Path(fname).suffix not in SOURCE_EXTENSIONS:
                 continue
-            fpath = os.path.join(root, fname)
-            try:
-                with open(fpath, "r", errors="ignore") as f:
-                    for line in f:
-                        loc_count += 1
-                        if "TODO" in line:
-                            todo_count += 1
-                        if "FIXME" in line:
-                            fixme_count += 1
-            except (PermissionError, OSError):
+            data = read_source(os.path.join(root, fname), policy, counts.skipped)
+            if data is None:
                 continue
-
-    return todo_count, fixme_count, loc_count
+            loc = data.count(b"\n") + (bool(data) and not data.endswith(b"\n"))
+            todo = fixme = 0
+            if b"TODO" in data or b"FIXME" in data:
+                for line in data.split(b"\n"):
+                    if b"TODO" in line:
+                        todo += 1
+                    if b"FIXME" in line:
+                        fixme += 1
+            counts.todo += todo
+            counts.fixme += fixme
+            counts.loc += loc
+            if bucket is not None:
+                bucket[0] += todo
+                bucket[1] += fixme
+                bucket[2] += loc
+
+    return counts
+
+
+def detect_workspaces(path: str, packages: list[str], counts: SourceCounts) -> list[Workspace]:
+    """Per-package sub-records for a monorepo root, using the root walk's counts."""
+    workspaces: list[Workspace] = []
+    for rel in packages:
+        package_path = os.path.join(path, *rel.split("/"))
+        todo, fixme, loc = counts.by_package[rel]
+        workspaces.append(Workspace(
+            name=package_name(package_path) or rel,
+            path=rel,
+            language=detect_languages(package_path).primary,
+            framework=detect_framework(package_path),
+            scripts=detect_scripts(package_path),
+            todo_count=todo,
+            fixme_count=fixme,
+            loc_estimate=loc,
+        ))
+    return workspaces
 
 
 def get_description(path: str) -> str | None:
@@ -356,17 +707,6 @@ ENV_KEY_PREFIXES: list[tuple[str, str]] = [
     ("ANTHROPIC_", "anthropic"),
 ]
 
-LOCKFILE_MAP: list[tuple[str, str]] = [
-    ("pnpm-lock.yaml", "pnpm"),
-    ("package-lock.json", "npm"),
-    ("yarn.lock", "yarn"),
-    ("bun.lockb", "bun"),
-    ("Cargo.lock", "cargo"),
-    ("uv.lock", "uv"),
-    ("poetry.lock", "poetry"),
-    ("Pipfile.lock", "pipenv"),
-]
-
 
 def _read_json(path: str) -> dict | None:
     """Read a JSON file, returning None on any error."""
@@ -470,34 +810,27 @@ def detect_services(path: str) -> list[str]:
     return sorted(services)
 
 
-def detect_package_manager(path: str) -> str | None:
+def detect_package_manager(path: str, listing: RootListing | None = None) -> str | None:
     """Detect package manager from lockfiles."""
-    p = Path(path)
-    for filename, manager in LOCKFILE_MAP:
-        if (p / filename).exists():
-            return manager
-    return None
+    return detectors().package_manager(listing or RootListing(path))
 
 
-def detect_license(path: str) -> bool:
-    """Check for LICENSE or LICENSE.md."""
-    p = Path(path)
-    return (p / "LICENSE").exists() or (p / "LICENSE.md").exists()
-
-
-def has_language_indicators(path: str) -> bool:
+def has_language_indicators(path: str, listing: RootListing | None = None) -> bool:
     """Check if a directory contains any language indicator files."""
-    return any((Path(path) / f).exists() for f in LANGUAGE_INDICATORS)
+    return detectors().has_language_indicators(listing or RootListing(path))
 
 
-def scan_project(abs_path: str) -> dict:
+def scan_project(abs_path: str, root_commits: dict[str, list[str]] | None = None) -> Project:
     name = os.path.basename(abs_path)
     git_info = get_git_info(abs_path)
-    languages = detect_languages(abs_path)
-    files = check_files(abs_path)
-    cicd = check_cicd(abs_path)
-    deployment = check_deployment(abs_path)
-    todo_count, fixme_count, loc_estimate = count_todos(abs_path)
+    # One scandir of the root answers every root-level detector below.
+    listing = RootListing(abs_path)
+    languages = detect_languages(abs_path, listing)
+    files = check_files(abs_path, listing)
+    cicd = check_cicd(abs_path, listing)
+    deployment = check_deployment(abs_path, listing)
+    packages = find_workspace_packages(abs_path, SKIP_WALK_DIRS)
+    counts = count_source(abs_path, packages, SkipPolicy.from_settings(load_settings().get("scanSkipPolicy")))
     description = get_description(abs_path)
     framework = detect_framework(abs_path)
     live_url = None
@@ -508,44 +841,42 @@ def scan_project(abs_path: str) -> dict:
             live_url = homepage.strip()
     scripts = detect_scripts(abs_path)
     services = detect_services(abs_path)
-    package_manager = detect_package_manager(abs_path)
-    license_found = detect_license(abs_path)
-
-    return {
-        "name": name,
-        "path": abs_path,
-        "pathHash": path_hash(abs_path),
-        **git_info,
-        "languages": languages,
-        "files": files,
-        "cicd": cicd,
-        "deployment": deployment,
-        "todoCount": todo_count,
-        "fixmeCount": fixme_count,
-        "description": description,
-        "framework": framework,
-        "liveUrl": live_url,
-        "scripts": scripts,
-        "services": services,
-        "locEstimate": loc_estimate,
-        "packageManager": package_manager,
-        "license": license_found,
-    }
-
-
-def main() -> None:
-    if len(sys.argv) < 3:
-        print("Usage: scan.py <dev_root> <exclude_csv>", file=sys.stderr)
-        sys.exit(1)
+    package_manager = detect_package_manager(abs_path, listing)
+    license_found = files.license
+
+    return Project(
+        name=name,
+        path=abs_path,
+        path_hash=path_hash(abs_path),
+        git=git_info,
+        languages=languages,
+        files=files,
+        cicd=cicd,
+        deployment=deployment,
+        todo_count=counts.todo,
+        fixme_count=counts.fixme,
+        description=description,
+        framework=framework,
+        live_url=live_url,
+        scripts=scripts,
+        services=services,
+        loc_estimate=counts.loc,
+        package_manager=package_manager,
+        license=license_found,
+        workspaces=detect_workspaces(abs_path, packages, counts),
+        identity_key=project_identity(
+            abs_path,
+            git_info.remote_url,
+            git_info.recent_commits[0].hash if git_info.recent_commits else None,
+            root_commits,
+        ),
+        skipped_files=counts.skipped_files(),
+    )
 
-    dev_root = os.path.expanduser(sys.argv[1])
-    exclude_dirs = set(d.strip() for d in sys.argv[2].split(",") if d.strip())
 
-    if not os.path.isdir(dev_root):
-        print(json.dumps({"error": f"{dev_root} not found"}))
-        sys.exit(1)
-
-    projects = []
+def list_project_dirs(dev_root: str, exclude_dirs: set[str]) -> list[str]:
+    """Top-level project folders under dev_root, sorted by name."""
+    paths: list[str] = []
     for entry in sorted(Path(dev_root).iterdir()):
         if not entry.is_dir():
             continue
@@ -555,17 +886,204 @@ def main() -> None:
             continue
         # Skip non-project folders unless they have language indicators or are git repos
         abs_path = str(entry)
-        if not (entry / ".git").exists() and not has_language_indicators(abs_path):
+        listing = RootListing(abs_path)
+        if ".git" not in listing and not has_language_indicators(abs_path, listing):
+            continue
+        paths.append(abs_path)
+    return paths
+
+
+def iter_scan(
+    paths: list[str], max_jobs: int, root_commits: dict[str, list[str]] | None = None
+) -> Iterator[tuple[int, Project]]:
+    """Scan projects concurrently, yielding (index, project) as each completes."""
+    global GIT_LIMIT
+    project_limit = AdaptiveLimit(initial=max(1, min(4, max_jobs)), maximum=max_jobs)
+    GIT_LIMIT = AdaptiveLimit(initial=max(1, min(4, max_jobs)), maximum=max_jobs) if max_jobs > 1 else None
+    try:
+        yield from run_adaptive(lambda path: scan_project(path, root_commits), paths, project_limit)
+    finally:
+        GIT_LIMIT = None
+
+
+def refresh(paths: list[str], max_jobs: int, state: ScanState | None) -> Iterator[Project | dict]:
+    """Yield results most-recently-active first.
+
+    With a state file, paused and archived projects whose fingerprint is
+    unchanged reuse their cached result (with daysInactive brought up to date)
+    until their cadence elapses; they are yielded after every fresh scan.
+    A project that was moved or renamed is recognized by its identityKey and
+    keeps its cached entry. With a state file every result is a plain dict,
+    the same object the state saves.
+    """
+    ordered = order_by_activity(paths)
+    reused: list[dict] = []
+    due: list[tuple[str, tuple[float, ...]]] = []
+    now = time.time()
+
+    if state is None:
+        due = ordered
+    else:
+        from derive import load_scorer
+        from rules import DEFAULT_SCORER, RuleError
+
+        try:
+            scorer = load_scorer()
+        except RuleError:
+            scorer = DEFAULT_SCORER
+        cadence = cadence_from_settings(load_settings().get("scanCadence"))
+        live = {path_hash(p) for p, _ in ordered}
+        orphans = state.identities(exclude=live)
+        for path, fingerprint in ordered:
+            key = path_hash(path)
+            entry = state.get(key)
+            if entry is None and orphans:
+                entry = _adopt_moved(state, path, key, fingerprint, orphans)
+            cached = entry.get("project") if entry else None
+            if isinstance(cached, dict):
+                cached["daysInactive"] = days_since(cached.get("lastCommitDate"))
+                if not is_due(entry.get("fingerprint"), entry.get("scannedAt"), fingerprint, scorer.status(cached), now, cadence):
+                    reused.append(cached)
+                    continue
+            due.append((path, fingerprint))
+
+    roots = state.root_commits if state is not None else None
+    for index, project in iter_scan([path for path, _ in due], max_jobs, roots):
+        if state is None:
+            yield project
             continue
-        projects.append(scan_project(abs_path))
+        # Converted once: the state keeps the dict and the output reuses it.
+        data = project.to_dict()
+        state.put(project.path_hash, due[index][1], now, data)
+        yield data
+    yield from reused
+
+    if state is not None:
+        state.retain({path_hash(p) for p in paths})
+        state.save()
+
+
+def _adopt_moved(
+    state: ScanState, path: str, key: str, fingerprint: tuple[float, ...], orphans: dict[str, str]
+) -> dict | None:
+    """Carry a moved or renamed project's state entry over to its new path."""
+    identity = project_identity(path, run_git(path, "remote", "get-url", "origin"))
+    old_key = orphans.pop(identity, None) if identity else None
+    if old_key is None:
+        return None
+    entry = state.move(old_key, key)
+    entry["project"].update(name=os.path.basename(path), path=path, pathHash=key)
+    # Moving a folder touches its own mtime; only the git files say whether
+    # the project itself changed.
+    entry["fingerprint"] = [fingerprint[0], *entry["fingerprint"][1:]]
+    return entry
+
+
+class ScanOptions:
+    """Command-line options beyond the two positional arguments."""
+
+    __slots__ = ("max_jobs", "low_priority", "state_path", "stream", "coalesce")
+
+    def __init__(self) -> None:
+        self.max_jobs = min(16, cpu_count() * 2)
+        self.low_priority = False
+        self.state_path: str | None = None
+        self.stream = False
+        self.coalesce = True
+
+
+USAGE = (
+    "Usage: scan.py <dev_root> <exclude_csv> [--jobs N] [--low-priority] [--state PATH] [--stream]"
+    " [--no-coalesce]"
+)
+
+
+def _parse_args(argv: list[str]) -> tuple[list[str], ScanOptions] | None:
+    """Split argv into positionals and ScanOptions; None on a malformed flag."""
+    positionals: list[str] = []
+    options = ScanOptions()
+    args = iter(argv)
+    for arg in args:
+        name, _, inline = arg.partition("=")
+        if arg == "--low-priority":
+            options.low_priority = True
+        elif arg == "--stream":
+            options.stream = True
+        elif arg == "--no-coalesce":
+            options.coalesce = False
+        elif name in ("--jobs", "--state"):
+            value = inline if "=" in arg else next(args, "")
+            if name == "--state":
+                if not value:
+                    return None
+                options.state_path = os.path.expanduser(value)
+            elif not value.isdigit() or int(value) < 1:
+                return None
+            else:
+                options.max_jobs = int(value)
+        else:
+            positionals.append(arg)
+    if len(positionals) < 2:
+        return None
+    return positionals, options
 
-    output = {
-        "scannedAt": datetime.now(timezone.utc).isoformat(),
-        "projectCount": len(projects),
-        "projects": projects,
-    }
 
-    print(json.dumps(output, indent=2))
+def _write_event(event: dict) -> None:
+    sys.stdout.write(dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def scan_output(dev_root: str, exclude_dirs: set[str], options: ScanOptions) -> str:
+    """Scan the dev root and return the serialized ScanOutput.
+
+    With --stream, each project is also written as an NDJSON event as soon as
+    it is ready (hottest first); the returned document is sorted by name.
+    """
+    scanned_at = datetime.now(timezone.utc).isoformat()
+    state = ScanState.load(options.state_path) if options.state_path else None
+    projects: list[Project | dict] = []
+    for project in refresh(list_project_dirs(dev_root, exclude_dirs), options.max_jobs, state):
+        if options.stream:
+            _write_event({"type": "project", "project": project})
+        projects.append(project)
+    projects.sort(key=lambda p: p.name if isinstance(p, Project) else p["name"])
+    return dumps(ScanOutput(scanned_at, projects))
+
+
+def main() -> None:
+    parsed = _parse_args(sys.argv[1:])
+    if parsed is None:
+        print(USAGE, file=sys.stderr)
+        sys.exit(1)
+    positionals, options = parsed
+
+    dev_root = os.path.expanduser(positionals[0])
+    exclude_dirs = set(d.strip() for d in positionals[1].split(",") if d.strip())
+
+    if not os.path.isdir(dev_root):
+        print(json.dumps({"error": f"{dev_root} not found"}))
+        sys.exit(1)
+
+    if options.low_priority:
+        lower_priority()
+
+    def run() -> str:
+        return scan_output(dev_root, exclude_dirs, options)
+
+    if options.coalesce:
+        text, led = single_flight(flight_key(dev_root, exclude_dirs), run)
+    else:
+        text, led = run(), True
+
+    if not options.stream:
+        sys.stdout.write(text + "\n")
+        return
+    output = json.loads(text)
+    if not led:
+        # Attached to another run: its projects arrive all at once.
+        for project in output["projects"]:
+            _write_event({"type": "project", "project": project})
+    _write_event({"type": "done", "scannedAt": output["scannedAt"], "projectCount": output["projectCount"]})
 
 
 if __name__ == "__main__":
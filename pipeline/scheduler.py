@@ -0,0 +1,286 @@
+"""
+Adaptive scheduling for scan work.
+
+A refresh usually runs on a developer laptop next to builds and editors, so a
+fixed degree of parallelism is either too timid or too greedy. ``AdaptiveLimit``
+is a resizable semaphore whose capacity follows two signals:
+
+  - latency: per-task wall time compared with the best recently observed
+    (a gradient in the style of TCP Vegas); rising latency means the disk or
+    git is saturated, so the limit shrinks.
+  - load: the 1-minute load average per CPU; above the target the limit is
+    cut multiplicatively, below it the limit grows additively.
+
+``scan.py`` uses one limit for in-flight projects and one for git processes.
+Projects differ too much in size for their wall time to be a useful signal,
+so the project limit follows load only; git calls are uniform enough that the
+git limit follows both.
+``lower_priority`` optionally drops the scan to background CPU and I/O
+priority; child git processes inherit it.
+
+Refresh cadence: ``activity_fingerprint`` captures the mtimes that move when
+a project is worked on (its directory, ``.git/index``, ``.git/HEAD`` and
+``.git/logs/HEAD``). Projects are scanned most-recently-active first, and
+``is_due`` lets paused and archived projects (per derive's status tiers) reuse
+their previous result until either their cadence elapses or the fingerprint
+changes.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Load average per CPU above which concurrency backs off.
+LOAD_TARGET_PER_CPU = 0.9
+# Latency may exceed the baseline by this factor before the limit shrinks.
+LATENCY_TOLERANCE = 1.5
+# Re-evaluate the limit at most this often (seconds).
+ADJUST_INTERVAL = 0.25
+
+# Paths under .git whose mtimes move on staging, commits and checkouts.
+GIT_ACTIVITY_FILES: tuple[str, ...] = ("index", "HEAD", "logs/HEAD")
+
+# Minimum seconds between rescans of an unchanged project, by status.
+DEFAULT_CADENCE: dict[str, float] = {
+    "active": 0,
+    "completed": 0,
+    "paused": 6 * 3600,
+    "archived": 7 * 86400,
+}
+
+
+def cadence_from_settings(overrides: object) -> dict[str, float]:
+    """DEFAULT_CADENCE with a settings "scanCadence" object applied.
+
+    Only known statuses with non-negative numbers of seconds are taken; any
+    other key or value keeps the default.
+    """
+    cadence = dict(DEFAULT_CADENCE)
+    if isinstance(overrides, dict):
+        for status, seconds in overrides.items():
+            if status in cadence and isinstance(seconds, (int, float)) and not isinstance(seconds, bool) and seconds >= 0:
+                cadence[status] = seconds
+    return cadence
+
+
+def cpu_count() -> int:
+    return os.cpu_count() or 1
+
+
+def load_per_cpu() -> float | None:
+    """1-minute load average divided by CPU count, or None where unsupported."""
+    try:
+        return os.getloadavg()[0] / cpu_count()
+    except (AttributeError, OSError):
+        return None
+
+
+class AdaptiveLimit:
+    """Semaphore whose capacity adapts to observed latency and system load."""
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int | None = None,
+        load_fn: Callable[[], float | None] = load_per_cpu,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._load_fn = load_fn
+        self._clock = clock
+        self._baseline: float | None = None
+        self._smoothed: float | None = None
+        self._last_adjust = clock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float | None = None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if latency is not None:
+                self._record(latency)
+            self._maybe_adjust()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one unit of capacity; the time spent inside is the latency sample."""
+        self.acquire()
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.release(self._clock() - start)
+
+    def _record(self, latency: float) -> None:
+        if self._smoothed is None:
+            self._smoothed = latency
+        else:
+            self._smoothed = 0.8 * self._smoothed + 0.2 * latency
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Let the baseline drift up slowly so one lucky sample can't pin it.
+            self._baseline *= 1.01
+
+    def _maybe_adjust(self) -> None:
+        now = self._clock()
+        if now - self._last_adjust < ADJUST_INTERVAL:
+            return
+        self._last_adjust = now
+
+        limit = self._limit
+        load = self._load_fn()
+        if load is not None and load > LOAD_TARGET_PER_CPU:
+            limit *= 0.75
+        elif self._baseline and self._smoothed:
+            gradient = min(1.0, LATENCY_TOLERANCE * self._baseline / self._smoothed)
+            if gradient < 1.0:
+                limit *= max(0.5, gradient)
+            else:
+                limit += max(1.0, math.sqrt(limit)) / limit
+        else:
+            limit += 1.0 / limit
+        self._limit = min(max(limit, float(self.minimum)), float(self.maximum))
+
+
+def run_adaptive(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    limit: AdaptiveLimit,
+) -> Iterator[tuple[int, R]]:
+    """Apply ``fn`` to ``items`` with at most ``limit.limit`` calls in flight.
+
+    Yields ``(index, result)`` pairs in completion order.
+    """
+    items = list(items)
+    if not items:
+        return
+    if limit.maximum == 1:
+        for index, item in enumerate(items):
+            yield index, fn(item)
+        return
+
+    # Imported here: a warm refresh with nothing due never needs a pool.
+    from concurrent.futures import ThreadPoolExecutor
+
+    done: deque[tuple[int, R | None, BaseException | None]] = deque()
+    ready = threading.Condition()
+
+    def task(index: int, item: T) -> None:
+        limit.acquire()
+        try:
+            outcome = (index, fn(item), None)
+        except BaseException as exc:  # re-raised in the caller's thread
+            outcome = (index, None, exc)
+        finally:
+            limit.release()
+        with ready:
+            done.append(outcome)
+            ready.notify()
+
+    with ThreadPoolExecutor(max_workers=limit.maximum) as pool:
+        for index, item in enumerate(items):
+            pool.submit(task, index, item)
+        for _ in range(len(items)):
+            with ready:
+                while not done:
+                    ready.wait()
+                index, result, error = done.popleft()
+            if error is not None:
+                raise error
+            yield index, result  # type: ignore[misc]
+
+
+def lower_priority() -> None:
+    """Drop this process (and children it spawns) to background CPU/I/O priority.
+
+    Best effort: unsupported platforms and permission errors are ignored.
+    """
+    darwin_bg = getattr(os, "PRIO_DARWIN_BG", None)
+    if darwin_bg is not None:
+        try:
+            # macOS: background band lowers CPU, I/O and network priority at once.
+            os.setpriority(os.PRIO_DARWIN_PROCESS, 0, darwin_bg)
+            return
+        except OSError:
+            pass
+
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+    import shutil
+    import subprocess
+
+    ionice = shutil.which("ionice")
+    if ionice:
+        try:
+            subprocess.run(
+                [ionice, "-c", "3", "-p", str(os.getpid())],
+                capture_output=True,
+                timeout=2,
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+
+
+def activity_fingerprint(path: str) -> tuple[float, ...]:
+    """Mtimes of the project dir and its git activity files (0.0 if missing)."""
+    stamps: list[float] = []
+    for rel in ("", *(os.path.join(".git", f) for f in GIT_ACTIVITY_FILES)):
+        try:
+            stamps.append(os.stat(os.path.join(path, rel) if rel else path).st_mtime)
+        except OSError:
+            stamps.append(0.0)
+    return tuple(stamps)
+
+
+def order_by_activity(paths: Iterable[str]) -> list[tuple[str, tuple[float, ...]]]:
+    """Pair each path with its fingerprint, most recently active first."""
+    pairs = [(p, activity_fingerprint(p)) for p in paths]
+    pairs.sort(key=lambda pair: (-max(pair[1]), pair[0]))
+    return pairs
+
+
+def is_due(
+    previous_fingerprint: tuple[float, ...] | None,
+    previous_scan_time: float | None,
+    fingerprint: tuple[float, ...],
+    status: str | None,
+    now: float,
+    cadence: dict[str, float] = DEFAULT_CADENCE,
+) -> bool:
+    """Whether a project needs a fresh scan rather than its cached result."""
+    if previous_fingerprint is None or previous_scan_time is None or status is None:
+        return True
+    if tuple(previous_fingerprint) != fingerprint:
+        return True
+    return now - previous_scan_time >= cadence.get(status, 0)
@@ -0,0 +1,36 @@
+"""
+Read-only access to the app's settings.json for the pipeline scripts.
+
+Mirrors src/lib/app-paths.ts: settings live in $APP_DATA_DIR when the CLI
+launcher sets it, otherwise in the current working directory. A missing or
+unreadable file yields an empty dict, like getSettings() on the TS side.
+"""
+
+import json
+import os
+
+_cache: dict | None = None
+
+
+def settings_path() -> str:
+    # os.path rather than pathlib: derive.py imports this and nothing else
+    # on its startup path needs pathlib.
+    data_dir = os.environ.get("APP_DATA_DIR") or os.getcwd()
+    return os.path.join(data_dir, "settings.json")
+
+
+def load_settings() -> dict:
+    global _cache
+    if _cache is None:
+        try:
+            with open(settings_path()) as f:
+                data = json.load(f)
+            _cache = data if isinstance(data, dict) else {}
+        except (json.JSONDecodeError, OSError):
+            _cache = {}
+    return _cache
+
+
+def clear_settings_cache() -> None:
+    global _cache
+    _cache = None
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Startup cost of the pipeline entry points, measured with python -X importtime.
+
+The UI runs scan.py and derive.py as short-lived processes, so import time is
+paid on every refresh. For each entry point this imports the module in a
+fresh interpreter several times and reports the median cumulative import
+time, the number of modules loaded, and any DEFERRED module that was
+imported anyway.
+
+DEFERRED lists what an entry point must not load at import: scan-side code
+for derive.py, and for scan.py the modules only some runs need (a refresh
+served from --state starts no git process and no thread pool). Those are
+imported inside the functions that use them. The deferred lists are exact
+and machine-independent, which is what test_startup.py checks; the timings
+are for tracking, with --budget ms limits for CI machines that are stable
+enough to enforce them.
+
+Usage:
+    python3 startup.py [--runs N] [--budget derive=20,scan=40]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINTS: tuple[str, ...] = ("derive", "scan")
+DEFAULT_RUNS = 7
+
+DEFERRED: dict[str, frozenset[str]] = {
+    "derive": frozenset({
+        "scan", "detectors", "sourcefiles", "records", "state", "scheduler", "flight", "workspaces",
+        "subprocess", "hashlib", "datetime", "pathlib", "typing", "tempfile", "urllib.parse",
+        "concurrent.futures",
+    }),
+    "scan": frozenset({"subprocess", "concurrent.futures", "derive", "rules"}),
+}
+
+
+def import_profile(module: str) -> dict[str, int]:
+    """Cumulative import time (us) of every module loaded by ``import module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PIPELINE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # the header line
+        profile[fields[2].strip()] = int(fields[1])
+    return profile
+
+
+def measure(module: str, runs: int = DEFAULT_RUNS) -> dict:
+    """Median startup of one entry point over ``runs`` fresh interpreters."""
+    profiles = [import_profile(module) for _ in range(runs)]
+    last = profiles[-1]
+    return {
+        "module": module,
+        "importMs": round(statistics.median(p.get(module, 0) for p in profiles) / 1000, 2),
+        "modules": len(last),
+        "deferredImported": sorted(DEFERRED.get(module, frozenset()) & last.keys()),
+    }
+
+
+def _parse_budget(value: str) -> dict[str, float] | None:
+    budget: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, limit = part.partition("=")
+        try:
+            budget[name.strip()] = float(limit)
+        except ValueError:
+            return None
+    return budget if budget.keys() <= set(ENTRY_POINTS) else None
+
+
+USAGE = "Usage: startup.py [--runs N] [--budget derive=20,scan=40]"
+
+
+def main() -> None:
+    runs, budget = DEFAULT_RUNS, {}
+    args = iter(sys.argv[1:])
+    for arg in args:
+        name, _, inline = arg.partition("=")
+        value = inline if "=" in arg and name in ("--runs", "--budget") else next(args, "")
+        if name == "--runs" and value.isdigit() and int(value) > 0:
+            runs = int(value)
+        elif name == "--budget" and _parse_budget(value) is not None:
+            budget = _parse_budget(value)
+        else:
+            print(USAGE, file=sys.stderr)
+            sys.exit(1)
+
+    results = [measure(module, runs) for module in ENTRY_POINTS]
+    failures = [f"{r['module']} imports deferred modules: {', '.join(r['deferredImported'])}" for r in results if r["deferredImported"]]
+    failures += [
+        f"{r['module']} startup {r['importMs']}ms over budget {budget[r['module']]}ms"
+        for r in results
+        if r["module"] in budget and r["importMs"] > budget[r["module"]]
+    ]
+    print(json.dumps({"runs": runs, "entryPoints": results, "failures": failures}, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
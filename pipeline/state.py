@@ -0,0 +1,103 @@
+"""
+Persistent per-project scan state, shared between refreshes.
+
+The state file maps each project's pathHash to the fingerprint and time of
+its last scan and the scan result itself, so unchanged cold projects can be
+re-emitted without rescanning. Entries of projects that have disappeared can
+be found by their identityKey and moved to the project's new pathHash.
+
+Alongside, rootCommits maps pathHash to [HEAD sha, root commit], so the
+history walk behind identityKey runs once per HEAD rather than on every
+scan. Writes go to a temp file and are renamed into place, so a crashed or
+concurrent writer never leaves a truncated file.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+STATE_VERSION = 6
+
+
+class ScanState:
+    """Load, query and atomically save the scan state file."""
+
+    def __init__(
+        self,
+        path: str,
+        entries: dict[str, dict] | None = None,
+        root_commits: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = entries if entries is not None else {}
+        self.root_commits: dict[str, list[str]] = root_commits if root_commits is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "ScanState":
+        """Read state from ``path``; a missing, corrupt or older file starts empty."""
+        try:
+            data = json.loads(Path(path).read_text())
+        except (json.JSONDecodeError, OSError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return cls(path)
+        entries = data.get("projects")
+        roots = data.get("rootCommits")
+        return cls(
+            path,
+            entries if isinstance(entries, dict) else {},
+            {k: v for k, v in roots.items() if isinstance(v, list) and len(v) == 2} if isinstance(roots, dict) else {},
+        )
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def put(self, key: str, fingerprint: tuple[float, ...], scanned_at: float, project: dict) -> None:
+        self.entries[key] = {
+            "fingerprint": list(fingerprint),
+            "scannedAt": scanned_at,
+            "project": project,
+        }
+
+    def identities(self, exclude: set[str]) -> dict[str, str]:
+        """identityKey -> pathHash for entries whose key isn't in ``exclude``."""
+        found: dict[str, str] = {}
+        for key, entry in self.entries.items():
+            project = entry.get("project")
+            identity = project.get("identityKey") if isinstance(project, dict) else None
+            if key not in exclude and isinstance(identity, str):
+                found.setdefault(identity, key)
+        return found
+
+    def move(self, old_key: str, new_key: str) -> dict:
+        """Re-key an entry (a moved or renamed project) and return it."""
+        entry = self.entries.pop(old_key)
+        self.entries[new_key] = entry
+        if old_key in self.root_commits:
+            self.root_commits[new_key] = self.root_commits.pop(old_key)
+        return entry
+
+    def retain(self, keys: set[str]) -> None:
+        """Drop entries for projects that no longer exist under the root."""
+        for key in [k for k in self.entries if k not in keys]:
+            del self.entries[key]
+        for key in [k for k in self.root_commits if k not in keys]:
+            del self.root_commits[key]
+
+    def save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".scan-state-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                # json.dumps, not json.dump: only the one-shot form uses the C encoder.
+                data = {"version": STATE_VERSION, "projects": self.entries, "rootCommits": self.root_commits}
+                f.write(json.dumps(data, separators=(",", ":")))
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
@@ -145,6 +145,15 @@ class TestDeriveMomentumScore:
         _, breakdown = derive_momentum_score(project)
         assert "lowBranches" not in breakdown
 
+    def test_stale_branch_count_takes_precedence(self) -> None:
+        """Many branches are fine as long as few of them are stale."""
+        project = {"branchCount": 10, "staleBranchCount": 1, "daysInactive": 100}
+        _, breakdown = derive_momentum_score(project)
+        assert breakdown["lowBranches"] == 10
+        project = {"branchCount": 5, "staleBranchCount": 4, "daysInactive": 100}
+        _, breakdown = derive_momentum_score(project)
+        assert "lowBranches" not in breakdown
+
     def test_none_days_inactive(self) -> None:
         """daysInactive=None gives no recency points."""
         project = {"daysInactive": None}
@@ -0,0 +1,114 @@
+"""Tests for detectors.py root listings and the compiled detector registry."""
+
+import os
+from pathlib import Path
+
+import pytest
+import settings
+from detectors import DetectorRegistry, RootListing
+from scan import check_cicd, check_files, detect_languages, detect_package_manager
+
+
+def _touch(root: Path, *names: str) -> None:
+    for name in names:
+        target = root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.touch()
+
+
+class TestRootListing:
+    def test_names_and_dirs(self, tmp_path: Path) -> None:
+        _touch(tmp_path, "package.json", "src/index.ts")
+        listing = RootListing(str(tmp_path))
+        assert listing.names == {"package.json", "src"}
+        assert listing.dirs == {"src"}
+
+    def test_nested_lookup_lists_parent_only_if_it_is_a_dir(self, tmp_path: Path) -> None:
+        _touch(tmp_path, ".github/workflows/ci.yml", "src")
+        listing = RootListing(str(tmp_path))
+        assert ".github/workflows" in listing
+        assert "src/tests" not in listing
+        assert ".github/dependabot.yml" not in listing
+        assert list(listing._children) == [".github"]
+
+    def test_missing_directory_is_empty(self, tmp_path: Path) -> None:
+        assert not RootListing(str(tmp_path / "gone")).names
+
+    def test_case_variants_follow_the_filesystem(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        _touch(tmp_path, "Readme.md", "license", "Src/Tests/a.py")
+        listing = RootListing(str(tmp_path))
+        assert "README.md" not in listing and "src/tests" not in listing
+
+        # A case-insensitive volume (the macOS default) resolves any case.
+        def exists_folded(path: str) -> bool:
+            parent, name = os.path.split(path)
+            return any(entry.lower() == name.lower() for entry in os.listdir(parent))
+
+        monkeypatch.setattr(os.path, "exists", exists_folded)
+        monkeypatch.setattr(os.path, "isdir", exists_folded)
+        listing = RootListing(str(tmp_path))
+        assert "README.md" in listing and "LICENSE" in listing
+        assert "Dockerfile" not in listing
+        assert DetectorRegistry().flags(listing) == {"readme", "license"}
+
+
+class TestDetectorRegistry:
+    def test_builtin_flags(self, tmp_path: Path) -> None:
+        _touch(tmp_path, "README.md", "yarn.lock", "src/__tests__/a.test.ts", "fly.toml", ".circleci/config.yml")
+        flags = DetectorRegistry().flags(RootListing(str(tmp_path)))
+        assert flags == {"readme", "lockfile", "tests", "fly", "circleci"}
+
+    def test_test_named_entry_counts_as_tests(self, tmp_path: Path) -> None:
+        _touch(tmp_path, "pytest.ini")
+        assert "tests" in DetectorRegistry().flags(RootListing(str(tmp_path)))
+
+    def test_languages_keep_indicator_order(self, tmp_path: Path) -> None:
+        _touch(tmp_path, "go.mod", "requirements.txt", "setup.py", "tsconfig.json")
+        primary, detected = DetectorRegistry().languages_in(RootListing(str(tmp_path)))
+        assert (primary, detected) == ("Python", ["Python", "Go", "TypeScript"])
+
+    def test_settings_add_detectors(self, tmp_path: Path) -> None:
+        _touch(tmp_path, "deno.json", "deno.lock", ".golangci.yml", ".forgejo/workflows/ci.yml")
+        registry = DetectorRegistry.from_settings({
+            "languages": {"deno.json": "TypeScript"},
+            "lockfiles": {"deno.lock": "deno"},
+            "flags": {"linterConfig": [".golangci.yml"], "githubActions": [".forgejo/workflows"]},
+        })
+        listing = RootListing(str(tmp_path))
+        assert registry.languages_in(listing) == ("TypeScript", ["TypeScript"])
+        assert registry.package_manager(listing) == "deno"
+        assert registry.flags(listing) == {"linterConfig", "githubActions", "lockfile"}
+
+    def test_builtins_win_and_bad_entries_are_ignored(self, tmp_path: Path) -> None:
+        _touch(tmp_path, "setup.py")
+        registry = DetectorRegistry.from_settings({
+            "languages": {"setup.py": "Cobol", "x": 1},
+            "flags": {"unknownFlag": ["setup.py"], "readme": "setup.py"},
+        })
+        listing = RootListing(str(tmp_path))
+        assert registry.languages_in(listing) == ("Python", ["Python"])
+        assert registry.flags(listing) == set()
+
+    @pytest.mark.parametrize("overrides", [None, [], "x", {"languages": []}])
+    def test_malformed_settings_keep_builtins(self, overrides: object) -> None:
+        assert DetectorRegistry.from_settings(overrides).languages == DetectorRegistry().languages
+
+
+class TestScanUsesSettings:
+    def test_detectors_from_settings_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        data_dir, project = tmp_path / "data", tmp_path / "project"
+        data_dir.mkdir()
+        (data_dir / "settings.json").write_text(
+            '{"detectors": {"lockfiles": {"deno.lock": "deno"}, "flags": {"githubActions": [".forgejo/workflows"]}}}'
+        )
+        _touch(project, "package.json", "deno.lock", ".forgejo/workflows/ci.yml")
+        monkeypatch.setenv("APP_DATA_DIR", str(data_dir))
+        settings.clear_settings_cache()
+        try:
+            path = str(project)
+            assert detect_package_manager(path) == "deno"
+            assert check_files(path).lockfile
+            assert check_cicd(path).github_actions
+            assert detect_languages(path).primary == "JavaScript/TypeScript"
+        finally:
+            settings.clear_settings_cache()
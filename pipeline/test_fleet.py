@@ -0,0 +1,134 @@
+"""Tests for fleet.py aggregate statistics and derive.py --fleet output."""
+
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from derive import derive_project
+from fleet import FleetStats, QuantileSketch
+
+FIXTURES = Path(__file__).parent / "fixtures"
+DERIVE = str(Path(__file__).parent / "derive.py")
+
+
+def _fixture_projects() -> list[dict]:
+    return json.loads((FIXTURES / "scan-input-synthetic.json").read_text())["projects"]
+
+
+def _fleet(projects: list[dict]) -> FleetStats:
+    stats = FleetStats()
+    for project in projects:
+        stats.add(project, derive_project(project))
+    return stats
+
+
+# ── QuantileSketch ────────────────────────────────────────
+
+
+class TestQuantileSketch:
+    def test_quantiles_within_relative_error(self) -> None:
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 2) for _ in range(20_000)]
+        sketch = QuantileSketch(alpha=0.01)
+        for v in values:
+            sketch.add(v)
+        ordered = sorted(values)
+        for q in (0.1, 0.5, 0.9, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9
+
+    def test_merge_equals_single_pass(self) -> None:
+        values = [float(v) for v in range(1_000)]
+        whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for v in values:
+            whole.add(v)
+            (left if v % 2 else right).add(v)
+        left.merge(right)
+        assert left.to_dict() == whole.to_dict()
+
+    def test_round_trips_through_json(self) -> None:
+        sketch = QuantileSketch()
+        for v in [0, 3, 3, 50, 100]:
+            sketch.add(v)
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        assert restored.summary() == sketch.summary()
+
+    def test_bounded_bins(self) -> None:
+        sketch = QuantileSketch(max_bins=16)
+        for exponent in range(100):
+            sketch.add(2.0**exponent)
+        assert len(sketch.bins) <= 16
+        assert sketch.quantile(1.0) == pytest.approx(2.0**99, rel=0.01)
+
+    def test_rejects_mismatched_alpha_and_negatives(self) -> None:
+        with pytest.raises(ValueError):
+            QuantileSketch(alpha=0.01).merge(QuantileSketch(alpha=0.02))
+        with pytest.raises(ValueError):
+            QuantileSketch().add(-1)
+
+    def test_empty(self) -> None:
+        assert QuantileSketch().quantile(0.5) is None
+        assert QuantileSketch().summary() == {"count": 0}
+
+
+# ── FleetStats ────────────────────────────────────────────
+
+
+class TestFleetStats:
+    def test_counts_and_totals(self) -> None:
+        data = _fleet(_fixture_projects()).to_dict()
+        assert data["projectCount"] == 3
+        assert sum(data["status"].values()) == 3
+        assert data["languages"] == {"Python": 1, "Rust": 1, "TypeScript": 1}
+        assert data["totals"]["locEstimate"] == sum(p["locEstimate"] for p in _fixture_projects())
+        health = data["distributions"]["health"]
+        assert health["count"] == 3
+        assert health["min"] <= health["p50"] <= health["max"]
+
+    def test_shards_merge_to_the_whole(self) -> None:
+        projects = _fixture_projects()
+        merged = _fleet(projects[:1]).merge(_fleet(projects[1:]))
+        assert merged.to_dict() == _fleet(projects).to_dict()
+
+    def test_merge_from_serialized_snapshots(self) -> None:
+        projects = _fixture_projects()
+        snapshots = [json.loads(json.dumps(_fleet([p]).to_dict())) for p in projects]
+        merged = FleetStats()
+        for snapshot in snapshots:
+            merged.merge(FleetStats.from_dict(snapshot))
+        assert merged.to_dict() == _fleet(projects).to_dict()
+
+
+# ── derive.py CLI ─────────────────────────────────────────
+
+
+class TestDeriveFleetCli:
+    def _run(self, *args: str, stdin: str) -> dict:
+        out = subprocess.run(
+            [sys.executable, DERIVE, *args], input=stdin, capture_output=True, text=True, check=True
+        )
+        return json.loads(out.stdout)
+
+    def test_fleet_leaves_project_output_unchanged(self) -> None:
+        scan = (FIXTURES / "scan-input-synthetic.json").read_text()
+        expected = json.loads((FIXTURES / "derive-expected-synthetic.json").read_text())
+        output = self._run("--fleet", stdin=scan)
+        assert output["projects"] == expected["projects"]
+        assert output["fleet"]["projectCount"] == 3
+
+    def test_reads_scan_stream_events(self) -> None:
+        raw = json.loads((FIXTURES / "scan-input-synthetic.json").read_text())
+        events = [json.dumps({"type": "project", "project": p}) for p in raw["projects"]]
+        events.append(json.dumps({"type": "done", "scannedAt": raw["scannedAt"], "projectCount": 3}))
+        expected = json.loads((FIXTURES / "derive-expected-synthetic.json").read_text())
+        assert self._run(stdin="\n".join(events) + "\n") == expected
+
+    def test_merge_fleet_files(self, tmp_path: Path) -> None:
+        projects = _fixture_projects()
+        for i, project in enumerate(projects):
+            (tmp_path / f"{i}.json").write_text(json.dumps({"fleet": _fleet([project]).to_dict()}))
+        paths = [str(tmp_path / f"{i}.json") for i in range(len(projects))]
+        assert self._run("--merge-fleet", *paths, stdin="") == _fleet(projects).to_dict()
@@ -0,0 +1,130 @@
+"""Tests for flight.py single-flight scan coordination."""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from flight import flight_dir, flight_key, single_flight
+
+
+def _in_background(fn) -> tuple[threading.Thread, dict]:
+    out: dict = {}
+
+    def target() -> None:
+        try:
+            out["value"] = fn()
+        except Exception as exc:
+            out["error"] = exc
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, out
+
+
+class TestFlightKey:
+    def test_exclude_order_does_not_matter(self, tmp_path: Path) -> None:
+        assert flight_key(str(tmp_path), ["a", "b"]) == flight_key(str(tmp_path), ["b", "a", "a"])
+
+    def test_differs_by_root_and_excludes(self, tmp_path: Path) -> None:
+        (tmp_path / "x").mkdir()
+        keys = {
+            flight_key(str(tmp_path), []),
+            flight_key(str(tmp_path), ["node_modules"]),
+            flight_key(str(tmp_path / "x"), []),
+        }
+        assert len(keys) == 3
+
+
+class TestSingleFlight:
+    def test_lone_caller_runs(self, tmp_path: Path) -> None:
+        assert single_flight("k", lambda: "result", directory=str(tmp_path)) == ("result", True)
+        assert not list(tmp_path.glob("*.json"))
+
+    def test_directory_is_private(self, tmp_path: Path) -> None:
+        directory = tmp_path / "flights"
+        single_flight("k", lambda: "result", directory=str(directory))
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    def test_shared_directory_is_not_trusted(self, tmp_path: Path) -> None:
+        directory = tmp_path / "flights"
+        directory.mkdir(mode=0o777)
+        directory.chmod(0o777)
+        (directory / "k.json").write_text('{"finishedAt": 1e12}\nplanted')
+        assert single_flight("k", lambda: "own", directory=str(directory)) == ("own", True)
+        assert not (directory / "k.lock").exists()
+
+    def test_temp_fallback_is_per_user(self) -> None:
+        assert flight_dir().endswith(f"-{os.getuid()}")
+
+    def test_concurrent_caller_attaches_to_running_scan(self, tmp_path: Path) -> None:
+        started, release = threading.Event(), threading.Event()
+        calls: list[str] = []
+
+        def leader_run() -> str:
+            calls.append("leader")
+            started.set()
+            release.wait(5)
+            return "shared"
+
+        def follower_run() -> str:
+            calls.append("follower")
+            return "own"
+
+        leader, leader_out = _in_background(lambda: single_flight("k", leader_run, directory=str(tmp_path)))
+        assert started.wait(5)
+        follower, follower_out = _in_background(lambda: single_flight("k", follower_run, directory=str(tmp_path)))
+        time.sleep(0.2)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        assert leader_out["value"] == ("shared", True)
+        assert follower_out["value"] == ("shared", False)
+        assert calls == ["leader"]
+        assert not list(tmp_path.glob("*.json"))
+
+    def test_result_from_before_the_request_is_not_reused(self, tmp_path: Path) -> None:
+        single_flight("k", lambda: "old", directory=str(tmp_path))
+        assert single_flight("k", lambda: "new", directory=str(tmp_path)) == ("new", True)
+
+    def test_failed_leader_leaves_waiters_to_scan(self, tmp_path: Path) -> None:
+        started, release = threading.Event(), threading.Event()
+
+        def failing_run() -> str:
+            started.set()
+            release.wait(5)
+            raise RuntimeError("scan crashed")
+
+        leader, leader_out = _in_background(lambda: single_flight("k", failing_run, directory=str(tmp_path)))
+        assert started.wait(5)
+        follower, follower_out = _in_background(lambda: single_flight("k", lambda: "own", directory=str(tmp_path)))
+        time.sleep(0.2)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        assert isinstance(leader_out["error"], RuntimeError)
+        assert follower_out["value"] == ("own", True)
+
+    def test_gives_up_waiting_after_timeout(self, tmp_path: Path) -> None:
+        started, release = threading.Event(), threading.Event()
+
+        def slow_run() -> str:
+            started.set()
+            release.wait(5)
+            return "slow"
+
+        leader, _ = _in_background(lambda: single_flight("k", slow_run, directory=str(tmp_path)))
+        assert started.wait(5)
+        try:
+            assert single_flight("k", lambda: "own", directory=str(tmp_path), timeout=0.2) == ("own", True)
+        finally:
+            release.set()
+            leader.join(5)
+
+
+@pytest.fixture(autouse=True)
+def _no_app_data_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("APP_DATA_DIR", raising=False)
@@ -0,0 +1,95 @@
+"""Tests for parity.py dev root generation, engine measurement and diffing."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from parity import compare_projects, diff_values, generate_dev_root, git_subcommand, run_engine
+
+PARITY = str(Path(__file__).parent / "parity.py")
+NAMES = ("python", "ts")
+
+
+def _tree(root: Path) -> dict[str, str]:
+    return {
+        str(p.relative_to(root)): p.read_text()
+        for p in sorted(root.rglob("*"))
+        if p.is_file() and ".git" not in p.parts
+    }
+
+
+class TestGenerateDevRoot:
+    def test_same_seed_same_projects(self, tmp_path: Path) -> None:
+        a = generate_dev_root(str(tmp_path / "a"), 2, seed=3)
+        b = generate_dev_root(str(tmp_path / "b"), 2, seed=3)
+        assert a == b
+        assert _tree(tmp_path / "a") == _tree(tmp_path / "b")
+
+    def test_mixes_kinds_and_repos(self, tmp_path: Path) -> None:
+        names = generate_dev_root(str(tmp_path), 11)
+        assert {n.split("-")[0] for n in names} == {"go", "monorepo", "node", "python", "rust"}
+        repos = [n for n in names if (tmp_path / n / ".git").is_dir()]
+        assert len(repos) == 10
+
+
+class TestDiff:
+    def test_reports_paths_of_differing_values(self) -> None:
+        a = {"git": {"branchCount": 3, "isDirty": True}, "tags": ["a", "b"], "framework": "next"}
+        b = {"git": {"branchCount": 2, "isDirty": 1}, "tags": ["a", "c"], "framework": None}
+        assert diff_values(a, b, NAMES, ignored=frozenset({"framework"})) == [
+            "git.branchCount: python=3 ts=2",
+            "git.isDirty: python=true ts=1",
+            'tags[1]: python="b" ts="c"',
+        ]
+
+    def test_missing_keys_and_projects(self) -> None:
+        left = {"projects": [{"pathHash": "h1", "name": "one", "x": 1}, {"pathHash": "h2", "name": "two"}]}
+        right = {"projects": [{"pathHash": "h1", "name": "one"}], "scannedAt": "later"}
+        assert compare_projects(left, right, NAMES, "scan", frozenset()) == [
+            {"project": "one", "stage": "scan", "diffs": ["x: missing in ts"]},
+            {"project": "two", "stage": "scan", "diffs": ["project missing in ts"]},
+        ]
+
+    def test_identical_outputs_have_no_differences(self) -> None:
+        output = {"scannedAt": "t", "projects": [{"pathHash": "h", "name": "n", "languages": {"primary": "Go"}}]}
+        assert compare_projects(output, json.loads(json.dumps(output)), NAMES, "scan", frozenset()) == []
+
+
+class TestRunEngine:
+    def test_git_subcommand_skips_global_options(self) -> None:
+        assert git_subcommand("--no-optional-locks status --porcelain") == "status"
+        assert git_subcommand("-C /x -c a=b log -1") == "log"
+
+    def test_python_engine_counts_git_calls_and_memory(self, tmp_path: Path) -> None:
+        generate_dev_root(str(tmp_path), 2)
+        run = run_engine("python", str(tmp_path), [])
+        assert run.error is None
+        assert run.scan["projectCount"] == 2
+        assert len(run.derive["projects"]) == 2
+        assert run.git_calls["status"] == 2
+        assert run.peak_rss_kb > 0 and run.wall_ms > 0
+
+    def test_missing_runner_is_reported_not_raised(self, tmp_path: Path) -> None:
+        run = run_engine("ts", str(tmp_path), [str(tmp_path / "no-such-runner")])
+        assert run.error is not None and run.scan is None
+
+
+class TestParityCli:
+    def test_python_only_report(self, tmp_path: Path) -> None:
+        generate_dev_root(str(tmp_path), 2)
+        out = subprocess.run(
+            [sys.executable, PARITY, "--dev-root", str(tmp_path), "--engines", "python"],
+            capture_output=True, text=True, check=True,
+        )
+        root = json.loads(out.stdout)["roots"][0]
+        assert root["projects"] == 2
+        assert root["engines"]["python"]["subprocesses"] > 0
+        assert "differences" not in root
+
+    @pytest.mark.parametrize("args", [["--sizes", "0"], ["--engines", "python,python"], ["--bogus"]])
+    def test_bad_arguments(self, args: list[str]) -> None:
+        out = subprocess.run([sys.executable, PARITY, *args], capture_output=True, text=True)
+        assert out.returncode == 1
+        assert out.stderr.startswith("Usage:")
@@ -0,0 +1,105 @@
+"""Tests for records.py slotted scan records and the compact serializer."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from records import (
+    Cicd,
+    Commit,
+    Deployment,
+    Files,
+    GitInfo,
+    Languages,
+    Project,
+    ScanOutput,
+    dumps,
+)
+from scan import scan_project
+
+FIXTURE_PROJECT = str(Path(__file__).parent / "fixtures" / "mock-project")
+
+# Key order of the historical dict-based scan output, plus later additions.
+PROJECT_KEYS = [
+    "name", "path", "pathHash",
+    "isRepo", "lastCommitDate", "lastCommitMessage", "branch", "remoteUrl",
+    "commitCount", "daysInactive", "isDirty", "untrackedCount", "modifiedCount",
+    "stagedCount", "ahead", "behind", "recentCommits", "branchCount", "stashCount",
+    "staleBranchCount", "staleBranches", "untrackedTruncated", "statusTimedOut",
+    "languages", "files", "cicd", "deployment",
+    "todoCount", "fixmeCount", "description", "framework", "liveUrl",
+    "scripts", "services", "locEstimate", "packageManager", "license",
+    "workspaces", "identityKey", "skippedFiles",
+]
+
+
+def _project() -> Project:
+    git = GitInfo(
+        is_repo=True,
+        last_commit_date="2026-01-01T00:00:00+00:00",
+        last_commit_message='fix "quoted" naïve ☃',
+        branch="main",
+        commit_count=12,
+        days_inactive=3,
+        recent_commits=[Commit("abc123", "2026-01-01T00:00:00+00:00", "init")],
+    )
+    return Project(
+        name="demo",
+        path="/dev/demo",
+        path_hash="0123456789abcdef",
+        git=git,
+        languages=Languages("Python", ["Python"]),
+        files=Files(True, False, False, False, False, False, True, True, True),
+        cicd=Cicd(True, False, False, False),
+        deployment=Deployment(False, False, False),
+        todo_count=2,
+        fixme_count=0,
+        description=None,
+        framework="fastapi",
+        live_url=None,
+        scripts=[],
+        services=["stripe"],
+        loc_estimate=420,
+        package_manager="uv",
+        license=True,
+    )
+
+
+class TestRecords:
+    def test_slots_have_no_instance_dict(self) -> None:
+        project = _project()
+        assert not hasattr(project, "__dict__")
+        assert not hasattr(project.git, "__dict__")
+
+    def test_git_info_inlined_in_key_order(self) -> None:
+        assert list(_project().to_dict().keys()) == PROJECT_KEYS
+
+    def test_scan_project_key_order(self) -> None:
+        assert list(scan_project(FIXTURE_PROJECT).to_dict().keys()) == PROJECT_KEYS
+
+
+class TestDumps:
+    def test_matches_stdlib_compact_output(self) -> None:
+        project = _project()
+        expected = json.dumps(project.to_dict(), separators=(",", ":"))
+        assert dumps(project) == expected
+
+    def test_scan_output_round_trips(self) -> None:
+        output = ScanOutput("2026-01-01T00:00:00+00:00", [_project(), _project()])
+        data = json.loads(dumps(output))
+        assert data["projectCount"] == 2
+        assert data == output.to_dict()
+
+    def test_empty_containers_and_plain_values(self) -> None:
+        assert dumps({"a": [], "b": {}, "c": None, "d": 1.5}) == '{"a":[],"b":{},"c":null,"d":1.5}'
+
+    def test_records_nested_in_plain_containers(self) -> None:
+        project, commit = _project(), Commit("a", "b", "ç")
+        value = {"event": {"type": "project", "projects": [project]}, "commit": commit}
+        expected = {"event": {"type": "project", "projects": [project.to_dict()]}, "commit": commit.to_dict()}
+        assert dumps(value) == json.dumps(expected, separators=(",", ":"))
+
+    def test_unserializable_value_raises_type_error(self) -> None:
+        with pytest.raises(TypeError):
+            dumps({"a": {"b": object()}})
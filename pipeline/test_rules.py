@@ -0,0 +1,117 @@
+"""Tests for rules.py compiled scoring rules."""
+
+import json
+from pathlib import Path
+
+import pytest
+import settings
+from derive import derive_project, load_scorer
+from rules import DEFAULT_RULES, RuleError, compile_rules, merge_rules
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _golden() -> tuple[list[dict], list[dict]]:
+    scan = json.loads((FIXTURES / "scan-input-synthetic.json").read_text())
+    expected = json.loads((FIXTURES / "derive-expected-synthetic.json").read_text())
+    return scan["projects"], expected["projects"]
+
+
+# ── compile_rules ─────────────────────────────────────────
+
+
+class TestCompileRules:
+    def test_defaults_reproduce_golden_output(self) -> None:
+        scorer = compile_rules(DEFAULT_RULES)
+        projects, expected = _golden()
+        assert [derive_project(p, scorer) for p in projects] == expected
+
+    def test_custom_weights_and_max(self) -> None:
+        rules = merge_rules({
+            "hygiene": {
+                "rules": [{"name": "readme", "signal": "files.readme", "op": "truthy", "points": 40}],
+            },
+            "health": {"weights": {"hygiene": 1, "momentum": 0}},
+        })
+        scorer = compile_rules(rules)
+        assert scorer.hygiene({"files": {"readme": True}}) == (100, {"readme": 40})
+        assert scorer.hygiene({}) == (0, {})
+        health, _, _, _ = scorer.health({"files": {"readme": True}})
+        assert health == 100
+
+    def test_comparison_never_matches_missing_signal(self) -> None:
+        rules = merge_rules({
+            "momentum": {
+                "rules": [{"name": "fewStashes", "signal": "stashCount", "op": "le", "value": 1, "points": 10}],
+            },
+        })
+        scorer = compile_rules(rules)
+        assert scorer.momentum({}) == (0, {})
+        assert scorer.momentum({"stashCount": 0}) == (100, {"fewStashes": 10})
+
+    def test_signals_of_the_wrong_shape_never_raise(self) -> None:
+        rules = merge_rules({
+            "status": {"signal": "daysInactive", "tiers": [[30, "active"]], "default": "archived"},
+            "hygiene": {
+                "rules": [
+                    {"name": "services", "signal": "services", "op": "any", "points": 10},
+                    {"name": "workspaces", "signal": "workspaces.length", "op": "gt", "value": 1, "points": 10},
+                    {"name": "fewTodos", "signal": "todoCount", "op": "lt", "value": 5, "points": 10},
+                    {"name": "size", "signal": "locEstimate", "op": "tiers", "tiers": [[100, 10]]},
+                ],
+            },
+        })
+        scorer = compile_rules(rules)
+        project = {
+            "daysInactive": "3", "services": ["postgres"], "workspaces": [{"name": "a"}],
+            "todoCount": "none", "locEstimate": None,
+        }
+        assert scorer.status(project) == "archived"
+        assert scorer.hygiene(project) == (0, {})
+        assert scorer.hygiene({"services": {"postgres": True}, "todoCount": 2})[1] == {"services": 10, "fewTodos": 10}
+
+    def test_custom_status_tiers(self) -> None:
+        rules = merge_rules({
+            "status": {"signal": "daysInactive", "tiers": [[30, "active"]], "default": "archived"},
+        })
+        scorer = compile_rules(rules)
+        assert scorer.status({"daysInactive": 30}) == "active"
+        assert scorer.status({"daysInactive": 31}) == "archived"
+        assert scorer.status({}) == "archived"
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"bogus": {}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "nope", "points": 1}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "truthy", "points": "1"}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a..b", "op": "truthy", "points": 1}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "eq", "value": [1], "points": 1}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "lt", "value": "10", "points": 1}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "ge", "value": 1, "default": "0", "points": 1}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "eq", "value": float("nan"), "points": 1}]}},
+            {"hygiene": {"rules": [{"name": "x", "signal": "a", "op": "truthy", "points": float("inf")}]}},
+            {"status": {"signal": "daysInactive", "tiers": [[1, float("nan")]], "default": "archived"}},
+            {"status": {"signal": "daysInactive", "tiers": []}},
+            {"health": {"weights": {"hygiene": 1}}},
+        ],
+    )
+    def test_rejects_malformed_rules(self, overrides: dict) -> None:
+        with pytest.raises(RuleError):
+            compile_rules(merge_rules(overrides))
+
+
+# ── load_scorer ───────────────────────────────────────────
+
+
+class TestLoadScorer:
+    def test_reads_scoring_rules_from_settings(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        (tmp_path / "settings.json").write_text(json.dumps({
+            "scoringRules": {"health": {"weights": {"hygiene": 0, "momentum": 1}}},
+        }))
+        monkeypatch.setenv("APP_DATA_DIR", str(tmp_path))
+        settings.clear_settings_cache()
+        try:
+            assert load_scorer().health_weights == (0.0, 1.0)
+        finally:
+            settings.clear_settings_cache()
@@ -0,0 +1,271 @@
+"""Tests for scan.py refresh orchestration against throwaway git repos."""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+from scan import (
+    default_branch_ref,
+    get_branches,
+    get_git_info,
+    identity_key,
+    normalize_remote,
+    path_hash,
+    project_identity,
+    refresh,
+    scan_project,
+    working_tree_status,
+)
+from state import ScanState
+
+OLD_DATE = "2020-01-01T00:00:00+00:00"
+
+
+def _git(path: Path | str, *cmd: str, date: str | None = None) -> None:
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "t",
+        "GIT_AUTHOR_EMAIL": "t@example.com",
+        "GIT_COMMITTER_NAME": "t",
+        "GIT_COMMITTER_EMAIL": "t@example.com",
+    }
+    if date:
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(["git", *cmd], cwd=path, env=env, check=True)
+
+
+def _git_repo(path: Path, date: str | None = None) -> str:
+    path.mkdir()
+    (path / "main.py").write_text("# TODO one\nprint('hi')\n")
+    for cmd in (["init", "-q", "-b", "main"], ["add", "-A"], ["commit", "-qm", "init"]):
+        _git(path, *cmd, date=date)
+    return str(path)
+
+
+def _names(results) -> list[str]:
+    return [r["name"] if isinstance(r, dict) else r.name for r in results]
+
+
+@pytest.fixture
+def archived_repo(tmp_path: Path) -> str:
+    return _git_repo(tmp_path / "old-repo", OLD_DATE)
+
+
+class TestRefresh:
+    def test_without_state_scans_everything(self, archived_repo: str) -> None:
+        assert _names(refresh([archived_repo], 1, None)) == ["old-repo"]
+
+    def test_fresh_results_are_the_dicts_kept_in_state(self, archived_repo: str, tmp_path: Path) -> None:
+        state = ScanState.load(str(tmp_path / "state.json"))
+        (fresh,) = refresh([archived_repo], 1, state)
+        assert fresh is state.get(path_hash(archived_repo))["project"]
+
+    def test_unchanged_archived_project_reuses_cached_result(self, archived_repo: str, tmp_path: Path) -> None:
+        state_path = str(tmp_path / "state.json")
+        first = list(refresh([archived_repo], 1, ScanState.load(state_path)))
+        cached = json.loads(Path(state_path).read_text())["projects"]
+        assert len(cached) == 1
+
+        second = list(refresh([archived_repo], 1, ScanState.load(state_path)))
+        assert second[0] == first[0]
+        # Not rescanned: the entry keeps its original scan time.
+        assert json.loads(Path(state_path).read_text())["projects"] == cached
+
+    def test_fingerprint_change_triggers_rescan(self, archived_repo: str, tmp_path: Path) -> None:
+        state_path = str(tmp_path / "state.json")
+        list(refresh([archived_repo], 1, ScanState.load(state_path)))
+        before = ScanState.load(state_path).get(path_hash(archived_repo))
+        index = Path(archived_repo) / ".git" / "index"
+        os.utime(index, (index.stat().st_mtime + 10, index.stat().st_mtime + 10))
+        list(refresh([archived_repo], 1, ScanState.load(state_path)))
+        after = ScanState.load(state_path).get(path_hash(archived_repo))
+        assert after["fingerprint"] != before["fingerprint"]
+        assert after["scannedAt"] >= before["scannedAt"]
+
+    def test_removed_projects_are_pruned_from_state(self, archived_repo: str, tmp_path: Path) -> None:
+        state_path = str(tmp_path / "state.json")
+        list(refresh([archived_repo], 1, ScanState.load(state_path)))
+        list(refresh([], 1, ScanState.load(state_path)))
+        assert json.loads(Path(state_path).read_text())["projects"] == {}
+
+
+class TestIdentity:
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "git@github.com:me/tool.git",
+            "https://github.com/me/tool",
+            "ssh://git@GitHub.com/me/tool.git",
+            "https://user@github.com/me/tool.git/",
+        ],
+    )
+    def test_remote_forms_normalize_alike(self, url: str) -> None:
+        assert normalize_remote(url) == "github.com/me/tool"
+
+    def test_key_needs_a_root_commit(self) -> None:
+        assert identity_key(None, "https://github.com/me/tool") is None
+        assert identity_key("abc", None) != identity_key("abc", "https://github.com/me/tool")
+
+    def test_identity_survives_a_move(self, archived_repo: str, tmp_path: Path) -> None:
+        before = scan_project(archived_repo).identity_key
+        moved = tmp_path / "renamed"
+        os.rename(archived_repo, moved)
+        after = scan_project(str(moved))
+        assert before is not None
+        assert after.identity_key == before
+        assert after.path_hash != path_hash(archived_repo)
+
+    def test_root_commit_is_cached_per_head(self, archived_repo: str) -> None:
+        head = get_git_info(archived_repo).recent_commits[0].hash
+        roots: dict[str, list[str]] = {}
+        key = project_identity(archived_repo, None, head, roots)
+        assert roots == {path_hash(archived_repo): [head, head]}
+
+        # While HEAD is unchanged the cached root is trusted, no history walk.
+        roots[path_hash(archived_repo)] = [head, "cached-root"]
+        assert project_identity(archived_repo, None, head, roots) == identity_key("cached-root", None)
+        assert project_identity(archived_repo, None, "other-head", roots) == key
+
+    def test_refresh_keeps_root_commits_in_state(self, archived_repo: str, tmp_path: Path) -> None:
+        state_path = str(tmp_path / "state.json")
+        list(refresh([archived_repo], 1, ScanState.load(state_path)))
+        assert list(ScanState.load(state_path).root_commits) == [path_hash(archived_repo)]
+
+    def test_non_repo_has_no_identity(self, tmp_path: Path) -> None:
+        (tmp_path / "plain").mkdir()
+        assert scan_project(str(tmp_path / "plain")).identity_key is None
+
+    def test_moved_project_keeps_cached_state(self, archived_repo: str, tmp_path: Path) -> None:
+        state_path = str(tmp_path / "state.json")
+        first = list(refresh([archived_repo], 1, ScanState.load(state_path)))[0]
+        moved = str(tmp_path / "renamed")
+        os.rename(archived_repo, moved)
+
+        second = list(refresh([moved], 1, ScanState.load(state_path)))
+        assert isinstance(second[0], dict)
+        assert (second[0]["name"], second[0]["path"], second[0]["pathHash"]) == ("renamed", moved, path_hash(moved))
+        assert second[0]["identityKey"] == first["identityKey"]
+        entries = json.loads(Path(state_path).read_text())["projects"]
+        assert list(entries) == [path_hash(moved)]
+
+
+class TestBranches:
+    def test_stale_and_merged_branches_from_one_listing(self, tmp_path: Path) -> None:
+        repo = _git_repo(tmp_path / "repo", OLD_DATE)
+        _git(repo, "branch", "merged")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "after merge")
+        _git(repo, "branch", "fresh")
+        _git(repo, "checkout", "-q", "-b", "active")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "work")
+        _git(repo, "checkout", "-q", "-b", "ancient", "main")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "old work", date=OLD_DATE)
+        _git(repo, "checkout", "-q", "main")
+
+        info = get_git_info(repo)
+        assert info.branch_count == 5
+        assert sorted(b.name for b in info.stale_branches) == ["ancient", "merged"]
+        assert info.stale_branch_count == 2
+
+    def test_default_branch_is_never_stale(self, archived_repo: str) -> None:
+        info = get_git_info(archived_repo)
+        assert (info.branch_count, info.stale_branch_count) == (1, 0)
+
+    def test_checked_out_branch_is_not_the_merge_base(self, tmp_path: Path) -> None:
+        # git init + remote add + push -u leaves no origin/HEAD behind.
+        repo = _git_repo(tmp_path / "repo")
+        _git(repo, "checkout", "-q", "-b", "feature")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "work")
+        assert get_branches(repo, "feature") == (2, [])
+
+    def test_dangling_origin_head_falls_back_to_local_default(self, tmp_path: Path) -> None:
+        repo = _git_repo(tmp_path / "repo")
+        _git(repo, "branch", "merged")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "after merge")
+        _git(repo, "symbolic-ref", "refs/remotes/origin/HEAD", "refs/remotes/origin/gone")
+        assert default_branch_ref(repo) == "heads/main"
+        count, stale = get_branches(repo, "main")
+        assert (count, [b.name for b in stale]) == (2, ["merged"])
+
+    def test_without_a_default_branch_only_age_counts(self, tmp_path: Path) -> None:
+        repo = _git_repo(tmp_path / "repo")
+        _git(repo, "branch", "-m", "trunk")
+        _git(repo, "branch", "behind")
+        _git(repo, "commit", "-q", "--allow-empty", "-m", "ahead")
+        assert default_branch_ref(repo) is None
+        assert get_branches(repo, "trunk") == (2, [])
+
+
+class TestWorkingTreeStatus:
+    def _dirty_repo(self, tmp_path: Path) -> str:
+        repo = _git_repo(tmp_path / "repo", OLD_DATE)
+        (Path(repo) / "a.py").write_text("a\n")
+        _git(repo, "add", "a.py")
+        _git(repo, "commit", "-qm", "add a")
+        _git(repo, "mv", "a.py", "z.py")
+        (Path(repo) / "main.py").write_text("changed\n")
+        for i in range(5):
+            (Path(repo) / f"new{i}.txt").write_text("x\n")
+        return repo
+
+    def test_counts_from_streamed_output(self, tmp_path: Path) -> None:
+        tree = working_tree_status(self._dirty_repo(tmp_path), max_untracked=100)
+        # " M main.py" sorts first; its leading space must not be lost.
+        assert (tree.untracked, tree.modified, tree.staged) == (5, 1, 1)
+        assert tree.dirty and not tree.truncated and not tree.timed_out
+
+    def test_stops_at_untracked_limit_with_tracked_counts_exact(self, tmp_path: Path) -> None:
+        repo = self._dirty_repo(tmp_path)
+        tree = working_tree_status(repo, max_untracked=3)
+        assert (tree.untracked, tree.truncated) == (3, True)
+        assert (tree.modified, tree.staged) == (1, 1)
+        assert not working_tree_status(repo, max_untracked=5).truncated
+
+    def test_clean_repo(self, archived_repo: str) -> None:
+        tree = working_tree_status(archived_repo, max_untracked=10)
+        assert not tree.dirty and (tree.untracked, tree.modified, tree.staged) == (0, 0, 0)
+
+    def test_timeout_is_never_reported_clean(self, tmp_path: Path, archived_repo: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        fake = tmp_path / "bin" / "git"
+        fake.parent.mkdir()
+        fake.write_text("#!/bin/sh\nexec sleep 5\n")
+        fake.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{fake.parent}{os.pathsep}{os.environ['PATH']}")
+        tree = working_tree_status(archived_repo, max_untracked=10, timeout=0.2)
+        assert tree.timed_out and tree.dirty
+
+    def test_git_info_reports_bounds(self, tmp_path: Path) -> None:
+        data = get_git_info(self._dirty_repo(tmp_path)).to_dict()
+        assert (data["isDirty"], data["untrackedCount"], data["untrackedTruncated"], data["statusTimedOut"]) == (
+            True, 5, False, False,
+        )
+
+
+class TestWorkspaces:
+    def test_counts_are_attributed_from_one_walk(self, tmp_path: Path) -> None:
+        root = tmp_path / "mono"
+        (root / "packages" / "a" / "src").mkdir(parents=True)
+        (root / "packages" / "a" / "nested").mkdir()
+        (root / "packages" / "b").mkdir()
+        (root / "package.json").write_text(json.dumps({"workspaces": ["packages/*", "packages/a/nested"]}))
+        (root / "packages" / "a" / "package.json").write_text('{"name": "a", "scripts": {"test": "x"}}')
+        (root / "packages" / "a" / "nested" / "package.json").write_text('{"name": "nested"}')
+        (root / "packages" / "b" / "Cargo.toml").write_text('[package]\nname = "b"\n')
+        (root / "packages" / "a" / "src" / "i.ts").write_text("// TODO\nx\n")
+        (root / "packages" / "a" / "nested" / "n.ts").write_text("// FIXME\n")
+        (root / "packages" / "b" / "lib.rs").write_text("fn f() {}\n")
+        (root / "tool.js").write_text("// TODO\n")
+
+        project = scan_project(str(root))
+        by_path = {w.path: w for w in project.workspaces}
+        assert list(by_path) == ["packages/a", "packages/a/nested", "packages/b"]
+        a, nested, b = by_path.values()
+        assert (a.name, a.scripts, a.todo_count, a.loc_estimate) == ("a", ["test"], 1, 2)
+        assert (nested.fixme_count, nested.loc_estimate) == (1, 1)
+        assert (b.language, b.loc_estimate) == ("Rust", 1)
+        # Root totals still cover everything, including files outside packages.
+        assert (project.todo_count, project.fixme_count, project.loc_estimate) == (2, 1, 5)
+
+    def test_plain_project_has_no_workspaces(self, archived_repo: str) -> None:
+        assert scan_project(archived_repo).workspaces == []
@@ -0,0 +1,165 @@
+"""Tests for scheduler.py adaptive concurrency limits."""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from scheduler import (
+    DEFAULT_CADENCE,
+    AdaptiveLimit,
+    activity_fingerprint,
+    cadence_from_settings,
+    is_due,
+    order_by_activity,
+    run_adaptive,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _limit(load: float | None, initial: int = 4, maximum: int = 16) -> tuple[AdaptiveLimit, FakeClock]:
+    clock = FakeClock()
+    return AdaptiveLimit(initial, maximum=maximum, load_fn=lambda: load, clock=clock), clock
+
+
+def _release_after(limit: AdaptiveLimit, clock: FakeClock, latency: float) -> None:
+    limit.acquire()
+    clock.now += 1.0
+    limit.release(latency)
+
+
+# ── AdaptiveLimit ─────────────────────────────────────────
+
+
+class TestAdaptiveLimit:
+    def test_grows_when_idle_and_fast(self) -> None:
+        limit, clock = _limit(load=0.1)
+        for _ in range(20):
+            _release_after(limit, clock, 0.01)
+        assert limit.limit > 4
+
+    def test_backs_off_under_high_load(self) -> None:
+        limit, clock = _limit(load=3.0, initial=8)
+        for _ in range(5):
+            _release_after(limit, clock, 0.01)
+        assert limit.limit < 8
+
+    def test_backs_off_when_latency_rises(self) -> None:
+        limit, clock = _limit(load=0.1, initial=8)
+        _release_after(limit, clock, 0.01)
+        for _ in range(10):
+            _release_after(limit, clock, 0.5)
+        assert limit.limit < 8
+
+    def test_respects_bounds(self) -> None:
+        limit, clock = _limit(load=5.0, initial=2, maximum=3)
+        for _ in range(50):
+            _release_after(limit, clock, 1.0)
+        assert limit.limit == 1
+        limit, clock = _limit(load=0.0, initial=2, maximum=3)
+        for _ in range(50):
+            _release_after(limit, clock, 0.01)
+        assert limit.limit == 3
+
+    def test_unknown_load_still_adapts(self) -> None:
+        limit, clock = _limit(load=None)
+        for _ in range(20):
+            _release_after(limit, clock, 0.01)
+        assert limit.limit > 4
+
+
+# ── run_adaptive ──────────────────────────────────────────
+
+
+class TestRunAdaptive:
+    def test_returns_every_result_with_its_index(self) -> None:
+        limit = AdaptiveLimit(2, maximum=4, load_fn=lambda: 0.0)
+        results = dict(run_adaptive(lambda x: x * x, range(20), limit))
+        assert results == {i: i * i for i in range(20)}
+
+    def test_never_exceeds_limit(self) -> None:
+        limit = AdaptiveLimit(2, maximum=2, load_fn=lambda: 0.0)
+        lock = threading.Lock()
+        peak = [0, 0]
+
+        def work(_: int) -> None:
+            with lock:
+                peak[0] += 1
+                peak[1] = max(peak[1], peak[0])
+            with lock:
+                peak[0] -= 1
+
+        list(run_adaptive(work, range(50), limit))
+        assert peak[1] <= 2
+
+    def test_sequential_when_maximum_is_one(self) -> None:
+        limit = AdaptiveLimit(1, maximum=1)
+        assert [i for i, _ in run_adaptive(str, "abc", limit)] == [0, 1, 2]
+
+    def test_propagates_errors(self) -> None:
+        def boom(x: int) -> int:
+            raise ValueError(x)
+
+        limit = AdaptiveLimit(2, maximum=2, load_fn=lambda: 0.0)
+        with pytest.raises(ValueError):
+            list(run_adaptive(boom, range(3), limit))
+
+
+# ── refresh cadence ───────────────────────────────────────
+
+
+class TestActivityOrdering:
+    def test_most_recently_touched_first(self, tmp_path: Path) -> None:
+        for name in ["old", "hot", "warm"]:
+            (tmp_path / name).mkdir()
+        os.utime(tmp_path / "old", (1_000, 1_000))
+        os.utime(tmp_path / "warm", (2_000, 2_000))
+        os.utime(tmp_path / "hot", (3_000, 3_000))
+        ordered = order_by_activity(str(tmp_path / n) for n in ["old", "hot", "warm"])
+        assert [os.path.basename(p) for p, _ in ordered] == ["hot", "warm", "old"]
+
+    def test_git_index_counts_as_activity(self, tmp_path: Path) -> None:
+        for name in ["a", "b"]:
+            (tmp_path / name / ".git").mkdir(parents=True)
+            os.utime(tmp_path / name, (1_000, 1_000))
+        (tmp_path / "a" / ".git" / "index").write_text("")
+        os.utime(tmp_path / "a" / ".git" / "index", (5_000, 5_000))
+        os.utime(tmp_path / "b" / ".git", (1_000, 1_000))
+        fingerprint = activity_fingerprint(str(tmp_path / "a"))
+        assert max(fingerprint) == 5_000
+        assert order_by_activity([str(tmp_path / "b"), str(tmp_path / "a")])[0][0].endswith("a")
+
+
+class TestIsDue:
+    FP = (1.0, 2.0, 0.0, 0.0)
+
+    def test_never_scanned(self) -> None:
+        assert is_due(None, None, self.FP, None, now=0)
+
+    def test_active_always_rescanned(self) -> None:
+        assert is_due(list(self.FP), 100.0, self.FP, "active", now=100.0)
+
+    def test_archived_waits_for_cadence(self) -> None:
+        assert not is_due(list(self.FP), 100.0, self.FP, "archived", now=100.0 + 3600)
+        assert is_due(list(self.FP), 100.0, self.FP, "archived", now=100.0 + 8 * 86400)
+
+    def test_fingerprint_change_forces_rescan(self) -> None:
+        assert is_due(list(self.FP), 100.0, (1.0, 3.0, 0.0, 0.0), "archived", now=101.0)
+
+    def test_cadence_settings_override_known_statuses(self) -> None:
+        cadence = cadence_from_settings({"archived": 60, "paused": 0.5})
+        assert cadence == {**DEFAULT_CADENCE, "archived": 60, "paused": 0.5}
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [None, ["x"], "1d", {"archived": "1d"}, {"archived": -1}, {"archived": True}, {"archived": None}, {"other": 5}],
+    )
+    def test_bad_cadence_settings_keep_defaults(self, overrides: object) -> None:
+        assert cadence_from_settings(overrides) == DEFAULT_CADENCE
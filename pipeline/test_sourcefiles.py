@@ -0,0 +1,70 @@
+"""Tests for sourcefiles.py skip policy and its tallies in scan output."""
+
+from pathlib import Path
+
+import pytest
+from scan import count_source
+from sourcefiles import SkipPolicy, SkipTally, read_source
+
+
+def _read(path: Path, policy: SkipPolicy | None = None) -> tuple[bytes | None, SkipTally]:
+    tally = SkipTally()
+    return read_source(str(path), policy or SkipPolicy(), tally), tally
+
+
+class TestSkipPolicy:
+    def test_plain_source_is_read(self, tmp_path: Path) -> None:
+        f = tmp_path / "main.py"
+        f.write_text("# TODO\nprint(1)\n")
+        data, tally = _read(f)
+        assert data == b"# TODO\nprint(1)\n"
+        assert sum(tally.files.values()) == 0
+
+    def test_large_file_skipped_before_reading(self, tmp_path: Path) -> None:
+        f = tmp_path / "big.js"
+        f.write_text("x\n" * 600)
+        data, tally = _read(f, SkipPolicy(max_file_bytes=1000))
+        assert data is None
+        assert (tally.files["tooLarge"], tally.bytes["tooLarge"]) == (1, 1200)
+
+    def test_binary_sniff(self, tmp_path: Path) -> None:
+        f = tmp_path / "blob.c"
+        f.write_bytes(b"int x;\n\0\0\0")
+        assert _read(f)[1].files["binary"] == 1
+
+    def test_generated_marker(self, tmp_path: Path) -> None:
+        f = tmp_path / "api_pb2.py"
+        f.write_text("# Generated by the protocol buffer compiler.  DO NOT EDIT!\nx = 1\n")
+        assert _read(f)[1].files["generated"] == 1
+
+    def test_minified_bundle(self, tmp_path: Path) -> None:
+        f = tmp_path / "bundle.js"
+        f.write_text(";".join(f"var a{i}=1" for i in range(500)))
+        assert _read(f)[1].files["minified"] == 1
+
+    def test_checks_can_be_turned_off(self, tmp_path: Path) -> None:
+        f = tmp_path / "bundle.js"
+        f.write_text("// DO NOT EDIT\n" + ";".join(f"var a{i}=1" for i in range(500)))
+        assert _read(f)[0] is None
+        policy = SkipPolicy.from_settings({"maxFileBytes": 0, "minifiedLineLength": 0, "generatedMarkers": []})
+        data, tally = _read(f, policy)
+        assert data is not None
+        assert sum(tally.files.values()) == 0
+
+    @pytest.mark.parametrize("overrides", [None, "x", {"maxFileBytes": -1}, {"binarySniff": "yes"}])
+    def test_bad_settings_keep_defaults(self, overrides: object) -> None:
+        policy = SkipPolicy.from_settings(overrides)
+        assert (policy.max_file_bytes, policy.binary_sniff) == (SkipPolicy().max_file_bytes, True)
+
+
+class TestCountSourceSkips:
+    def test_skips_are_reported_and_not_counted(self, tmp_path: Path) -> None:
+        (tmp_path / "main.py").write_text("# TODO\nx = 1\n")
+        (tmp_path / "out.js").write_text("// TODO\n" + "a;" * 400)
+        (tmp_path / "gen.go").write_text("// Code generated by protoc. DO NOT EDIT.\n// TODO\n")
+        counts = count_source(str(tmp_path))
+        assert (counts.todo, counts.loc) == (1, 2)
+        skipped = counts.skipped_files().to_dict()
+        assert skipped["minified"]["files"] == 1
+        assert skipped["generated"] == {"files": 1, "bytes": (tmp_path / "gen.go").stat().st_size}
+        assert skipped["tooLarge"] == {"files": 0, "bytes": 0}
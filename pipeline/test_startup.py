@@ -0,0 +1,17 @@
+"""Tests for startup.py: entry points keep deferred modules off their import path."""
+
+import pytest
+from startup import DEFERRED, ENTRY_POINTS, import_profile, measure
+
+
+class TestStartup:
+    @pytest.mark.parametrize("module", ENTRY_POINTS)
+    def test_entry_point_defers_modules(self, module: str) -> None:
+        result = measure(module, runs=1)
+        assert result["deferredImported"] == []
+        assert result["importMs"] > 0
+
+    def test_derive_does_not_load_scan_side_code(self) -> None:
+        loaded = import_profile("derive").keys()
+        assert {"derive", "rules", "settings"} <= loaded
+        assert not loaded & DEFERRED["derive"]
@@ -0,0 +1,68 @@
+"""Tests for workspaces.py manifest parsing and member expansion."""
+
+import json
+from pathlib import Path
+
+from workspaces import find_workspace_packages, package_name, toml_string_array, workspace_patterns
+
+SKIP = {"node_modules"}
+
+
+def _package(root: Path, rel: str, manifest: str = "package.json", body: str = "{}") -> None:
+    (root / rel).mkdir(parents=True, exist_ok=True)
+    (root / rel / manifest).write_text(body)
+
+
+class TestManifestParsing:
+    def test_npm_workspaces_list_and_object(self, tmp_path: Path) -> None:
+        (tmp_path / "package.json").write_text(json.dumps({"workspaces": ["packages/*"]}))
+        assert workspace_patterns(str(tmp_path)) == (["packages/*"], [])
+        (tmp_path / "package.json").write_text(json.dumps({"workspaces": {"packages": ["apps/*", "!apps/old"]}}))
+        assert workspace_patterns(str(tmp_path)) == (["apps/*"], ["apps/old"])
+
+    def test_pnpm_workspace_yaml(self, tmp_path: Path) -> None:
+        (tmp_path / "pnpm-workspace.yaml").write_text(
+            "packages:\n  - 'packages/*'\n  - \"apps/web\"  # app\n  - '!**/test/**'\ncatalog:\n  - nope\n"
+        )
+        assert workspace_patterns(str(tmp_path)) == (["packages/*", "apps/web"], ["**/test/**"])
+
+    def test_multiline_toml_array(self) -> None:
+        text = '[package]\nname = "x"\n\n[workspace]\nmembers = [\n  "crates/*", # all\n  "tools/cli",\n]\nexclude = ["crates/old"]\n'
+        assert toml_string_array(text, "workspace", "members") == ["crates/*", "tools/cli"]
+        assert toml_string_array(text, "workspace", "exclude") == ["crates/old"]
+        assert toml_string_array(text, "package", "members") == []
+
+    def test_uv_workspace(self, tmp_path: Path) -> None:
+        (tmp_path / "pyproject.toml").write_text('[tool.uv.workspace]\nmembers = ["libs/*"]\n')
+        assert workspace_patterns(str(tmp_path)) == (["libs/*"], [])
+
+
+class TestFindWorkspacePackages:
+    def test_expands_globs_and_applies_excludes(self, tmp_path: Path) -> None:
+        (tmp_path / "package.json").write_text(json.dumps({"workspaces": ["packages/*", "!packages/b"]}))
+        _package(tmp_path, "packages/a")
+        _package(tmp_path, "packages/b")
+        (tmp_path / "packages" / "no-manifest").mkdir()
+        assert find_workspace_packages(str(tmp_path), SKIP) == ["packages/a"]
+
+    def test_ignores_skipped_dirs_and_escapes(self, tmp_path: Path) -> None:
+        (tmp_path / "package.json").write_text(json.dumps({"workspaces": ["**", "../outside"]}))
+        _package(tmp_path, "node_modules/dep")
+        _package(tmp_path, "libs/x")
+        assert find_workspace_packages(str(tmp_path), SKIP) == ["libs/x"]
+
+    def test_not_a_monorepo(self, tmp_path: Path) -> None:
+        (tmp_path / "package.json").write_text("{}")
+        assert find_workspace_packages(str(tmp_path), SKIP) == []
+
+
+class TestPackageName:
+    def test_manifest_names(self, tmp_path: Path) -> None:
+        _package(tmp_path, "js", body='{"name": "@scope/js"}')
+        _package(tmp_path, "rs", "Cargo.toml", '[package]\nname = "rs-crate"\n')
+        _package(tmp_path, "py", "pyproject.toml", '[project]\nname = "py-lib"\n')
+        _package(tmp_path, "anon")
+        assert package_name(str(tmp_path / "js")) == "@scope/js"
+        assert package_name(str(tmp_path / "rs")) == "rs-crate"
+        assert package_name(str(tmp_path / "py")) == "py-lib"
+        assert package_name(str(tmp_path / "anon")) is None
@@ -0,0 +1,227 @@
+"""
+Monorepo workspace discovery for scan.py.
+
+Reads the workspace manifests at a project root and expands their member
+patterns into package directories (paths relative to the root):
+
+  - package.json "workspaces" (npm/yarn; list or {"packages": [...]})
+  - pnpm-workspace.yaml "packages:" list
+  - Cargo.toml [workspace] members / exclude
+  - pyproject.toml [tool.uv.workspace] members / exclude
+
+Only directory listings along the member patterns are touched; counting the
+packages' source lines is left to scan.py's single walk.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+# A directory is a package if it carries one of these manifests.
+PACKAGE_MANIFESTS: tuple[str, ...] = ("package.json", "Cargo.toml", "pyproject.toml")
+
+_QUOTED = re.compile(r"""["']([^"']*)["']""")
+
+
+def _read_text(path: Path) -> str | None:
+    try:
+        return path.read_text()
+    except OSError:
+        return None
+
+
+def toml_table_lines(text: str, table: str) -> list[str]:
+    """Lines belonging to ``[table]`` (up to the next table header)."""
+    lines: list[str] = []
+    inside = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("["):
+            inside = stripped == f"[{table}]"
+            continue
+        if inside:
+            lines.append(line)
+    return lines
+
+
+def toml_string_array(text: str, table: str, key: str) -> list[str]:
+    """Values of ``key = ["a", "b"]`` in ``[table]``; the array may span lines."""
+    collected = ""
+    collecting = False
+    for line in toml_table_lines(text, table):
+        body = line.split("#", 1)[0]
+        if not collecting:
+            name, sep, rest = body.partition("=")
+            if sep and name.strip() == key and rest.strip().startswith("["):
+                collecting = True
+                body = rest
+            else:
+                continue
+        collected += body
+        if "]" in body:
+            break
+    return _QUOTED.findall(collected) if collecting else []
+
+
+def toml_string(text: str, table: str, key: str) -> str | None:
+    """Value of ``key = "..."`` in ``[table]``."""
+    for line in toml_table_lines(text, table):
+        name, sep, rest = line.partition("=")
+        if sep and name.strip() == key:
+            match = _QUOTED.search(rest)
+            if match:
+                return match.group(1)
+    return None
+
+
+def _pnpm_packages(text: str) -> list[str]:
+    patterns: list[str] = []
+    inside = False
+    for line in text.splitlines():
+        stripped = line.split("#", 1)[0].rstrip()
+        if not stripped:
+            continue
+        if not line[0].isspace():
+            inside = stripped.startswith("packages:")
+            continue
+        if inside and stripped.lstrip().startswith("-"):
+            value = stripped.lstrip()[1:].strip().strip("\"'")
+            if value:
+                patterns.append(value)
+    return patterns
+
+
+def workspace_patterns(path: str) -> tuple[list[str], list[str]]:
+    """(include, exclude) member patterns declared by the root's manifests."""
+    root = Path(path)
+    include: list[str] = []
+    exclude: list[str] = []
+
+    text = _read_text(root / "package.json")
+    if text is not None:
+        try:
+            pkg = json.loads(text)
+        except json.JSONDecodeError:
+            pkg = None
+        if isinstance(pkg, dict):
+            ws = pkg.get("workspaces")
+            if isinstance(ws, dict):
+                ws = ws.get("packages")
+            if isinstance(ws, list):
+                include += [p for p in ws if isinstance(p, str)]
+
+    text = _read_text(root / "pnpm-workspace.yaml")
+    if text is not None:
+        include += _pnpm_packages(text)
+
+    text = _read_text(root / "Cargo.toml")
+    if text is not None:
+        include += toml_string_array(text, "workspace", "members")
+        exclude += toml_string_array(text, "workspace", "exclude")
+
+    text = _read_text(root / "pyproject.toml")
+    if text is not None:
+        include += toml_string_array(text, "tool.uv.workspace", "members")
+        exclude += toml_string_array(text, "tool.uv.workspace", "exclude")
+
+    # npm/pnpm negations ("!packages/internal") are excludes too.
+    exclude += [p[1:] for p in include if p.startswith("!")]
+    include = [p for p in include if not p.startswith("!")]
+    return include, exclude
+
+
+def _segment_matcher(segment: str) -> "re.Pattern[str]":
+    source = re.escape(segment).replace(r"\*", "[^/]*").replace(r"\?", "[^/]")
+    return re.compile(f"^{source}$")
+
+
+def glob_dirs(root: str, pattern: str, skip_dirs: set[str]) -> list[str]:
+    """Directories under ``root`` matching a relative glob (``*``, ``?``, ``**``).
+
+    Wildcards never descend into hidden or skipped directories, so ``**`` in a
+    manifest can't drag the lookup through node_modules or .git.
+    """
+    segments = pattern.split("/")
+    results: list[str] = []
+
+    def step(directory: str, rel: str, i: int) -> None:
+        if i == len(segments):
+            results.append(rel)
+            return
+        try:
+            with os.scandir(directory) as it:
+                subdirs = [e.name for e in it if e.is_dir()]
+        except OSError:
+            return
+        segment = segments[i]
+        if segment == "**":
+            step(directory, rel, i + 1)
+            for name in subdirs:
+                if not name.startswith(".") and name not in skip_dirs:
+                    step(os.path.join(directory, name), f"{rel}/{name}" if rel else name, i)
+            return
+        if any(c in segment for c in "*?"):
+            matcher = _segment_matcher(segment)
+            for name in subdirs:
+                if matcher.match(name) and not name.startswith(".") and name not in skip_dirs:
+                    step(os.path.join(directory, name), f"{rel}/{name}" if rel else name, i + 1)
+        elif segment in subdirs:
+            step(os.path.join(directory, segment), f"{rel}/{segment}" if rel else segment, i + 1)
+
+    step(root, "", 0)
+    return results
+
+
+def _expand(root: str, pattern: str, skip_dirs: set[str]) -> set[str]:
+    pattern = pattern.strip().strip("/")
+    if pattern.startswith("./"):
+        pattern = pattern[2:]
+    if not pattern or ".." in pattern.split("/"):
+        return set()
+    matches: set[str] = set()
+    for rel in glob_dirs(root, pattern, skip_dirs):
+        if any(part in skip_dirs for part in rel.split("/")):
+            continue
+        package_dir = os.path.join(root, *rel.split("/"))
+        if any(os.path.isfile(os.path.join(package_dir, m)) for m in PACKAGE_MANIFESTS):
+            matches.add(rel)
+    return matches
+
+
+def find_workspace_packages(path: str, skip_dirs: set[str]) -> list[str]:
+    """Sorted package directories (relative, POSIX) declared by the root."""
+    include, exclude = workspace_patterns(path)
+    if not include:
+        return []
+    packages: set[str] = set()
+    for pattern in include:
+        packages |= _expand(path, pattern, skip_dirs)
+    for pattern in exclude:
+        packages -= _expand(path, pattern, skip_dirs)
+    packages.discard("")
+    return sorted(packages)
+
+
+def package_name(package_path: str) -> str | None:
+    """Declared name from the package's own manifest, if any."""
+    root = Path(package_path)
+    text = _read_text(root / "package.json")
+    if text is not None:
+        try:
+            name = json.loads(text).get("name")
+        except (json.JSONDecodeError, AttributeError):
+            name = None
+        if isinstance(name, str) and name:
+            return name
+    text = _read_text(root / "Cargo.toml")
+    if text is not None:
+        name = toml_string(text, "package", "name")
+        if name:
+            return name
+    text = _read_text(root / "pyproject.toml")
+    if text is not None:
+        name = toml_string(text, "project", "name")
+        if name:
+            return name
+    return None
@@ -8,6 +8,7 @@
 import { describe, it, expect } from "vitest";
 import { execFileSync } from "child_process";
 import fs from "fs";
+import os from "os";
 import path from "path";
 
 const FIXTURES_DIR = path.resolve(process.cwd(), "pipeline/fixtures");
@@ -100,9 +101,11 @@ const SCAN_PROJECT_KEYS = [
   "isRepo", "lastCommitDate", "lastCommitMessage", "branch", "remoteUrl",
   "commitCount", "daysInactive", "isDirty", "untrackedCount", "modifiedCount",
   "stagedCount", "ahead", "behind", "recentCommits", "branchCount", "stashCount",
+  "staleBranchCount", "staleBranches", "untrackedTruncated", "statusTimedOut",
   "languages", "files", "cicd", "deployment",
   "todoCount", "fixmeCount", "description", "framework", "liveUrl",
   "scripts", "services", "locEstimate", "packageManager", "license",
+  "workspaces", "identityKey", "skippedFiles",
 ].sort();
 
 const SCAN_FILES_KEYS = [
@@ -163,6 +166,7 @@ describe("pipeline parity — Python scan structural validation", () => {
       expect(p.locEstimate).toBeTypeOf("number");
       expect(Array.isArray(p.scripts)).toBe(true);
       expect(Array.isArray(p.services)).toBe(true);
+      expect(Array.isArray(p.workspaces)).toBe(true);
 
       // Nested object key parity
       expect(Object.keys(p.files).sort()).toEqual(SCAN_FILES_KEYS);
@@ -226,6 +230,38 @@ describe("pipeline parity — TypeScript derive vs Python golden baseline", () =
     expect(tags).toContain("java-kotlin-android");
     expect(tags).not.toContain("java-kotlin/android");
   });
+
+  it("TS derive applies scoringRules overrides like derive.py", async () => {
+    const scoringRules = {
+      status: { signal: "ahead", tiers: [[0, "synced"], [5, "close"]], default: "far" },
+      momentum: { rules: [{ name: "fresh", signal: "daysInactive", op: "lt", value: 10, points: 3, default: 99 }] },
+      health: { weights: { hygiene: 0.5, momentum: 0.5 } },
+    };
+    const dataDir = fs.mkdtempSync(path.join(os.tmpdir(), "scoring-rules-"));
+    fs.writeFileSync(path.join(dataDir, "settings.json"), JSON.stringify({ scoringRules }));
+    const scanInput = fs.readFileSync(SCAN_INPUT, "utf-8");
+    const expected = JSON.parse(
+      execFileSync("python3", [path.resolve(process.cwd(), "pipeline/derive.py")], {
+        input: scanInput,
+        encoding: "utf-8",
+        timeout: 10_000,
+        env: { ...process.env, APP_DATA_DIR: dataDir },
+      })
+    );
+    fs.rmSync(dataDir, { recursive: true, force: true });
+
+    const { deriveAll } = await import("@/lib/pipeline-native/derive");
+    const { loadScorer } = await import("@/lib/pipeline-native/rules");
+    expect(deriveAll(JSON.parse(scanInput), loadScorer(scoringRules))).toEqual(expected);
+  });
+
+  it("TS rules reject malformed scoringRules with derive.py's messages", async () => {
+    const { loadScorer, RuleError } = await import("@/lib/pipeline-native/rules");
+    expect(() => loadScorer({ nope: {} })).toThrow(RuleError);
+    expect(() => loadScorer({ hygiene: { rules: [{ name: "a", op: "zz" }] } })).toThrow(
+      "hygiene.rules[0]: unknown op 'zz'"
+    );
+  });
 });
 
 describe("pipeline parity — TS scan error semantics", () => {
@@ -235,6 +271,25 @@ describe("pipeline parity — TS scan error semantics", () => {
   });
 });
 
+describe("pipeline parity — TS scan identity", () => {
+  it("reuses the previous identityKey only while HEAD and remote are unchanged", async () => {
+    const { scanProject } = await import("@/lib/pipeline-native/scan");
+    const repo = fs.mkdtempSync(path.join(os.tmpdir(), "identity-"));
+    const git = (...args: string[]) => execFileSync("git", args, { cwd: repo, encoding: "utf-8" });
+    git("init", "-q");
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "first");
+
+    const fresh = scanProject(repo);
+    expect(fresh.identityKey).toMatch(/^[0-9a-f]{16}$/);
+    const cached = { ...fresh, identityKey: "cachedidentity00" };
+    expect(scanProject(repo, cached).identityKey).toBe("cachedidentity00");
+
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "second");
+    expect(scanProject(repo, cached).identityKey).toBe(fresh.identityKey);
+    fs.rmSync(repo, { recursive: true, force: true });
+  });
+});
+
 describe("pipeline parity — LOC counting", () => {
   it("TS locEstimate matches Python locEstimate for fixture projects", async () => {
     const { scanAll } = await import("@/lib/pipeline-native/scan");
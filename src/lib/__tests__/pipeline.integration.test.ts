@@ -209,6 +209,47 @@ describe("pipeline integration — soft-prune", () => {
   });
 });
 
+describe("pipeline integration — moved projects", () => {
+  it("moved project keeps its row under the new path", async () => {
+    const original = { ...SCAN_FIXTURE.projects[1], identityKey: "ident-bbb" };
+    mockScanProjects.projectMap.set(original.path, original);
+    await runRefreshPipeline(() => {}, undefined, { skipLlm: true });
+    const before = await db.project.findFirst({ where: { pathHash: "hash-bbb" } });
+
+    // Second run: proj-b renamed to proj-b-renamed (new path, same identity)
+    const newPath = "/Users/test/dev/proj-b-renamed";
+    mockScanProjects.dirs = [
+      { name: "proj-a", absPath: "/Users/test/dev/proj-a", pathHash: "hash-aaa" },
+      { name: "proj-b-renamed", absPath: newPath, pathHash: "hash-bbb-moved" },
+      { name: "proj-c", absPath: "/Users/test/dev/proj-c", pathHash: "hash-ccc" },
+    ];
+    mockScanProjects.projectMap.set(newPath, { ...original, name: "proj-b-renamed", path: newPath, pathHash: "hash-bbb-moved" });
+    mockScanProjects.deriveMap.set("hash-bbb-moved", { ...mockScanProjects.deriveMap.get("hash-bbb"), pathHash: "hash-bbb-moved" });
+    await runRefreshPipeline(() => {}, undefined, { skipLlm: true });
+
+    const after = await db.project.findFirst({ where: { pathHash: "hash-bbb-moved" } });
+    expect(after.id).toBe(before.id);
+    expect(after.name).toBe("proj-b-renamed");
+    expect(after.pathDisplay).toBe(newPath);
+    expect(after.prunedAt).toBeNull();
+    expect(await db.project.count()).toBe(3);
+  });
+
+  it("new path without a matching identity creates a new project", async () => {
+    await runRefreshPipeline(() => {}, undefined, { skipLlm: true });
+
+    const newPath = "/Users/test/dev/proj-d";
+    mockScanProjects.dirs = [
+      { name: "proj-a", absPath: "/Users/test/dev/proj-a", pathHash: "hash-aaa" },
+      { name: "proj-d", absPath: newPath, pathHash: "hash-ddd" },
+    ];
+    mockScanProjects.projectMap.set(newPath, { ...SCAN_FIXTURE.projects[1], name: "proj-d", path: newPath, pathHash: "hash-ddd" });
+    await runRefreshPipeline(() => {}, undefined, { skipLlm: true });
+
+    expect(await db.project.count()).toBe(4);
+  });
+});
+
 describe("pipeline integration — LLM enrichment", () => {
   it("success creates Llm records with new fields, does NOT populate Metadata", async () => {
     mockConfig.llmProvider = "claude-cli";
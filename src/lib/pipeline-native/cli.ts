@@ -0,0 +1,47 @@
+/**
+ * Command-line entry for the TS-native pipeline, shaped like the Python CLIs
+ * so pipeline/parity.py can run both engines the same way:
+ *
+ *   cli.ts scan <dev_root> <exclude_csv>   scan JSON to stdout
+ *   cli.ts derive                          scan JSON on stdin, derive JSON to stdout
+ *
+ * Like scan.py, the scan skips folders that are neither git repos nor carry
+ * language indicators, and derive applies the settings' "scoringRules" like
+ * derive.py. Errors print {"error": ...} and exit 1.
+ */
+
+import fs from "fs";
+import { getSettings } from "../settings";
+import { deriveAll, type ScanProject } from "./derive";
+import { loadScorer, RuleError } from "./rules";
+import { scanAll } from "./scan";
+
+function main(argv: string[]): number {
+  const [command, ...rest] = argv;
+  try {
+    if (command === "scan" && rest.length >= 1) {
+      const excludes = (rest[1] ?? "").split(",").map((d) => d.trim()).filter(Boolean);
+      process.stdout.write(JSON.stringify(scanAll(rest[0], excludes, false)) + "\n");
+      return 0;
+    }
+    if (command === "derive") {
+      let scorer;
+      try {
+        scorer = loadScorer(getSettings().scoringRules);
+      } catch (err) {
+        if (err instanceof RuleError) throw new Error(`invalid scoringRules: ${err.message}`);
+        throw err;
+      }
+      const input = JSON.parse(fs.readFileSync(0, "utf-8")) as { scannedAt: string; projects: ScanProject[] };
+      process.stdout.write(JSON.stringify(deriveAll(input, scorer), null, 2) + "\n");
+      return 0;
+    }
+  } catch (err) {
+    process.stdout.write(JSON.stringify({ error: err instanceof Error ? err.message : String(err) }) + "\n");
+    return 1;
+  }
+  process.stderr.write("Usage: cli.ts scan <dev_root> <exclude_csv> | cli.ts derive\n");
+  return 1;
+}
+
+process.exitCode = main(process.argv.slice(2));
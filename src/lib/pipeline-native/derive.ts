@@ -20,14 +20,21 @@
  *   Low stale branches (<=3): +10
  *
  * Health score: round(0.65 * hygiene + 0.35 * momentum)
+ *
+ * These are the defaults in pipeline/scoring-rules.json, shared with
+ * derive.py; a "scoringRules" settings object overrides them in both engines
+ * (see rules.ts).
  */
 
+import { DEFAULT_SCORER, type Scorer } from "./rules";
+
 export interface ScanProject {
   pathHash: string;
   daysInactive: number | null;
   isDirty: boolean;
   ahead: number;
   branchCount: number;
+  staleBranchCount?: number;
   remoteUrl: string | null;
   todoCount: number;
   framework: string | null;
@@ -66,52 +73,15 @@ export interface DeriveOutput {
 }
 
 export function deriveStatus(daysInactive: number | null): DeriveProject["statusAuto"] {
-  if (daysInactive === null) return "archived";
-  if (daysInactive <= 14) return "active";
-  if (daysInactive <= 60) return "completed";
-  if (daysInactive <= 180) return "paused";
-  return "archived";
+  return DEFAULT_SCORER.statusOf(daysInactive) as DeriveProject["statusAuto"];
 }
 
 export function deriveHygieneScore(project: ScanProject): [number, Record<string, number>] {
-  const breakdown: Record<string, number> = {};
-  const files = project.files ?? {};
-  const cicd = project.cicd ?? {};
-  const deployment = project.deployment ?? {};
-
-  if (files.readme) breakdown.readme = 15;
-  if (files.tests) breakdown.tests = 20;
-  if (Object.values(cicd).some(Boolean)) breakdown.cicd = 15;
-  if (project.remoteUrl) breakdown.remote = 10;
-  if ((project.todoCount ?? 0) < 10) breakdown.lowTodos = 10;
-  if (Object.values(deployment).some(Boolean)) breakdown.deployment = 10;
-  if (files.linterConfig) breakdown.linter = 5;
-  if (files.license) breakdown.license = 5;
-  if (files.lockfile) breakdown.lockfile = 5;
-
-  const raw = Object.values(breakdown).reduce((a, b) => a + b, 0);
-  const normalized = Math.min(Math.round((raw * 100) / 95), 100);
-  return [normalized, breakdown];
+  return DEFAULT_SCORER.hygiene(project);
 }
 
 export function deriveMomentumScore(project: ScanProject): [number, Record<string, number>] {
-  const breakdown: Record<string, number> = {};
-
-  const days = project.daysInactive;
-  if (days !== null) {
-    if (days <= 7) breakdown.recency = 25;
-    else if (days <= 14) breakdown.recency = 20;
-    else if (days <= 30) breakdown.recency = 15;
-    else if (days <= 60) breakdown.recency = 5;
-  }
-
-  if (!project.isDirty) breakdown.cleanTree = 20;
-  if ((project.ahead ?? 0) === 0) breakdown.pushedUp = 15;
-  if ((project.branchCount ?? 0) <= 3) breakdown.lowBranches = 10;
-
-  const raw = Object.values(breakdown).reduce((a, b) => a + b, 0);
-  const normalized = Math.min(Math.round((raw * 100) / 70), 100);
-  return [normalized, breakdown];
+  return DEFAULT_SCORER.momentum(project);
 }
 
 export function deriveTags(project: ScanProject): string[] {
@@ -139,28 +109,26 @@ export function deriveTags(project: ScanProject): string[] {
   return [...tags].sort();
 }
 
-export function deriveProject(project: ScanProject): DeriveProject {
-  const [hygiene, hygieneBreakdown] = deriveHygieneScore(project);
-  const [momentum, momentumBreakdown] = deriveMomentumScore(project);
-  const health = Math.round(0.65 * hygiene + 0.35 * momentum);
+export function deriveProject(project: ScanProject, scorer: Scorer = DEFAULT_SCORER): DeriveProject {
+  const [health, hygiene, momentum, breakdown] = scorer.health(project);
 
   return {
     pathHash: project.pathHash,
-    statusAuto: deriveStatus(project.daysInactive),
+    statusAuto: scorer.status(project) as DeriveProject["statusAuto"],
     healthScoreAuto: health,
     hygieneScoreAuto: hygiene,
     momentumScoreAuto: momentum,
-    scoreBreakdownJson: {
-      hygiene: hygieneBreakdown,
-      momentum: momentumBreakdown,
-    },
+    scoreBreakdownJson: breakdown,
     tags: deriveTags(project),
   };
 }
 
-export function deriveAll(scanOutput: { scannedAt: string; projects: ScanProject[] }): DeriveOutput {
+export function deriveAll(
+  scanOutput: { scannedAt: string; projects: ScanProject[] },
+  scorer: Scorer = DEFAULT_SCORER,
+): DeriveOutput {
   return {
     derivedAt: scanOutput.scannedAt,
-    projects: scanOutput.projects.map(deriveProject),
+    projects: scanOutput.projects.map((project) => deriveProject(project, scorer)),
   };
 }
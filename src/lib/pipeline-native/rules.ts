@@ -0,0 +1,275 @@
+/**
+ * Declarative scoring rules for derive.ts (mirrors pipeline/rules.py).
+ *
+ * Both engines read the defaults from pipeline/scoring-rules.json and apply
+ * the same "scoringRules" settings overrides, validated with the same
+ * messages, so derive.ts and derive.py score alike. See rules.py for the
+ * rule format. Evaluation follows Python semantics where JS differs:
+ * truthiness ({} and [] are falsy), bools compare as numbers, a key that is
+ * present with null doesn't take the rule's default, and rounding is
+ * half-to-even.
+ *
+ * rules.py compiles a rule set to Python source; here it compiles to
+ * closures, validated once per run.
+ */
+
+import defaultRules from "../../../pipeline/scoring-rules.json";
+
+export class RuleError extends Error {}
+
+type Mapping = Record<string, unknown>;
+type Breakdown = Record<string, number>;
+type Check = (project: Mapping) => [string, number] | null;
+
+export const DEFAULT_RULES: Mapping = defaultRules;
+
+const COMPARISONS: Record<string, (a: number, b: number) => boolean> = {
+  lt: (a, b) => a < b,
+  le: (a, b) => a <= b,
+  gt: (a, b) => a > b,
+  ge: (a, b) => a >= b,
+};
+const OPS = new Set(["truthy", "falsy", "any", "tiers", "eq", "ne", ...Object.keys(COMPARISONS)]);
+
+function isMapping(value: unknown): value is Mapping {
+  return typeof value === "object" && value !== null && !Array.isArray(value);
+}
+
+/** Python's isinstance(value, (int, float)): bools count. */
+function isNumeric(value: unknown): value is number | boolean {
+  return typeof value === "number" || typeof value === "boolean";
+}
+
+function truthy(value: unknown): boolean {
+  if (Array.isArray(value)) return value.length > 0;
+  if (isMapping(value)) return Object.keys(value).length > 0;
+  return Boolean(value);
+}
+
+function equals(a: unknown, b: unknown): boolean {
+  return isNumeric(a) && isNumeric(b) ? Number(a) === Number(b) : a === b;
+}
+
+/** Python's round(): half to even. */
+export function pyRound(value: number): number {
+  const floor = Math.floor(value);
+  const diff = value - floor;
+  if (diff !== 0.5) return Math.round(value);
+  return floor % 2 === 0 ? floor : floor + 1;
+}
+
+function typeName(value: unknown): string {
+  if (Array.isArray(value)) return "list";
+  if (isMapping(value)) return "dict";
+  return typeof value;
+}
+
+function literal(value: unknown, where: string): unknown {
+  if (value === undefined || value === null || typeof value === "boolean" || typeof value === "string") {
+    return value ?? null;
+  }
+  if (typeof value === "number") {
+    if (!Number.isFinite(value)) throw new RuleError(`${where}: expected a finite number`);
+    return value;
+  }
+  throw new RuleError(`${where}: expected a scalar, got ${typeName(value)}`);
+}
+
+function number(value: unknown, where: string): number {
+  if (typeof value !== "number" || !Number.isFinite(value)) throw new RuleError(`${where}: expected a number`);
+  return value;
+}
+
+function tiersOf(spec: Mapping, where: string): [number, unknown][] {
+  const tiers = spec.tiers;
+  if (!Array.isArray(tiers) || tiers.length === 0) {
+    throw new RuleError(`${where}: 'tiers' must be a non-empty list of [bound, value]`);
+  }
+  return tiers.map((tier, i) => {
+    if (!Array.isArray(tier) || tier.length !== 2) throw new RuleError(`${where}.tiers[${i}]: expected [bound, value]`);
+    return [number(tier[0], `${where}.tiers[${i}]`), tier[1]] as [number, unknown];
+  });
+}
+
+/** Accessor for a dotted signal path; only mappings are descended into. */
+function signal(path: unknown, fallbackValue: unknown, where: string): (project: Mapping) => unknown {
+  if (typeof path !== "string" || !path || path.split(".").some((p) => !p)) {
+    throw new RuleError(`${where}: 'signal' must be a dotted path`);
+  }
+  const parts = path.split(".");
+  const last = parts.pop()!;
+  return (project) => {
+    let node: Mapping = project;
+    for (const part of parts) {
+      const child = Object.hasOwn(node, part) ? node[part] : undefined;
+      node = isMapping(child) ? child : {};
+    }
+    return Object.hasOwn(node, last) ? node[last] : fallbackValue;
+  };
+}
+
+function signalWithFallback(
+  path: unknown,
+  fallback: unknown,
+  fallbackValue: unknown,
+  where: string,
+): (project: Mapping) => unknown {
+  if (fallback === undefined || fallback === null) return signal(path, fallbackValue, where);
+  const primary = signal(path, null, where);
+  const secondary = signal(fallback, fallbackValue, `${where}.fallback`);
+  return (project) => primary(project) ?? secondary(project);
+}
+
+export interface Scorer {
+  statusOf(value: unknown): unknown;
+  status(project: object): unknown;
+  hygiene(project: object): [number, Breakdown];
+  momentum(project: object): [number, Breakdown];
+  health(project: object): [number, number, number, { hygiene: Breakdown; momentum: Breakdown }];
+}
+
+/** Overlay user sections on the defaults; each section is replaced whole. */
+export function mergeRules(overrides: unknown): Mapping {
+  if (!truthy(overrides)) return DEFAULT_RULES;
+  if (!isMapping(overrides)) throw new RuleError("scoringRules must be an object");
+  const unknown = Object.keys(overrides).filter((k) => !(k in DEFAULT_RULES)).sort();
+  if (unknown.length) {
+    throw new RuleError(`scoringRules: unknown section(s) [${unknown.map((k) => `'${k}'`).join(", ")}]`);
+  }
+  return { ...DEFAULT_RULES, ...overrides };
+}
+
+function compileSection(section: unknown, where: string): (project: object) => [number, Breakdown] {
+  if (!isMapping(section) || !Array.isArray(section.rules)) {
+    throw new RuleError(`${where}: expected {"rules": [...]}`);
+  }
+  const checks: Check[] = [];
+  let bestTotal = 0;
+  section.rules.forEach((rule: unknown, i: number) => {
+    const at = `${where}.rules[${i}]`;
+    if (!isMapping(rule)) throw new RuleError(`${at}: expected an object`);
+    const name = rule.name;
+    if (typeof name !== "string" || !name) throw new RuleError(`${at}: 'name' is required`);
+    const op = rule.op;
+    if (typeof op !== "string" || !OPS.has(op)) {
+      throw new RuleError(`${at}: unknown op ${typeof op === "string" ? `'${op}'` : String(op ?? "None")}`);
+    }
+
+    if (op === "tiers") {
+      const tiers = tiersOf(rule, at);
+      const read = signalWithFallback(rule.signal, rule.fallback, null, at);
+      const awards = tiers.map(([bound, points], j) => [bound, number(points, `${at}.tiers[${j}]`)] as const);
+      bestTotal += Math.max(...awards.map(([, points]) => points));
+      checks.push((project) => {
+        const value = read(project);
+        if (!isNumeric(value)) return null;
+        const tier = awards.find(([bound]) => Number(value) <= bound);
+        return tier ? [name, tier[1]] : null;
+      });
+      return;
+    }
+
+    const points = number(rule.points, `${at}.points`);
+    bestTotal += points;
+    let matches: (project: Mapping) => boolean;
+    if (op === "any") {
+      const read = signal(rule.signal, {}, at);
+      matches = (project) => {
+        const value = read(project);
+        return isMapping(value) && Object.values(value).some(truthy);
+      };
+    } else {
+      // Ordering comparisons need numbers on both sides at evaluation.
+      const compare = COMPARISONS[op];
+      const fallbackValue =
+        compare && rule.default !== undefined && rule.default !== null
+          ? number(rule.default, `${at}.default`)
+          : literal(rule.default, `${at}.default`);
+      const read = signalWithFallback(rule.signal, rule.fallback, fallbackValue, at);
+      if (op === "truthy") {
+        matches = (project) => truthy(read(project));
+      } else if (op === "falsy") {
+        matches = (project) => !truthy(read(project));
+      } else if (compare) {
+        const bound = number(rule.value, `${at}.value`);
+        matches = (project) => {
+          const value = read(project);
+          return isNumeric(value) && compare(Number(value), bound);
+        };
+      } else {
+        const expected = literal(rule.value, `${at}.value`);
+        const negate = op === "ne";
+        matches = (project) => {
+          const value = read(project);
+          return value !== null && value !== undefined && equals(value, expected) !== negate;
+        };
+      }
+    }
+    checks.push((project) => (matches(project) ? [name, points] : null));
+  });
+
+  const maxRaw = section.max === undefined ? bestTotal : section.max;
+  const max = number(maxRaw, `${where}.max`);
+  if (!max) throw new RuleError(`${where}.max: must be non-zero`);
+  return (project) => {
+    const breakdown: Breakdown = {};
+    for (const check of checks) {
+      const award = check(project as Mapping);
+      if (award) breakdown[award[0]] = award[1];
+    }
+    const raw = Object.values(breakdown).reduce((a, b) => a + b, 0);
+    return [Math.min(pyRound((raw * 100) / max), 100), breakdown];
+  };
+}
+
+function compileStatus(section: unknown): [Scorer["statusOf"], Scorer["status"]] {
+  if (!isMapping(section)) throw new RuleError("status: expected an object");
+  const tiers = tiersOf(section, "status");
+  const fallback = literal(section.default, "status.default");
+  const read = signal(section.signal, null, "status");
+  const labels = tiers.map(([bound, label], j) => [bound, literal(label, `status.tiers[${j}]`)] as const);
+  const statusOf = (value: unknown) => {
+    if (!isNumeric(value)) return fallback;
+    const tier = labels.find(([bound]) => Number(value) <= bound);
+    return tier ? tier[1] : fallback;
+  };
+  return [statusOf, (project) => statusOf(read(project as Mapping))];
+}
+
+/** Validate a full rule set and compile it into a Scorer. */
+export function compileRules(rules: unknown): Scorer {
+  if (!isMapping(rules)) throw new RuleError("rule set must be an object");
+  const health = rules.health;
+  const weights = isMapping(health) ? health.weights : undefined;
+  if (!isMapping(weights)) {
+    throw new RuleError('health: expected {"weights": {"hygiene": w, "momentum": w}}');
+  }
+  const wHygiene = number(weights.hygiene, "health.weights.hygiene");
+  const wMomentum = number(weights.momentum, "health.weights.momentum");
+  const [statusOf, status] = compileStatus(rules.status);
+  const hygiene = compileSection(rules.hygiene, "hygiene");
+  const momentum = compileSection(rules.momentum, "momentum");
+  return {
+    statusOf,
+    status,
+    hygiene,
+    momentum,
+    health(project) {
+      const [hygieneScore, hygieneBreakdown] = hygiene(project);
+      const [momentumScore, momentumBreakdown] = momentum(project);
+      return [
+        pyRound(wHygiene * hygieneScore + wMomentum * momentumScore),
+        hygieneScore,
+        momentumScore,
+        { hygiene: hygieneBreakdown, momentum: momentumBreakdown },
+      ];
+    },
+  };
+}
+
+export const DEFAULT_SCORER = compileRules(DEFAULT_RULES);
+
+/** Scorer for a settings "scoringRules" value (mirrors derive.py load_scorer). */
+export function loadScorer(overrides: unknown): Scorer {
+  return truthy(overrides) ? compileRules(mergeRules(overrides)) : DEFAULT_SCORER;
+}
@@ -6,7 +6,7 @@
  */
 
 import { createHash } from "crypto";
-import { execFileSync } from "child_process";
+import { execFileSync, spawnSync } from "child_process";
 import fs from "fs";
 import path from "path";
 
@@ -94,6 +94,72 @@ export function pathHash(absolutePath: string): string {
   return createHash("sha256").update(absolutePath).digest("hex").slice(0, 16);
 }
 
+/** host/owner/repo form of a remote URL, so SSH and HTTPS clones agree. */
+export function normalizeRemote(url: string): string {
+  const trimmed = url.trim();
+  let host = "";
+  let repo = trimmed;
+  const scp = /^[\w.-]+@([^:/]+):(.+)$/.exec(trimmed);
+  if (scp) {
+    host = scp[1];
+    repo = scp[2];
+  } else {
+    try {
+      const parsed = new URL(trimmed);
+      host = parsed.hostname;
+      repo = parsed.pathname;
+    } catch {
+      // Local path remote
+    }
+  }
+  repo = repo.replace(/^\/+|\/+$/g, "").replace(/\.git$/, "");
+  return host ? `${host.toLowerCase()}/${repo}` : repo;
+}
+
+/**
+ * Content identity that survives moves and renames: root commit + remote.
+ * Unlike pathHash it doesn't change when the folder does.
+ */
+export function identityKey(rootCommit: string | null, remoteUrl: string | null): string | null {
+  if (!rootCommit) return null;
+  const remote = remoteUrl ? normalizeRemote(remoteUrl) : "";
+  return createHash("sha256").update(`${rootCommit}\n${remote}`).digest("hex").slice(0, 16);
+}
+
+/** HEAD as recorded in a scan: its newest recent commit. */
+function scannedHead(scan: Record<string, unknown> | null | undefined): string | null {
+  const commits = scan?.recentCommits;
+  const head = Array.isArray(commits) ? (commits[0] as { hash?: unknown } | undefined)?.hash : undefined;
+  return typeof head === "string" ? head : null;
+}
+
+/**
+ * identityKey for a repo. While HEAD and the remote match the previous scan
+ * of the same path, its identityKey is reused instead of walking the full
+ * history again (scan.py keeps rootCommits in its state for the same reason).
+ */
+function projectIdentity(
+  projectPath: string,
+  remoteUrl: string | null,
+  head: string | null,
+  previous?: Record<string, unknown> | null,
+): string | null {
+  if (!fs.existsSync(path.join(projectPath, ".git"))) return null;
+  if (
+    head &&
+    previous &&
+    typeof previous.identityKey === "string" &&
+    scannedHead(previous) === head &&
+    (previous.remoteUrl ?? null) === remoteUrl
+  ) {
+    return previous.identityKey;
+  }
+  const roots = runGit(projectPath, "rev-list", "--max-parents=0", "HEAD");
+  // Merged histories can have several roots; the smallest is stable.
+  const root = roots ? roots.split(/\s+/).sort()[0] : null;
+  return identityKey(root, remoteUrl);
+}
+
 function runGit(cwd: string, ...args: string[]): string | null {
   try {
     return execFileSync("git", args, {
@@ -107,8 +173,58 @@ function runGit(cwd: string, ...args: string[]): string | null {
   }
 }
 
-function existsAt(dir: string, file: string): boolean {
-  return fs.existsSync(path.join(dir, file));
+/**
+ * Names at a directory's root from one readdir, so root-level detectors are
+ * set lookups instead of a stat each (mirrors pipeline/detectors.py).
+ * Nested names ("a/b") list the parent only when it is a directory. A name
+ * matching an entry only up to case is settled by one existsSync, so
+ * case-insensitive volumes (the macOS default) still match "Readme.md".
+ */
+class RootListing {
+  readonly names = new Set<string>();
+  readonly dirs = new Set<string>();
+  private readonly folded = new Set<string>();
+  private readonly children = new Map<string, RootListing>();
+
+  constructor(readonly dir: string) {
+    try {
+      for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+        this.names.add(entry.name);
+        this.folded.add(entry.name.toLowerCase());
+        if (entry.isDirectory() || (entry.isSymbolicLink() && isDirectory(path.join(dir, entry.name)))) {
+          this.dirs.add(entry.name);
+        }
+      }
+    } catch {
+      // unreadable or missing: empty listing
+    }
+  }
+
+  private hasName(name: string): boolean {
+    if (this.names.has(name)) return true;
+    return this.folded.has(name.toLowerCase()) && fs.existsSync(path.join(this.dir, name));
+  }
+
+  has(rel: string): boolean {
+    const slash = rel.indexOf("/");
+    if (slash < 0) return this.hasName(rel);
+    const head = rel.slice(0, slash);
+    if (!this.dirs.has(head) && !(this.hasName(head) && isDirectory(path.join(this.dir, head)))) return false;
+    let child = this.children.get(head);
+    if (!child) {
+      child = new RootListing(path.join(this.dir, head));
+      this.children.set(head, child);
+    }
+    return child.has(rel.slice(slash + 1));
+  }
+}
+
+function isDirectory(p: string): boolean {
+  try {
+    return fs.statSync(p).isDirectory();
+  } catch {
+    return false;
+  }
 }
 
 function readJsonSafe(filePath: string): Record<string, unknown> | null {
@@ -119,6 +235,207 @@ function readJsonSafe(filePath: string): Record<string, unknown> | null {
   }
 }
 
+// ---------------------------------------------------------------------------
+// Branch staleness (mirrors scan.py get_branches)
+// ---------------------------------------------------------------------------
+
+const STALE_BRANCH_DAYS = 30;
+
+let gitVersionCache: [number, number] | null | undefined;
+
+/** Installed git version, asked once per process. */
+function gitVersion(): [number, number] | null {
+  if (gitVersionCache === undefined) {
+    const match = /(\d+)\.(\d+)/.exec(runGit(process.cwd(), "version") ?? "");
+    gitVersionCache = match ? [parseInt(match[1], 10), parseInt(match[2], 10)] : null;
+  }
+  return gitVersionCache;
+}
+
+let initDefaultBranchCache: string | undefined;
+
+/** The user's init.defaultBranch, asked once per process; "" if unset. */
+function initDefaultBranch(): string {
+  if (initDefaultBranchCache === undefined) {
+    initDefaultBranchCache = runGit(process.cwd(), "config", "--get", "init.defaultBranch") ?? "";
+  }
+  return initDefaultBranchCache;
+}
+
+/** for-each-ref's %(ahead-behind:<ref>) atom arrived in git 2.41. */
+function hasAheadBehind(): boolean {
+  const v = gitVersion();
+  return v !== null && (v[0] > 2 || (v[0] === 2 && v[1] >= 41));
+}
+
+/** Whether a full ref name exists, loose or packed (read from .git, no subprocess). */
+function hasRef(projectPath: string, ref: string): boolean {
+  const gitDir = path.join(projectPath, ".git");
+  try {
+    if (fs.statSync(path.join(gitDir, ref)).isFile()) return true;
+  } catch {
+    // not a loose ref
+  }
+  const packed = readTextSafe(path.join(gitDir, "packed-refs")) ?? "";
+  return packed.split("\n").some((line) => line.endsWith(` ${ref}`));
+}
+
+/**
+ * The default branch as a ref under refs/, or null (mirrors scan.py
+ * default_branch_ref): origin/HEAD when it resolves, else the configured
+ * init.defaultBranch, main or master. Never the checked-out branch.
+ */
+function defaultBranchRef(projectPath: string): string | null {
+  const text = readTextSafe(path.join(projectPath, ".git", "refs", "remotes", "origin", "HEAD"))?.trim();
+  if (text?.startsWith("ref: refs/") && hasRef(projectPath, text.slice("ref: ".length))) {
+    return text.slice("ref: refs/".length);
+  }
+  for (const name of [initDefaultBranch(), "main", "master"]) {
+    if (name && hasRef(projectPath, `refs/heads/${name}`)) return `heads/${name}`;
+  }
+  return null;
+}
+
+interface BranchInfo {
+  name: string;
+  lastCommitDate: string | null;
+  ahead: number | null;
+  behind: number | null;
+}
+
+/**
+ * [local branch count, stale branches] from one for-each-ref listing. Stale:
+ * last commit older than STALE_BRANCH_DAYS, or fully merged into the default
+ * branch (age only when there is none). Older git (< 2.41) gets a second --merged listing and null
+ * ahead/behind; the number of git calls never grows with the branch count.
+ */
+function getBranches(projectPath: string, current: string | null): [number, BranchInfo[]] {
+  const base = defaultBranchRef(projectPath);
+  const withCounts = base !== null && hasAheadBehind();
+  let fmt = "%(refname)%00%(objectname)%00%(committerdate:iso-strict)";
+  if (withCounts) fmt += `%00%(ahead-behind:refs/${base})`;
+  const patterns = base === null || base.startsWith("heads/") ? ["refs/heads"] : ["refs/heads", `refs/${base}`];
+  const output = runGit(projectPath, "for-each-ref", `--format=${fmt}`, ...patterns);
+  if (!output) return [0, []];
+
+  const defaultName = base === null ? null : base.replace(/^remotes\/origin\//, "").replace(/^heads\//, "");
+  const branches: string[][] = [];
+  let baseSha: string | null = null;
+  for (const line of output.split("\n")) {
+    const fields = line.split("\0");
+    if (fields.length < 3) continue;
+    if (fields[0] === `refs/${base}`) baseSha = fields[1];
+    if (fields[0].startsWith("refs/heads/")) {
+      fields[0] = fields[0].slice("refs/heads/".length);
+      branches.push(fields);
+    }
+  }
+
+  let merged = new Set<string>();
+  if (base !== null && !withCounts) {
+    const listing = runGit(projectPath, "for-each-ref", "--merged", `refs/${base}`, "--format=%(refname:short)", "refs/heads");
+    merged = new Set(listing ? listing.split("\n") : []);
+  }
+
+  const stale: BranchInfo[] = [];
+  for (const [name, sha, rawDate, rawCounts] of branches) {
+    if (name === defaultName || name === current) continue;
+    const date = rawDate || null;
+    let ahead: number | null = null;
+    let behind: number | null = null;
+    let isMerged: boolean;
+    if (withCounts) {
+      const counts = (rawCounts ?? "").split(/\s+/);
+      if (counts.length === 2 && counts.every((c) => /^\d+$/.test(c))) {
+        ahead = parseInt(counts[0], 10);
+        behind = parseInt(counts[1], 10);
+      }
+      isMerged = ahead === 0 && !!behind;
+    } else {
+      isMerged = merged.has(name) && sha !== baseSha;
+    }
+    const age = date ? Math.floor((Date.now() - new Date(date).getTime()) / (1000 * 60 * 60 * 24)) : null;
+    if (isMerged || (age !== null && age >= STALE_BRANCH_DAYS)) {
+      stale.push({ name, lastCommitDate: date, ahead, behind });
+    }
+  }
+  return [branches.length, stale];
+}
+
+// Untracked entries counted before git status output is cut off (mirrors
+// scan.py STATUS_MAX_UNTRACKED); the buffer cap bounds memory either way.
+const STATUS_MAX_UNTRACKED = 1000;
+const STATUS_MAX_BUFFER = 8 * 1024 * 1024;
+
+interface WorkingTree {
+  dirty: boolean;
+  untracked: number;
+  modified: number;
+  staged: number;
+  /** untracked is a lower bound: stopped at the limit */
+  truncated: boolean;
+  /** every count is a lower bound: git was killed at the timeout, or its
+   * output hit STATUS_MAX_BUFFER before the untracked entries began */
+  timedOut: boolean;
+}
+
+/**
+ * `git status --porcelain -z`, bounded in entries, memory and time (mirrors
+ * scan.py working_tree_status). Tracked changes precede untracked entries,
+ * so modified/staged stay exact when untracked is cut off. A status that
+ * times out is reported dirty, never clean; one that fails outright reads
+ * as clean, as before.
+ */
+function workingTreeStatus(projectPath: string, maxUntracked = STATUS_MAX_UNTRACKED): WorkingTree {
+  const tree: WorkingTree = { dirty: false, untracked: 0, modified: 0, staged: 0, truncated: false, timedOut: false };
+  const result = spawnSync(
+    "git",
+    ["--no-optional-locks", "-c", "core.untrackedCache=true", "status", "--porcelain", "-z"],
+    { cwd: projectPath, timeout: 5_000, maxBuffer: STATUS_MAX_BUFFER, encoding: "utf-8", stdio: ["ignore", "pipe", "ignore"] },
+  );
+  const code = (result.error as NodeJS.ErrnoException | undefined)?.code;
+  const cutOff = code === "ENOBUFS";
+  if (code === "ETIMEDOUT") tree.timedOut = true;
+  else if (!cutOff && (result.error || result.status !== 0)) return tree;
+
+  const entries = (result.stdout ?? "").split("\0");
+  // A cut-off read may end mid-entry; only NUL-terminated entries count.
+  entries.pop();
+  let originFollows = false;
+  for (const entry of entries) {
+    if (originFollows) {
+      // Renames and copies carry their source path as an extra field.
+      originFollows = false;
+      continue;
+    }
+    if (entry.length < 3) continue;
+    const x = entry[0];
+    const y = entry[1];
+    if (x === "?" && y === "?") {
+      if (tree.untracked === maxUntracked) {
+        tree.truncated = true;
+        break;
+      }
+      tree.untracked++;
+    }
+    tree.dirty = true;
+    if (y === "M" || x === "M") tree.modified++;
+    if ("AMRD".includes(x) && y !== "?") tree.staged++;
+    originFollows = "RC".includes(x) || "RC".includes(y);
+  }
+  // Cut off by the buffer cap: only untracked is a lower bound if the cap
+  // fell among the untracked entries; otherwise the tracked counts are too.
+  if (cutOff && !tree.truncated) {
+    if (tree.untracked > 0) tree.truncated = true;
+    else tree.timedOut = true;
+  }
+  if (tree.timedOut) {
+    tree.truncated = false;
+    tree.dirty = true;
+  }
+  return tree;
+}
+
 // ---------------------------------------------------------------------------
 // Detection functions
 // ---------------------------------------------------------------------------
@@ -142,6 +459,10 @@ function getGitInfo(projectPath: string): Record<string, unknown> {
       recentCommits: [],
       branchCount: 0,
       stashCount: 0,
+      staleBranchCount: 0,
+      staleBranches: [],
+      untrackedTruncated: false,
+      statusTimedOut: false,
     };
   }
 
@@ -162,23 +483,8 @@ function getGitInfo(projectPath: string): Record<string, unknown> {
     }
   }
 
-  // Working tree status
-  const statusOutput = runGit(projectPath, "status", "--porcelain");
-  let isDirty = false;
-  let untracked = 0;
-  let modified = 0;
-  let staged = 0;
-  if (statusOutput) {
-    isDirty = true;
-    for (const line of statusOutput.split("\n")) {
-      if (line.length < 2) continue;
-      const x = line[0];
-      const y = line[1];
-      if (x === "?" && y === "?") untracked++;
-      if (y === "M" || x === "M") modified++;
-      if ("AMRD".includes(x) && y !== "?") staged++;
-    }
-  }
+  // Working tree status, bounded (see workingTreeStatus)
+  const tree = workingTreeStatus(projectPath);
 
   // Ahead/behind
   let aheadCount = 0;
@@ -206,9 +512,8 @@ function getGitInfo(projectPath: string): Record<string, unknown> {
     }
   }
 
-  // Branch count
-  const branchOutput = runGit(projectPath, "branch", "--list");
-  const branchCount = branchOutput ? branchOutput.split("\n").length : 0;
+  // Branches: count and staleness from one for-each-ref
+  const [branchCount, staleBranches] = getBranches(projectPath, branch);
 
   // Stash count
   const stashOutput = runGit(projectPath, "stash", "list");
@@ -222,30 +527,37 @@ function getGitInfo(projectPath: string): Record<string, unknown> {
     remoteUrl: remote,
     commitCount,
     daysInactive,
-    isDirty,
-    untrackedCount: untracked,
-    modifiedCount: modified,
-    stagedCount: staged,
+    isDirty: tree.dirty,
+    untrackedCount: tree.untracked,
+    modifiedCount: tree.modified,
+    stagedCount: tree.staged,
     ahead: aheadCount,
     behind: behindCount,
     recentCommits,
     branchCount,
     stashCount,
+    staleBranchCount: staleBranches.length,
+    staleBranches,
+    untrackedTruncated: tree.truncated,
+    statusTimedOut: tree.timedOut,
   };
 }
 
-function detectLanguages(projectPath: string): { primary: string | null; detected: string[] } {
+function detectLanguages(
+  projectPath: string,
+  listing = new RootListing(projectPath),
+): { primary: string | null; detected: string[] } {
   const detected: string[] = [];
   let primary: string | null = null;
 
   for (const [indicator, lang] of Object.entries(LANGUAGE_INDICATORS)) {
-    if (existsAt(projectPath, indicator)) {
+    if (listing.has(indicator)) {
       if (!detected.includes(lang)) detected.push(lang);
       if (primary === null) primary = lang;
     }
   }
 
-  if (existsAt(projectPath, "tsconfig.json")) {
+  if (listing.has("tsconfig.json")) {
     if (detected.includes("JavaScript/TypeScript")) {
       primary = "TypeScript";
     } else if (!detected.includes("TypeScript")) {
@@ -257,92 +569,382 @@ function detectLanguages(projectPath: string): { primary: string | null; detecte
   return { primary, detected };
 }
 
-function checkFiles(projectPath: string): Record<string, boolean> {
-  const p = projectPath;
-  const testDirs = ["tests", "test", "__tests__", "spec", "src/tests", "src/__tests__"];
-  const hasTests = testDirs.some((d) => fs.existsSync(path.join(p, d))) ||
-    (() => {
-      try {
-        return fs.readdirSync(p).some((f) => f.includes("test"));
-      } catch {
-        return false;
-      }
-    })();
+const TEST_DIRS = ["tests", "test", "__tests__", "spec", "src/tests", "src/__tests__"];
 
-  const hasLinter = LINTER_FILES.some((f) => existsAt(p, f));
-  const hasLockfile = LOCKFILE_MAP.some(([f]) => existsAt(p, f));
+function checkFiles(projectPath: string, listing = new RootListing(projectPath)): Record<string, boolean> {
+  const has = (name: string) => listing.has(name);
+  const hasTests = TEST_DIRS.some(has) || [...listing.names].some((f) => f.includes("test"));
 
   return {
-    readme: existsAt(p, "README.md") || existsAt(p, "readme.md"),
+    readme: has("README.md") || has("readme.md"),
     tests: hasTests,
-    env: existsAt(p, ".env"),
-    envExample: existsAt(p, ".env.example"),
-    dockerfile: existsAt(p, "Dockerfile"),
-    dockerCompose: existsAt(p, "docker-compose.yml") || existsAt(p, "docker-compose.yaml") || existsAt(p, "compose.yml"),
-    linterConfig: hasLinter,
-    license: detectLicense(p),
-    lockfile: hasLockfile,
+    env: has(".env"),
+    envExample: has(".env.example"),
+    dockerfile: has("Dockerfile"),
+    dockerCompose: has("docker-compose.yml") || has("docker-compose.yaml") || has("compose.yml"),
+    linterConfig: LINTER_FILES.some(has),
+    license: detectLicense(projectPath, listing),
+    lockfile: LOCKFILE_MAP.some(([f]) => has(f)),
   };
 }
 
-function checkCicd(projectPath: string): Record<string, boolean> {
+function checkCicd(projectPath: string, listing = new RootListing(projectPath)): Record<string, boolean> {
   return {
-    githubActions: fs.existsSync(path.join(projectPath, ".github", "workflows")),
-    circleci: fs.existsSync(path.join(projectPath, ".circleci")),
-    travis: existsAt(projectPath, ".travis.yml"),
-    gitlabCi: existsAt(projectPath, ".gitlab-ci.yml"),
+    githubActions: listing.has(".github/workflows"),
+    circleci: listing.has(".circleci"),
+    travis: listing.has(".travis.yml"),
+    gitlabCi: listing.has(".gitlab-ci.yml"),
   };
 }
 
-function checkDeployment(projectPath: string): Record<string, boolean> {
+function checkDeployment(projectPath: string, listing = new RootListing(projectPath)): Record<string, boolean> {
   return {
-    fly: existsAt(projectPath, "fly.toml"),
-    vercel: existsAt(projectPath, "vercel.json"),
-    netlify: existsAt(projectPath, "netlify.toml"),
+    fly: listing.has("fly.toml"),
+    vercel: listing.has("vercel.json"),
+    netlify: listing.has("netlify.toml"),
   };
 }
 
-function countTodos(projectPath: string): [number, number, number] {
-  let todoCount = 0;
-  let fixmeCount = 0;
-  let locCount = 0;
+// Skip policy for the source walk (mirrors pipeline/sourcefiles.py defaults):
+// files too large, binary, generated or minified are tallied, not counted.
+const SKIP_REASONS = ["tooLarge", "binary", "generated", "minified"] as const;
+type SkipReason = (typeof SKIP_REASONS)[number];
+
+const MAX_FILE_BYTES = 1_000_000;
+const SNIFF_BYTES = 8192;
+const MINIFIED_LINE_LENGTH = 200;
+const GENERATED_MARKERS = ["@generated", "DO NOT EDIT"].map((m) => Buffer.from(m));
+
+function sniffSource(block: Buffer): SkipReason | null {
+  if (block.includes(0)) return "binary";
+  if (GENERATED_MARKERS.some((m) => block.includes(m))) return "generated";
+  if (block.length > 0) {
+    let lines = 0;
+    for (let i = block.indexOf(10); i !== -1; i = block.indexOf(10, i + 1)) lines++;
+    if (block[block.length - 1] !== 10) lines++;
+    if (block.length / lines > MINIFIED_LINE_LENGTH) return "minified";
+  }
+  return null;
+}
 
-  function walk(dir: string) {
+interface SourceCounts {
+  todo: number;
+  fixme: number;
+  loc: number;
+  /** package path (relative, POSIX) -> [todo, fixme, loc] */
+  byPackage: Map<string, [number, number, number]>;
+  skipped: Record<SkipReason, { files: number; bytes: number }>;
+}
+
+/** Read a source file unless the skip policy rejects it (tallied in `skipped`). */
+function readSource(filePath: string, skipped: SourceCounts["skipped"]): Buffer | null {
+  let fd: number;
+  try {
+    fd = fs.openSync(filePath, "r");
+  } catch {
+    return null;
+  }
+  try {
+    const size = fs.fstatSync(fd).size;
+    if (size > MAX_FILE_BYTES) {
+      skipped.tooLarge.files++;
+      skipped.tooLarge.bytes += size;
+      return null;
+    }
+    // Sniff the first block before reading the rest, so skipped files cost
+    // one small read (mirrors sourcefiles.read_source).
+    const block = Buffer.alloc(SNIFF_BYTES);
+    const head = block.subarray(0, fs.readSync(fd, block, 0, SNIFF_BYTES, null));
+    const reason = sniffSource(head);
+    if (reason) {
+      skipped[reason].files++;
+      skipped[reason].bytes += size;
+      return null;
+    }
+    // readFileSync on a descriptor continues from the current position.
+    return head.length === SNIFF_BYTES ? Buffer.concat([head, fs.readFileSync(fd)]) : head;
+  } catch {
+    return null;
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+/** Walk source files once, attributing counts to the deepest enclosing package. */
+function countSource(projectPath: string, packages: string[] = []): SourceCounts {
+  const skipped = Object.fromEntries(SKIP_REASONS.map((r) => [r, { files: 0, bytes: 0 }])) as SourceCounts["skipped"];
+  const counts: SourceCounts = { todo: 0, fixme: 0, loc: 0, byPackage: new Map(), skipped };
+  const packageSet = new Set(packages);
+  for (const pkg of packages) counts.byPackage.set(pkg, [0, 0, 0]);
+
+  function walk(dir: string, rel: string, owner: string | null) {
     let entries: fs.Dirent[];
     try {
       entries = fs.readdirSync(dir, { withFileTypes: true });
     } catch {
       return;
     }
+    const bucket = owner !== null ? counts.byPackage.get(owner)! : null;
 
     for (const entry of entries) {
       if (entry.isDirectory()) {
         if (!SKIP_WALK_DIRS.has(entry.name)) {
-          walk(path.join(dir, entry.name));
+          const childRel = rel ? `${rel}/${entry.name}` : entry.name;
+          walk(path.join(dir, entry.name), childRel, packageSet.has(childRel) ? childRel : owner);
         }
       } else if (entry.isFile()) {
         const ext = path.extname(entry.name);
         if (!SOURCE_EXTENSIONS.has(ext)) continue;
-        try {
-          const content = fs.readFileSync(path.join(dir, entry.name), "utf-8");
-          // Match Python iterator semantics: split on \n but don't count
-          // a trailing empty element from a final newline
-          const lines = content.split("\n");
-          const lineCount = lines.length > 0 && lines[lines.length - 1] === "" ? lines.length - 1 : lines.length;
-          for (let li = 0; li < lineCount; li++) {
-            locCount++;
-            if (lines[li].includes("TODO")) todoCount++;
-            if (lines[li].includes("FIXME")) fixmeCount++;
-          }
-        } catch {
-          // permission error, skip
+        const data = readSource(path.join(dir, entry.name), skipped);
+        if (!data) continue;
+        const content = data.toString("utf-8");
+        // Match Python iterator semantics: split on \n but don't count
+        // a trailing empty element from a final newline
+        const lines = content.split("\n");
+        const lineCount = lines.length > 0 && lines[lines.length - 1] === "" ? lines.length - 1 : lines.length;
+        let todo = 0;
+        let fixme = 0;
+        for (let li = 0; li < lineCount; li++) {
+          if (lines[li].includes("TODO")) todo++;
+          if (lines[li].includes("FIXME")) fixme++;
+        }
+        counts.todo += todo;
+        counts.fixme += fixme;
+        counts.loc += lineCount;
+        if (bucket) {
+          bucket[0] += todo;
+          bucket[1] += fixme;
+          bucket[2] += lineCount;
         }
       }
     }
   }
 
-  walk(projectPath);
-  return [todoCount, fixmeCount, locCount];
+  walk(projectPath, "", null);
+  return counts;
+}
+
+// ---------------------------------------------------------------------------
+// Monorepo workspaces (mirrors pipeline/workspaces.py)
+// ---------------------------------------------------------------------------
+
+const PACKAGE_MANIFESTS = ["package.json", "Cargo.toml", "pyproject.toml"];
+
+function readTextSafe(filePath: string): string | null {
+  try {
+    return fs.readFileSync(filePath, "utf-8");
+  } catch {
+    return null;
+  }
+}
+
+function tomlTableLines(text: string, table: string): string[] {
+  const lines: string[] = [];
+  let inside = false;
+  for (const line of text.split(/\r?\n/)) {
+    const stripped = line.trim();
+    if (stripped.startsWith("[")) {
+      inside = stripped === `[${table}]`;
+      continue;
+    }
+    if (inside) lines.push(line);
+  }
+  return lines;
+}
+
+function tomlStringArray(text: string, table: string, key: string): string[] {
+  let collected = "";
+  let collecting = false;
+  for (const line of tomlTableLines(text, table)) {
+    let body = line.split("#", 1)[0];
+    if (!collecting) {
+      const eq = body.indexOf("=");
+      if (eq >= 0 && body.slice(0, eq).trim() === key && body.slice(eq + 1).trim().startsWith("[")) {
+        collecting = true;
+        body = body.slice(eq + 1);
+      } else {
+        continue;
+      }
+    }
+    collected += body;
+    if (body.includes("]")) break;
+  }
+  return collecting ? [...collected.matchAll(/["']([^"']*)["']/g)].map((m) => m[1]) : [];
+}
+
+function tomlString(text: string, table: string, key: string): string | null {
+  for (const line of tomlTableLines(text, table)) {
+    const eq = line.indexOf("=");
+    if (eq >= 0 && line.slice(0, eq).trim() === key) {
+      const match = /["']([^"']*)["']/.exec(line.slice(eq + 1));
+      if (match) return match[1];
+    }
+  }
+  return null;
+}
+
+function pnpmPackages(text: string): string[] {
+  const patterns: string[] = [];
+  let inside = false;
+  for (const line of text.split(/\r?\n/)) {
+    const stripped = line.split("#", 1)[0].trimEnd();
+    if (!stripped) continue;
+    if (!/^\s/.test(line)) {
+      inside = stripped.startsWith("packages:");
+      continue;
+    }
+    const item = stripped.trimStart();
+    if (inside && item.startsWith("-")) {
+      const value = item.slice(1).trim().replace(/^["']+|["']+$/g, "");
+      if (value) patterns.push(value);
+    }
+  }
+  return patterns;
+}
+
+function workspacePatterns(projectPath: string): [string[], string[]] {
+  let include: string[] = [];
+  let exclude: string[] = [];
+
+  const pkg = readJsonSafe(path.join(projectPath, "package.json"));
+  if (pkg) {
+    let ws = pkg.workspaces as unknown;
+    if (ws && typeof ws === "object" && !Array.isArray(ws)) ws = (ws as Record<string, unknown>).packages;
+    if (Array.isArray(ws)) include.push(...ws.filter((p): p is string => typeof p === "string"));
+  }
+
+  const pnpm = readTextSafe(path.join(projectPath, "pnpm-workspace.yaml"));
+  if (pnpm !== null) include.push(...pnpmPackages(pnpm));
+
+  const cargo = readTextSafe(path.join(projectPath, "Cargo.toml"));
+  if (cargo !== null) {
+    include.push(...tomlStringArray(cargo, "workspace", "members"));
+    exclude.push(...tomlStringArray(cargo, "workspace", "exclude"));
+  }
+
+  const pyproject = readTextSafe(path.join(projectPath, "pyproject.toml"));
+  if (pyproject !== null) {
+    include.push(...tomlStringArray(pyproject, "tool.uv.workspace", "members"));
+    exclude.push(...tomlStringArray(pyproject, "tool.uv.workspace", "exclude"));
+  }
+
+  // npm/pnpm negations ("!packages/internal") are excludes too.
+  exclude = [...exclude, ...include.filter((p) => p.startsWith("!")).map((p) => p.slice(1))];
+  include = include.filter((p) => !p.startsWith("!"));
+  return [include, exclude];
+}
+
+function globSegment(segment: string): RegExp {
+  const source = segment.replace(/[.+^${}()|[\]\\]/g, "\\$&").replace(/\*/g, "[^/]*").replace(/\?/g, "[^/]");
+  return new RegExp(`^${source}$`);
+}
+
+/**
+ * Directories under root matching a relative glob (`*`, `?`, `**`). Wildcards
+ * never descend into hidden or skipped directories.
+ */
+function globDirs(root: string, pattern: string): string[] {
+  const segments = pattern.split("/");
+  const results: string[] = [];
+
+  function step(dir: string, rel: string, i: number) {
+    if (i === segments.length) {
+      results.push(rel);
+      return;
+    }
+    let subdirs: string[];
+    try {
+      subdirs = fs.readdirSync(dir, { withFileTypes: true }).filter((e) => e.isDirectory()).map((e) => e.name);
+    } catch {
+      return;
+    }
+    const segment = segments[i];
+    const join = (name: string) => (rel ? `${rel}/${name}` : name);
+    if (segment === "**") {
+      step(dir, rel, i + 1);
+      for (const name of subdirs) {
+        if (!name.startsWith(".") && !SKIP_WALK_DIRS.has(name)) step(path.join(dir, name), join(name), i);
+      }
+      return;
+    }
+    if (/[*?]/.test(segment)) {
+      const re = globSegment(segment);
+      for (const name of subdirs) {
+        if (re.test(name) && !name.startsWith(".") && !SKIP_WALK_DIRS.has(name)) {
+          step(path.join(dir, name), join(name), i + 1);
+        }
+      }
+    } else if (subdirs.includes(segment)) {
+      step(path.join(dir, segment), join(segment), i + 1);
+    }
+  }
+
+  step(root, "", 0);
+  return results;
+}
+
+function expandPattern(root: string, raw: string): Set<string> {
+  let pattern = raw.trim().replace(/^\/+|\/+$/g, "");
+  if (pattern.startsWith("./")) pattern = pattern.slice(2);
+  const matches = new Set<string>();
+  if (!pattern || pattern.split("/").includes("..")) return matches;
+  for (const rel of globDirs(root, pattern)) {
+    if (rel.split("/").some((part) => SKIP_WALK_DIRS.has(part))) continue;
+    const abs = path.join(root, rel);
+    if (PACKAGE_MANIFESTS.some((m) => {
+      try {
+        return fs.statSync(path.join(abs, m)).isFile();
+      } catch {
+        return false;
+      }
+    })) {
+      matches.add(rel);
+    }
+  }
+  return matches;
+}
+
+function findWorkspacePackages(projectPath: string): string[] {
+  const [include, exclude] = workspacePatterns(projectPath);
+  if (include.length === 0) return [];
+  const packages = new Set<string>();
+  for (const pattern of include) for (const rel of expandPattern(projectPath, pattern)) packages.add(rel);
+  for (const pattern of exclude) for (const rel of expandPattern(projectPath, pattern)) packages.delete(rel);
+  packages.delete("");
+  return [...packages].sort();
+}
+
+function packageName(packagePath: string): string | null {
+  const pkg = readJsonSafe(path.join(packagePath, "package.json"));
+  if (pkg && typeof pkg.name === "string" && pkg.name) return pkg.name;
+  const cargo = readTextSafe(path.join(packagePath, "Cargo.toml"));
+  if (cargo !== null) {
+    const name = tomlString(cargo, "package", "name");
+    if (name) return name;
+  }
+  const pyproject = readTextSafe(path.join(packagePath, "pyproject.toml"));
+  if (pyproject !== null) {
+    const name = tomlString(pyproject, "project", "name");
+    if (name) return name;
+  }
+  return null;
+}
+
+function detectWorkspaces(projectPath: string, packages: string[], counts: SourceCounts): Array<Record<string, unknown>> {
+  return packages.map((rel) => {
+    const packagePath = path.join(projectPath, ...rel.split("/"));
+    const [todoCount, fixmeCount, locEstimate] = counts.byPackage.get(rel)!;
+    return {
+      name: packageName(packagePath) ?? rel,
+      path: rel,
+      language: detectLanguages(packagePath).primary,
+      framework: null, // Phase 61W: framework detection moved to LLM enrichment
+      scripts: detectScripts(packagePath),
+      todoCount,
+      fixmeCount,
+      locEstimate,
+    };
+  });
 }
 
 function getDescription(projectPath: string): string | null {
@@ -424,19 +1026,19 @@ function detectServices(projectPath: string): string[] {
   return [...services].sort();
 }
 
-function detectPackageManager(projectPath: string): string | null {
+function detectPackageManager(projectPath: string, listing = new RootListing(projectPath)): string | null {
   for (const [filename, manager] of LOCKFILE_MAP) {
-    if (existsAt(projectPath, filename)) return manager;
+    if (listing.has(filename)) return manager;
   }
   return null;
 }
 
-function detectLicense(projectPath: string): boolean {
-  return existsAt(projectPath, "LICENSE") || existsAt(projectPath, "LICENSE.md");
+function detectLicense(projectPath: string, listing = new RootListing(projectPath)): boolean {
+  return listing.has("LICENSE") || listing.has("LICENSE.md");
 }
 
-function hasLanguageIndicators(projectPath: string): boolean {
-  return Object.keys(LANGUAGE_INDICATORS).some((f) => existsAt(projectPath, f));
+function hasLanguageIndicators(projectPath: string, listing = new RootListing(projectPath)): boolean {
+  return Object.keys(LANGUAGE_INDICATORS).some((f) => listing.has(f));
 }
 
 // ---------------------------------------------------------------------------
@@ -466,8 +1068,9 @@ export function listProjectDirs(devRoot: string, excludeDirs: string[], includeN
     if (excludeSet.has(entry.name)) continue;
 
     const absPath = path.join(devRoot, entry.name);
-    if (!includeNonGitDirs && !fs.existsSync(path.join(absPath, ".git")) && !hasLanguageIndicators(absPath)) {
-      continue;
+    if (!includeNonGitDirs) {
+      const listing = new RootListing(absPath);
+      if (!listing.has(".git") && !hasLanguageIndicators(absPath, listing)) continue;
     }
 
     dirs.push({ name: entry.name, absPath, pathHash: pathHash(absPath) });
@@ -486,14 +1089,18 @@ export interface ScanOutput {
   projects: Array<Record<string, unknown>>;
 }
 
-export function scanProject(absPath: string): Record<string, unknown> {
+/** Scan one project; `previous` is its last stored scan, if any. */
+export function scanProject(absPath: string, previous?: Record<string, unknown> | null): Record<string, unknown> {
   const name = path.basename(absPath);
   const gitInfo = getGitInfo(absPath);
-  const languages = detectLanguages(absPath);
-  const files = checkFiles(absPath);
-  const cicd = checkCicd(absPath);
-  const deployment = checkDeployment(absPath);
-  const [todoCount, fixmeCount, locEstimate] = countTodos(absPath);
+  // One readdir of the root answers every root-level detector below.
+  const listing = new RootListing(absPath);
+  const languages = detectLanguages(absPath, listing);
+  const files = checkFiles(absPath, listing);
+  const cicd = checkCicd(absPath, listing);
+  const deployment = checkDeployment(absPath, listing);
+  const packages = findWorkspacePackages(absPath);
+  const counts = countSource(absPath, packages);
   const description = getDescription(absPath);
   const framework = null; // Phase 61W: framework detection moved to LLM enrichment
 
@@ -508,8 +1115,8 @@ export function scanProject(absPath: string): Record<string, unknown> {
 
   const scripts = detectScripts(absPath);
   const services = detectServices(absPath);
-  const packageManager = detectPackageManager(absPath);
-  const license = detectLicense(absPath);
+  const packageManager = detectPackageManager(absPath, listing);
+  const license = files.license;
 
   return {
     name,
@@ -520,16 +1127,19 @@ export function scanProject(absPath: string): Record<string, unknown> {
     files,
     cicd,
     deployment,
-    todoCount,
-    fixmeCount,
+    todoCount: counts.todo,
+    fixmeCount: counts.fixme,
     description,
     framework,
     liveUrl,
     scripts,
     services,
-    locEstimate,
+    locEstimate: counts.loc,
     packageManager,
     license,
+    workspaces: detectWorkspaces(absPath, packages, counts),
+    identityKey: projectIdentity(absPath, gitInfo.remoteUrl as string | null, scannedHead(gitInfo), previous),
+    skippedFiles: counts.skipped,
   };
 }
 
@@ -551,8 +1161,9 @@ export function scanAll(devRoot: string, excludeDirs: string[], includeNonGitDir
     if (excludeSet.has(entry.name)) continue;
 
     const absPath = path.join(devRoot, entry.name);
-    if (!includeNonGitDirs && !fs.existsSync(path.join(absPath, ".git")) && !hasLanguageIndicators(absPath)) {
-      continue;
+    if (!includeNonGitDirs) {
+      const listing = new RootListing(absPath);
+      if (!listing.has(".git") && !hasLanguageIndicators(absPath, listing)) continue;
     }
 
     projects.push(scanProject(absPath));
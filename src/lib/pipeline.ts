@@ -4,6 +4,8 @@ import { db } from "./db";
 import { getLlmProvider, type LlmEnrichment } from "./llm";
 import { listProjectDirs, scanProject } from "./pipeline-native/scan";
 import { deriveProject, type ScanProject as DeriveInput } from "./pipeline-native/derive";
+import { loadScorer, RuleError } from "./pipeline-native/rules";
+import { getSettings } from "./settings";
 import { fetchGitHubData, isGhAvailable, parseGitHubOwnerRepo } from "./pipeline-native/github";
 
 /** Validate scan output shape. */
@@ -67,6 +69,21 @@ function hashRawJson(rawJson: string): string {
   return createHash("sha256").update(rawJson).digest("hex");
 }
 
+function parseRawJson(rawJson: string | undefined): Record<string, unknown> | null {
+  if (!rawJson) return null;
+  try {
+    const parsed: unknown = JSON.parse(rawJson);
+    return typeof parsed === "object" && parsed !== null ? (parsed as Record<string, unknown>) : null;
+  } catch {
+    return null;
+  }
+}
+
+function identityFromRawJson(rawJson: string | undefined): string | null {
+  const identity = parseRawJson(rawJson)?.identityKey;
+  return typeof identity === "string" ? identity : null;
+}
+
 /**
  * Executes the full pipeline: enumerate → per-project (scan → derive → store → optional GitHub + LLM) → cleanup.
  * Each project completes fully before the next starts.
@@ -82,15 +99,27 @@ export async function runRefreshPipeline(
   const llmFailedNames: string[] = [];
   let llmSkipped = 0;
 
+  // Scoring rules are validated up front, like derive.py, so a bad
+  // "scoringRules" setting fails the run before anything is stored.
+  let scorer;
+  try {
+    scorer = loadScorer(getSettings().scoringRules);
+  } catch (err) {
+    if (err instanceof RuleError) throw new Error(`invalid scoringRules: ${err.message}`);
+    throw err;
+  }
+
   // 1. Lightweight directory enumeration
   const projectDirs = listProjectDirs(config.devRoot, config.excludeDirs, config.includeNonGitDirs);
 
   // Sort by existing lastTouchedAt (most recently active first) — uses DB data from prior scans
   const existingProjects = await db.project.findMany({
     where: { pathHash: { in: projectDirs.map((d) => d.pathHash) } },
-    select: { pathHash: true, lastTouchedAt: true },
+    select: { pathHash: true, lastTouchedAt: true, scan: { select: { rawJson: true } } },
   });
   const lastTouchedMap = new Map(existingProjects.map((p) => [p.pathHash, p.lastTouchedAt]));
+  // Previous scans let scanProject skip the root-commit walk for unchanged repos
+  const previousScans = new Map(existingProjects.map((p) => [p.pathHash, p.scan?.rawJson]));
   projectDirs.sort((a, b) => {
     const aDate = lastTouchedMap.get(a.pathHash);
     const bDate = lastTouchedMap.get(b.pathHash);
@@ -113,6 +142,22 @@ export async function runRefreshPipeline(
     data: { prunedAt: null },
   });
 
+  // 2b. Moved or renamed projects: a pruned project whose last scan carried
+  // the same identityKey as a newly seen path is the same repo. Its row (and
+  // with it overrides, metadata and activity history) moves to the new path.
+  const knownHashes = new Set(existingProjects.map((p) => p.pathHash));
+  const prunedByIdentity = new Map<string, string>();
+  if (projectDirs.some((d) => !knownHashes.has(d.pathHash))) {
+    const pruned = await db.project.findMany({
+      where: { prunedAt: { not: null } },
+      select: { id: true, scan: { select: { rawJson: true } } },
+    });
+    for (const p of pruned) {
+      const identity = identityFromRawJson(p.scan?.rawJson);
+      if (identity && !prunedByIdentity.has(identity)) prunedByIdentity.set(identity, p.id);
+    }
+  }
+
   const total = projectDirs.length;
   const llmProvider = options?.skipLlm ? null : getLlmProvider();
   const ghAvailable = isGhAvailable();
@@ -154,12 +199,22 @@ export async function runRefreshPipeline(
     emit({ type: "project_start", name, index: i, total, step: "store" });
 
     // 3a. Scan
-    const scanned = scanProject(dir.absPath);
+    const scanned = scanProject(dir.absPath, parseRawJson(previousScans.get(dir.pathHash)));
 
     // 3b. Derive
-    const derived = deriveProject(scanned as unknown as DeriveInput);
+    const derived = deriveProject(scanned as unknown as DeriveInput, scorer);
 
     // 3c. DB upsert (Project, Scan, Derived)
+    const identity = typeof scanned.identityKey === "string" ? scanned.identityKey : null;
+    const movedFrom = !knownHashes.has(dir.pathHash) && identity ? prunedByIdentity.get(identity) : undefined;
+    if (movedFrom && identity) {
+      prunedByIdentity.delete(identity);
+      await db.project.update({
+        where: { id: movedFrom },
+        data: { pathHash: dir.pathHash, prunedAt: null },
+      });
+    }
+
     const lastCommitDateStr = scanned.lastCommitDate as string | null;
     const lastTouchedAt = lastCommitDateStr ? new Date(lastCommitDateStr) : null;
 
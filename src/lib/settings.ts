@@ -21,6 +21,7 @@ export interface AppSettings {
   mlxModel?: string;
   hasCompletedOnboarding?: boolean;
   includeNonGitDirs?: boolean;
+  scoringRules?: unknown;
 }
 
 let cache: AppSettings | null = null;